@@ -1,9 +1,11 @@
 import logging
 import re
 from dataclasses import dataclass, field
+from typing import Callable
 
 from app.agents.base_agent import AgentResult, BaseAgent
 from app.utils.llm_client import CLAUDE_SONNET
+from app.utils.markdown_index import SectionIndex
 
 logger = logging.getLogger(__name__)
 
@@ -59,13 +61,15 @@ class ArchitectResult:
         return len(self.missing_sections) == 0
 
 
-def parse_tech_stack(spec_md: str) -> TechStack:
+def parse_tech_stack(spec_md: str, index: SectionIndex | None = None) -> TechStack:
     """Extract tech stack choices from the spec.md markdown.
 
     Looks for ### Frontend / ### Backend / ### Database / ### Styling
     subsections under ## Recommended Tech Stack, then grabs the **bold**
-    technology name on the line immediately after the header.
+    technology name on the line immediately after the header. Pass the
+    spec's SectionIndex to reuse it.
     """
+    index = index or SectionIndex(spec_md)
     stack = TechStack()
 
     mapping = {
@@ -76,17 +80,15 @@ def parse_tech_stack(spec_md: str) -> TechStack:
         "styling/ui": "styling",
     }
 
-    for match in re.finditer(r"###\s+(.+)", spec_md):
-        header = match.group(1).strip().lower().rstrip(":")
-        attr = mapping.get(header)
+    for position, section in enumerate(index.sections):
+        if section.level < 3:
+            continue
+        attr = mapping.get(section.title.lower().rstrip(":"))
         if attr is None:
             continue
 
-        # Grab the text between this ### and the next ### or ## (or EOF)
-        start = match.end()
-        next_header = re.search(r"\n##", spec_md[start:])
-        end = start + next_header.start() if next_header else len(spec_md)
-        block = spec_md[start:end].strip()
+        # Grab the text between this ### and the next header (or EOF)
+        block = index.body_until_next_header(position).strip()
 
         # Try to extract **Bold Choice** from the first non-empty line
         bold = re.search(r"\*\*(.+?)\*\*", block)
@@ -100,19 +102,22 @@ def parse_tech_stack(spec_md: str) -> TechStack:
     return stack
 
 
-def validate_sections(spec_md: str, project_type: str = "build") -> list[str]:
-    """Return list of required section names missing from the spec."""
-    required = get_required_sections(project_type)
-    lower = spec_md.lower()
-    missing = []
-    for section in required:
-        # Look for "## <section>" allowing flexible whitespace
-        if re.search(rf"##\s+{re.escape(section.lower())}", lower) is None:
-            # Also try without apostrophe variants
-            alt = section.replace("\u2019", "'").replace("'", "'")
-            if re.search(rf"##\s+{re.escape(alt.lower())}", lower) is None:
-                missing.append(section)
-    return missing
+def _normalize_title(title: str) -> str:
+    # Curly and straight apostrophes are interchangeable in section names
+    return title.lower().replace("\u2019", "'")
+
+
+def validate_sections(spec_md: str, project_type: str = "build", index: SectionIndex | None = None) -> list[str]:
+    """Return list of required section names missing from the spec.
+
+    A section is present if some ## (or deeper) header starts with its name.
+    """
+    index = index or SectionIndex(spec_md)
+    titles = [_normalize_title(title) for title in index.titles(min_level=2)]
+    return [
+        section for section in get_required_sections(project_type)
+        if not any(title.startswith(_normalize_title(section)) for title in titles)
+    ]
 
 
 class ArchitectAgent(BaseAgent):
@@ -122,11 +127,11 @@ class ArchitectAgent(BaseAgent):
     """
 
     model = CLAUDE_SONNET
+    prompt_file = "architect_prompt.md"
 
-    def get_system_prompt(self) -> str:
-        return self._load_prompt_file("architect_prompt.md")
-
-    def execute(self, input_data: dict) -> ArchitectResult:
+    def execute(
+        self, input_data: dict, on_delta: Callable[[str], None] | None = None
+    ) -> ArchitectResult:
         """Generate a spec.md from the user's idea and their answers.
 
         Args:
@@ -134,6 +139,7 @@ class ArchitectAgent(BaseAgent):
                 "idea": "the original app idea",
                 "questions_and_answers": "formatted Q&A string"
             }
+            on_delta: optional callback streaming raw spec text as it is generated
 
         Returns:
             ArchitectResult with spec_md, parsed tech_stack, and validation.
@@ -152,6 +158,8 @@ class ArchitectAgent(BaseAgent):
             user_message=user_message,
             max_tokens=4096,
             temperature=0.7,
+            on_delta=on_delta,
+            project_type=project_type,
         )
 
         spec_md = result.content.strip()
@@ -163,8 +171,9 @@ class ArchitectAgent(BaseAgent):
         if spec_md.endswith("```"):
             spec_md = spec_md[:-3].rstrip()
 
-        tech_stack = parse_tech_stack(spec_md)
-        missing = validate_sections(spec_md, project_type)
+        index = SectionIndex(spec_md)
+        tech_stack = parse_tech_stack(spec_md, index)
+        missing = validate_sections(spec_md, project_type, index)
 
         if missing:
             logger.warning("Architect spec is missing sections: %s", missing)
@@ -1,15 +1,17 @@
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from pathlib import Path
+from typing import Callable
 
+from app.agents.prompt_registry import PromptTemplate, prompt_registry
+from app.config import settings
+from app.utils import deadline
 from app.utils.cost_calculator import calculate_cost
-from app.utils.llm_client import LLMResponse, llm_client
+from app.utils.llm_hedging import hedge_policy_for
+from app.utils.llm_client import LLMResponse, async_llm_client, llm_client
 
 logger = logging.getLogger(__name__)
 
-PROMPTS_DIR = Path(__file__).parent / "prompts"
-
 
 @dataclass
 class AgentResult:
@@ -21,6 +23,7 @@ class AgentResult:
     cost_usd: float = 0.0
     model: str = ""
     latency_ms: float = 0
+    prompt_version: str = ""  # PromptTemplate.version of the system prompt used
 
 
 class BaseAgent(ABC):
@@ -28,69 +31,169 @@ class BaseAgent(ABC):
 
     Subclasses must implement:
         - model: the LLM model ID to use
+        - prompt_file: the system prompt template in agents/prompts/
         - execute(): the agent's main logic
-        - get_system_prompt(): returns the system prompt string
     """
 
     model: str  # Subclasses set this as a class attribute
+    prompt_file: str  # e.g. "critic_prompt.md"; variants per project_type via the registry
 
     def __init__(self):
         self._total_tokens = 0
         self._total_cost = 0.0
 
+    @property
+    def agent_name(self) -> str:
+        """Short role name, e.g. "elicitor" for ElicitorAgent."""
+        return self.__class__.__name__.removesuffix("Agent").lower()
+
+    @property
+    def use_response_cache(self) -> bool:
+        """Whether this agent's calls go through the LLM response cache."""
+        return self.agent_name in settings.LLM_CACHE_AGENTS
+
+    def remaining_budget(self) -> float | None:
+        """Seconds left before the workflow deadline, or None if unbounded."""
+        return deadline.remaining()
+
+    def _fit_max_tokens(self, max_tokens: int) -> int:
+        """Shrink max_tokens so generation can finish within the remaining budget."""
+        left = self.remaining_budget()
+        if left is None:
+            return max_tokens
+        affordable = int(left * settings.LLM_OUTPUT_TOKENS_PER_SECOND)
+        fitted = max(settings.LLM_MIN_MAX_TOKENS, min(max_tokens, affordable))
+        if fitted < max_tokens:
+            logger.warning(
+                f"[{self.__class__.__name__}] {left:.0f}s left before deadline — "
+                f"max_tokens reduced {max_tokens} → {fitted}"
+            )
+        return fitted
+
     @abstractmethod
     def execute(self, input_data: dict) -> AgentResult:
         """Run the agent's main task. Subclasses implement this."""
         ...
 
-    @abstractmethod
-    def get_system_prompt(self) -> str:
-        """Return the system prompt for this agent."""
-        ...
+    def get_prompt_template(self, project_type: str = "build") -> PromptTemplate:
+        """This agent's system prompt template, from the in-memory registry."""
+        return prompt_registry.get(self.prompt_file, project_type)
 
-    def _load_prompt_file(self, filename: str) -> str:
-        """Load a system prompt from the prompts/ directory."""
-        path = PROMPTS_DIR / filename
-        return path.read_text()
+    def get_system_prompt(self, project_type: str = "build") -> str:
+        """Return the system prompt for this agent."""
+        return self.get_prompt_template(project_type).text
 
     def _call_llm(
         self,
         user_message: str,
         max_tokens: int = 4096,
         temperature: float = 0.7,
+        on_delta: Callable[[str], None] | None = None,
+        cache_prefix: str = "",
+        project_type: str = "build",
+        json_schema: dict | None = None,
     ) -> AgentResult:
         """Call the LLM using this agent's model and system prompt.
 
-        Wraps LLMClient.call() and tracks cumulative cost.
+        Wraps LLMClient.call() and tracks cumulative cost. Passing on_delta
+        streams the completion, calling it with each text delta. cache_prefix
+        is a large, repeated lead-in to user_message (e.g. the spec) that the
+        provider should cache alongside the system prompt. project_type picks
+        the system prompt variant. json_schema requests structured output
+        conforming to that schema.
         """
-        system_prompt = self.get_system_prompt()
-        logger.info(f"[{self.__class__.__name__}] Calling {self.model}")
+        template = self.get_prompt_template(project_type)
+        max_tokens = self._fit_max_tokens(max_tokens)
+        logger.info(f"[{self.__class__.__name__}] Calling {self.model} ({template.version})")
 
         response: LLMResponse = llm_client.call(
             model=self.model,
-            system_prompt=system_prompt,
+            system_prompt=template.text,
+            user_message=user_message,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            on_delta=on_delta,
+            cache_prefix=cache_prefix,
+            use_cache=self.use_response_cache,
+            hedge=hedge_policy_for(self.agent_name),
+            json_schema=json_schema,
+        )
+
+        return self._record(response, template)
+
+    async def _acall_llm(
+        self,
+        user_message: str,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        cache_prefix: str = "",
+        project_type: str = "build",
+        json_schema: dict | None = None,
+    ) -> AgentResult:
+        """Awaitable counterpart of _call_llm() backed by AsyncLLMClient.
+
+        Lets one worker process drive many in-flight agent calls concurrently,
+        with the same response cache and hedging policy as _call_llm().
+        """
+        template = self.get_prompt_template(project_type)
+        max_tokens = self._fit_max_tokens(max_tokens)
+        logger.info(f"[{self.__class__.__name__}] Calling {self.model} ({template.version}, async)")
+
+        response: LLMResponse = await async_llm_client.call(
+            model=self.model,
+            system_prompt=template.text,
             user_message=user_message,
             max_tokens=max_tokens,
             temperature=temperature,
+            cache_prefix=cache_prefix,
+            use_cache=self.use_response_cache,
+            hedge=hedge_policy_for(self.agent_name),
+            json_schema=json_schema,
         )
 
-        cost = calculate_cost(response.model, response.input_tokens, response.output_tokens)
-        self._total_tokens += response.total_tokens
+        return self._record(response, template)
+
+    def _record(self, response: LLMResponse, template: PromptTemplate) -> AgentResult:
+        """Track cumulative cost for a response and wrap it as an AgentResult.
+
+        A losing hedged request was billed too, so its usage is included in
+        total_tokens and cost_usd (input/output_tokens stay the answer's).
+        """
+        # A single-flight follower shares the leader's usage but nothing extra was billed
+        follower = response.flight_role == "follower"
+        cost = 0.0 if follower else calculate_cost(
+            response.model,
+            response.input_tokens,
+            response.output_tokens,
+            response.cache_read_tokens,
+            response.cache_write_tokens,
+        )
+        wasted_tokens = response.wasted_input_tokens + response.wasted_output_tokens
+        if response.wasted_model and not follower:
+            cost += calculate_cost(response.wasted_model, response.wasted_input_tokens, response.wasted_output_tokens)
+        total_tokens = response.total_tokens + wasted_tokens
+        self._total_tokens += total_tokens
         self._total_cost += cost
 
         logger.info(
             f"[{self.__class__.__name__}] Done — "
-            f"{response.total_tokens} tokens, ${cost:.4f}, {response.latency_ms:.0f}ms"
+            f"{response.total_tokens} tokens "
+            f"(cache read {response.cache_read_tokens}, write {response.cache_write_tokens}), "
+            f"${cost:.4f}, {response.latency_ms:.0f}ms"
+            f"{' [response cache]' if response.from_cache else ''}"
+            f"{' [single-flight follower]' if follower else ''}"
+            f"{f' [+{wasted_tokens} tokens on losing hedge]' if wasted_tokens else ''}"
         )
 
         return AgentResult(
             content=response.content,
             input_tokens=response.input_tokens,
             output_tokens=response.output_tokens,
-            total_tokens=response.total_tokens,
+            total_tokens=total_tokens,
             cost_usd=cost,
             model=response.model,
             latency_ms=response.latency_ms,
+            prompt_version=template.version,
         )
 
     @property
@@ -1,14 +1,64 @@
+import asyncio
 import json
 import logging
 import re
+import time
 from dataclasses import dataclass, field
+from typing import Literal
+
+from pydantic import BaseModel, ValidationError
 
 from app.agents.base_agent import AgentResult, BaseAgent
-from app.utils.llm_client import GPT_4O_MINI
+from app.agents.synthesizer import ParsedPrompt, parse_prompts
+from app.config import settings
+from app.utils.llm_client import GPT_4O_MINI, async_llm_client
 
 logger = logging.getLogger(__name__)
 
 
+class CriticIssueSchema(BaseModel):
+    """One issue as the Critic must return it."""
+    prompt_number: int
+    category: str
+    severity: Literal["critical", "major", "minor"]
+    description: str
+    suggestion: str
+
+
+class CriticAudit(BaseModel):
+    """The Critic's JSON output; requested as structured output and validated on receipt."""
+    issues_found: bool
+    severity: Literal["critical", "major", "minor", "none"]
+    issues: list[CriticIssueSchema]
+    overall_assessment: str
+
+
+def strict_json_schema(model: type[BaseModel]) -> dict:
+    """JSON schema for model in the form strict structured output accepts.
+
+    Every object gets additionalProperties: false and lists all of its
+    properties as required.
+    """
+    schema = model.model_json_schema()
+
+    def close(node) -> None:
+        if isinstance(node, dict):
+            if node.get("type") == "object":
+                node["additionalProperties"] = False
+                node["required"] = list(node.get("properties", {}))
+            for value in node.values():
+                close(value)
+        elif isinstance(node, list):
+            for value in node:
+                close(value)
+
+    close(schema)
+    return schema
+
+
+CRITIC_AUDIT_SCHEMA = strict_json_schema(CriticAudit)
+
+
 @dataclass
 class CriticIssue:
     """A single issue found by the Critic."""
@@ -33,6 +83,7 @@ class CriticResult:
     cost_usd: float = 0.0
     model: str = ""
     latency_ms: float = 0
+    repair_attempts: int = 0  # Small-model repairs needed to get schema-valid output
 
     @property
     def needs_refinement(self) -> bool:
@@ -57,6 +108,87 @@ def parse_critic_response(raw: str) -> dict:
     return json.loads(text)
 
 
+def validate_critic_response(raw: str) -> tuple[CriticAudit | None, str]:
+    """Parse and schema-check the Critic's output; returns (audit, "") or (None, error)."""
+    try:
+        return CriticAudit.model_validate(parse_critic_response(raw)), ""
+    except json.JSONDecodeError as e:
+        return None, f"invalid JSON: {e}"
+    except ValidationError as e:
+        return None, f"schema mismatch: {e}"
+
+
+class CriticRepairAgent(BaseAgent):
+    """Reformats Critic output that failed validation into schema-valid JSON.
+
+    A formatting glitch should cost one small-model call, not a re-audit or
+    a refinement pass.
+    """
+
+    model = GPT_4O_MINI
+    prompt_file = "critic_repair_prompt.md"
+
+    def execute(self, input_data: dict) -> AgentResult:
+        """Args: {"raw_response": "the unparseable output", "error": "why it failed"}."""
+        return self._call_llm(
+            user_message=(
+                f"## Validation Error\n\n{input_data['error']}\n\n"
+                f"## Audit Output\n\n{input_data['raw_response']}"
+            ),
+            max_tokens=2048,
+            temperature=0.0,
+            json_schema=CRITIC_AUDIT_SCHEMA,
+        )
+
+
+SEVERITY_RANK = {"none": 0, "minor": 1, "major": 2, "critical": 3}
+
+
+def critique_from_issues(
+    issues: list[CriticIssue], overall_assessment: str, model: str = "", latency_ms: float = 0
+) -> CriticResult:
+    """A CriticResult for findings that cost no tokens (lint, cached verdicts)."""
+    severity = max((i.severity for i in issues), key=lambda s: SEVERITY_RANK.get(s, 0), default="none")
+    return CriticResult(
+        issues_found=bool(issues),
+        severity=severity,
+        issues=list(issues),
+        overall_assessment=overall_assessment,
+        raw_response="",
+        model=model,
+        latency_ms=latency_ms,
+    )
+
+
+def merge_critiques(parts: list[CriticResult], latency_ms: float) -> CriticResult:
+    """Combine partial audits into one CriticResult.
+
+    Overall severity is the worst of the parts' severities and their issues'
+    severities, so needs_refinement and major_issues behave as for a single
+    audit. latency_ms is the wall-clock time of the whole (concurrent) audit.
+    """
+    issues = sorted((issue for part in parts for issue in part.issues), key=lambda issue: issue.prompt_number)
+    severity = max(
+        [part.severity for part in parts if part.issues_found] + [issue.severity for issue in issues],
+        key=lambda s: SEVERITY_RANK.get(s, 0),
+        default="none",
+    )
+    return CriticResult(
+        issues_found=any(part.issues_found for part in parts) or bool(issues),
+        severity=severity,
+        issues=issues,
+        overall_assessment="\n\n".join(part.overall_assessment for part in parts if part.overall_assessment),
+        raw_response="\n\n".join(part.raw_response for part in parts),
+        input_tokens=sum(part.input_tokens for part in parts),
+        output_tokens=sum(part.output_tokens for part in parts),
+        total_tokens=sum(part.total_tokens for part in parts),
+        cost_usd=sum(part.cost_usd for part in parts),
+        model=parts[0].model if parts else "",
+        latency_ms=latency_ms,
+        repair_attempts=sum(part.repair_attempts for part in parts),
+    )
+
+
 class CriticAgent(BaseAgent):
     """Quality Assurance Critic — audits generated prompts for issues.
 
@@ -64,9 +196,11 @@ class CriticAgent(BaseAgent):
     """
 
     model = GPT_4O_MINI
+    prompt_file = "critic_prompt.md"
 
-    def get_system_prompt(self) -> str:
-        return self._load_prompt_file("critic_prompt.md")
+    def __init__(self):
+        super().__init__()
+        self.repairer = CriticRepairAgent()
 
     def execute(self, input_data: dict) -> CriticResult:
         """Audit a set of prompts against the original spec.md.
@@ -74,7 +208,10 @@ class CriticAgent(BaseAgent):
         Args:
             input_data: {
                 "spec_md": "the approved spec.md",
-                "prompts_markdown": "full raw markdown of generated prompts"
+                "prompts_markdown": "full raw markdown of generated prompts",
+                "max_tokens": 2048 (optional output budget),
+                "structure_checked": False (optional; the package passed the structural lint),
+                "audit_numbers": [2, 4] (optional; audit only these prompts, the rest are context)
             }
 
         Returns:
@@ -83,66 +220,158 @@ class CriticAgent(BaseAgent):
         spec_md = input_data["spec_md"]
         prompts_md = input_data["prompts_markdown"]
         project_type = input_data.get("project_type", "build")
+        max_tokens = input_data.get("max_tokens", 2048)
 
-        user_message = (
+        # Spec first so repeated audits in the critic loop share a cached prefix
+        spec_prefix = (
             f"[Project Type: {project_type}]\n\n"
             f"## Original spec.md\n\n{spec_md}\n\n"
             f"---\n\n"
-            f"## Generated Prompts to Audit\n\n{prompts_md}"
         )
 
+        note = ""
+        if input_data.get("structure_checked"):
+            note = (
+                "Numbering, prompt count, empty prompts and tech stack mentions were already "
+                "checked; focus on content quality.\n\n"
+            )
+
+        group_size = settings.CRITIC_FANOUT_GROUP_SIZES.get(project_type)
+        audit_numbers = input_data.get("audit_numbers")
+        if group_size or audit_numbers:
+            prompts = parse_prompts(prompts_md)
+            targets = [p for p in prompts if audit_numbers is None or p.number in audit_numbers]
+            if audit_numbers or len(prompts) > group_size:
+                group_max_tokens = min(max_tokens, settings.CRITIC_FANOUT_MAX_TOKENS)
+                return self._fan_out(
+                    spec_prefix, prompts, group_size or len(targets), project_type, group_max_tokens, note, targets
+                )
+
+        user_message = f"## Generated Prompts to Audit\n\n{note}{prompts_md}"
+
         result: AgentResult = self._call_llm(
             user_message=user_message,
-            max_tokens=2048,
+            max_tokens=max_tokens,
             temperature=0.3,  # Lower temperature for analytical task
+            cache_prefix=spec_prefix,
+            project_type=project_type,
+            json_schema=CRITIC_AUDIT_SCHEMA,
+        )
+        critique = self._audit_result(result)
+        logger.info(
+            "Critic audit (single call): %.0fms, %d tokens (%d output)",
+            critique.latency_ms, critique.total_tokens, critique.output_tokens,
         )
+        return critique
 
-        try:
-            data = parse_critic_response(result.content)
-        except (json.JSONDecodeError, ValueError) as e:
-            logger.error("Failed to parse Critic JSON: %s\nRaw: %s", e, result.content[:500])
-            # Return a fallback indicating parse failure
+    def _fan_out(
+        self,
+        spec_prefix: str,
+        prompts: list[ParsedPrompt],
+        group_size: int,
+        project_type: str,
+        max_tokens: int,
+        note: str = "",
+        targets: list[ParsedPrompt] | None = None,
+    ) -> CriticResult:
+        """Audit groups of prompts (all, or just targets) concurrently and merge the findings.
+
+        Every call shares the spec prefix (cached after the first) and sees
+        all prompt titles, so cross-prompt consistency can still be judged.
+        """
+        targets = prompts if targets is None else targets
+        groups = [targets[i:i + group_size] for i in range(0, len(targets), group_size)]
+        outline = "\n".join(f"{p.number}. {p.title}" for p in prompts)
+
+        def user_message(group: list[ParsedPrompt]) -> str:
+            numbers = ", ".join(str(p.number) for p in group)
+            blocks = "\n\n".join(f"## Prompt {p.number}: {p.title}\n\n{p.content}" for p in group)
+            return (
+                f"## Prompt Package Outline\n\n{outline}\n\n"
+                f"## Generated Prompts to Audit\n\n"
+                f"{note}Audit only Prompt(s) {numbers} below; the outline is for context.\n\n{blocks}"
+            )
+
+        async def audit_all() -> list[AgentResult]:
+            return await asyncio.gather(*(
+                self._acall_llm(
+                    user_message=user_message(group),
+                    max_tokens=max_tokens,
+                    temperature=0.3,
+                    cache_prefix=spec_prefix,
+                    project_type=project_type,
+                    json_schema=CRITIC_AUDIT_SCHEMA,
+                )
+                for group in groups
+            ))
+
+        start = time.monotonic()
+        # On the client's long-lived loop, so concurrent audits share its connection pool
+        results = async_llm_client.run(audit_all())
+        critique = merge_critiques(
+            [self._audit_result(result) for result in results],
+            latency_ms=(time.monotonic() - start) * 1000,
+        )
+        logger.info(
+            "Critic audit (fan-out, %d calls of ≤%d prompts): %.0fms wall, %.0fms summed call latency, "
+            "%d tokens (%d output)",
+            len(groups), group_size, critique.latency_ms, sum(r.latency_ms for r in results),
+            critique.total_tokens, critique.output_tokens,
+        )
+        return critique
+
+    def _audit_result(self, result: AgentResult) -> CriticResult:
+        """Validate one audit response, repairing it on the small model if needed."""
+        calls = [result]
+        audit, error = validate_critic_response(result.content)
+
+        for _ in range(settings.CRITIC_REPAIR_ATTEMPTS):
+            if audit is not None:
+                break
+            logger.warning("Critic output failed validation (%s) — repairing with %s", error, self.repairer.model)
+            try:
+                repaired = self.repairer.execute({"raw_response": calls[-1].content, "error": error})
+            except Exception:
+                # Repair is best-effort: whatever went wrong, the unrepaired result still stands
+                logger.warning("Critic repair failed", exc_info=True)
+                break
+            calls.append(repaired)
+            audit, error = validate_critic_response(repaired.content)
+
+        usage = {
+            "input_tokens": sum(c.input_tokens for c in calls),
+            "output_tokens": sum(c.output_tokens for c in calls),
+            "total_tokens": sum(c.total_tokens for c in calls),
+            "cost_usd": sum(c.cost_usd for c in calls),
+            "model": result.model,
+            "latency_ms": sum(c.latency_ms for c in calls),
+            "repair_attempts": len(calls) - 1,
+        }
+
+        if audit is None:
+            logger.error("Failed to parse Critic JSON: %s\nRaw: %s", error, calls[-1].content[:500])
+            # A formatting failure says nothing about prompt quality, so it is
+            # reported as minor and never triggers a refinement pass
             return CriticResult(
                 issues_found=True,
-                severity="major",
+                severity="minor",
                 issues=[CriticIssue(
                     prompt_number=0,
                     category="parse_error",
-                    severity="major",
-                    description=f"Critic response was not valid JSON: {e}",
+                    severity="minor",
+                    description=f"Critic response was not valid: {error}",
                     suggestion="Re-run the critic audit.",
                 )],
                 overall_assessment="Critic output could not be parsed.",
-                raw_response=result.content,
-                input_tokens=result.input_tokens,
-                output_tokens=result.output_tokens,
-                total_tokens=result.total_tokens,
-                cost_usd=result.cost_usd,
-                model=result.model,
-                latency_ms=result.latency_ms,
-            )
-
-        issues = [
-            CriticIssue(
-                prompt_number=i.get("prompt_number", 0),
-                category=i.get("category", "unknown"),
-                severity=i.get("severity", "minor"),
-                description=i.get("description", ""),
-                suggestion=i.get("suggestion", ""),
+                raw_response=calls[-1].content,
+                **usage,
             )
-            for i in data.get("issues", [])
-        ]
 
         return CriticResult(
-            issues_found=data.get("issues_found", False),
-            severity=data.get("severity", "none"),
-            issues=issues,
-            overall_assessment=data.get("overall_assessment", ""),
-            raw_response=result.content,
-            input_tokens=result.input_tokens,
-            output_tokens=result.output_tokens,
-            total_tokens=result.total_tokens,
-            cost_usd=result.cost_usd,
-            model=result.model,
-            latency_ms=result.latency_ms,
+            issues_found=audit.issues_found,
+            severity=audit.severity,
+            issues=[CriticIssue(**issue.model_dump()) for issue in audit.issues],
+            overall_assessment=audit.overall_assessment,
+            raw_response=calls[-1].content,
+            **usage,
         )
@@ -1,12 +1,16 @@
 import logging
 import re
 from dataclasses import dataclass, field
+from typing import Callable
 
 from app.agents.base_agent import AgentResult, BaseAgent
+from app.agents.stream_parser import IncrementalBlockParser
 from app.utils.llm_client import CLAUDE_HAIKU
 
 logger = logging.getLogger(__name__)
 
+MAX_QUESTIONS = 3
+
 
 @dataclass
 class ParsedQuestion:
@@ -30,6 +34,37 @@ class ElicitorResult:
     latency_ms: float = 0
 
 
+# Question headers: ## Question N: Topic
+QUESTION_HEADER = re.compile(r"##\s*Question\s+(\d+)\s*:\s*(.+)")
+
+
+def _question_from_block(header: re.Match, block: str) -> ParsedQuestion:
+    """Build one question from its header match and the text up to the next header."""
+    block = block.strip()
+
+    # Split into question text and options
+    lines = [line for line in block.split("\n") if line.strip()]
+
+    text_lines: list[str] = []
+    options: list[str] = []
+    for line in lines:
+        stripped = line.strip()
+        # Lines starting with "- " are options
+        if stripped.startswith("- "):
+            options.append(stripped[2:].strip())
+        else:
+            # Only add to text if we haven't started seeing options yet
+            if not options:
+                text_lines.append(stripped)
+
+    return ParsedQuestion(
+        number=int(header.group(1)),
+        topic=header.group(2).strip(),
+        text=" ".join(text_lines),
+        options=options,
+    )
+
+
 def parse_questions(markdown: str) -> list[ParsedQuestion]:
     """Parse the Elicitor's Markdown response into structured questions.
 
@@ -40,47 +75,25 @@ def parse_questions(markdown: str) -> list[ParsedQuestion]:
         - Option B
     """
     questions: list[ParsedQuestion] = []
-
-    # Split on question headers: ## Question N: Topic
-    pattern = r"##\s*Question\s+(\d+)\s*:\s*(.+)"
-    headers = list(re.finditer(pattern, markdown))
+    headers = list(QUESTION_HEADER.finditer(markdown))
 
     for i, match in enumerate(headers):
-        number = int(match.group(1))
-        topic = match.group(2).strip()
-
         # Get the block of text between this header and the next (or end)
         start = match.end()
         end = headers[i + 1].start() if i + 1 < len(headers) else len(markdown)
-        block = markdown[start:end].strip()
-
-        # Split into question text and options
-        lines = [line for line in block.split("\n") if line.strip()]
-
-        text_lines: list[str] = []
-        options: list[str] = []
-        for line in lines:
-            stripped = line.strip()
-            # Lines starting with "- " are options
-            if stripped.startswith("- "):
-                options.append(stripped[2:].strip())
-            else:
-                # Only add to text if we haven't started seeing options yet
-                if not options:
-                    text_lines.append(stripped)
-
-        question_text = " ".join(text_lines)
-
-        questions.append(ParsedQuestion(
-            number=number,
-            topic=topic,
-            text=question_text,
-            options=options,
-        ))
+        questions.append(_question_from_block(match, markdown[start:end]))
 
     return questions
 
 
+class IncrementalQuestionParser(IncrementalBlockParser[ParsedQuestion]):
+    """Streaming parse_questions(): each question is returned once the next
+    header arrives (see app.agents.stream_parser)."""
+
+    def __init__(self):
+        super().__init__(QUESTION_HEADER, _question_from_block)
+
+
 class ElicitorAgent(BaseAgent):
     """Requirements Elicitor agent — asks 1-3 clarifying questions.
 
@@ -88,15 +101,17 @@ class ElicitorAgent(BaseAgent):
     """
 
     model = CLAUDE_HAIKU
+    prompt_file = "elicitor_prompt.md"
 
-    def get_system_prompt(self) -> str:
-        return self._load_prompt_file("elicitor_prompt.md")
-
-    def execute(self, input_data: dict) -> ElicitorResult:
+    def execute(
+        self, input_data: dict, on_question: Callable[[ParsedQuestion], None] | None = None
+    ) -> ElicitorResult:
         """Generate clarifying questions for a user's app idea.
 
         Args:
             input_data: {"idea": "user's app idea text"}
+            on_question: optional callback receiving each question as soon as
+                it is complete (streams the completion)
 
         Returns:
             ElicitorResult with parsed questions and token usage.
@@ -110,19 +125,33 @@ class ElicitorAgent(BaseAgent):
             user_message += f"[Codebase Context: {codebase_context}]\n\n"
         user_message += f"User's idea: {idea}"
 
+        parser = IncrementalQuestionParser() if on_question is not None else None
+
+        def report(closed: list[ParsedQuestion]) -> None:
+            first = len(parser.items) - len(closed)
+            for index, question in enumerate(closed, start=first):
+                if index < MAX_QUESTIONS:
+                    on_question(question)
+
         result: AgentResult = self._call_llm(
             user_message=user_message,
             max_tokens=1024,
             temperature=0.7,
+            on_delta=(lambda text: report(parser.feed(text))) if parser is not None else None,
+            project_type=project_type,
         )
 
-        questions = parse_questions(result.content)
+        if parser is not None:
+            report(parser.close())
+            questions = parser.items
+        else:
+            questions = parse_questions(result.content)
 
         if not questions:
             logger.warning("Elicitor returned no parseable questions. Raw output:\n%s", result.content)
 
         # Enforce the 3-question cap
-        questions = questions[:3]
+        questions = questions[:MAX_QUESTIONS]
 
         return ElicitorResult(
             questions=questions,
@@ -4,21 +4,42 @@ No LLM calls. Manages state transitions, routes to specialist agents,
 emits WebSocket events, and handles errors/retries.
 """
 
+import hashlib
 import logging
-from dataclasses import dataclass, field
+import time
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any, Callable
 
-from app.agents.elicitor import ElicitorAgent, ElicitorResult
+from app.agents.elicitor import ElicitorAgent, ElicitorResult, ParsedQuestion
 from app.agents.architect import ArchitectAgent, ArchitectResult
-from app.agents.synthesizer import SynthesizerAgent, SynthesizerResult
-from app.agents.critic import CriticAgent, CriticResult
+from app.agents.synthesizer import ParsedPrompt, SynthesizerAgent, SynthesizerResult
+from app.agents.critic import CriticAgent, CriticIssue, CriticResult, critique_from_issues, merge_critiques
+from app.agents.prompt_linter import pre_critic_action, run_lint
+from app.agents.stage_graph import Stage, StageGraph, StageUsage
+from app.config import settings
+from app.utils.llm_client import PROVIDER_UNAVAILABLE
+from app.utils.idea_index import idea_index
 
 logger = logging.getLogger(__name__)
 
 MAX_CRITIC_RETRIES = 1  # Max auto-refinement loops to avoid infinite cycles
 
+# What to do when a stage's provider is unavailable (circuit breaker open,
+# retries exhausted or no time left before the deadline): "fail" the workflow, or "skip" the stage and complete
+# with the stage listed in WorkflowState.degraded_stages.
+STAGE_FAILURE_POLICY = {
+    "elicitor": "fail",
+    "architect": "fail",
+    "synthesizer": "fail",
+    "critic": "skip",
+}
+
+# Streamed deltas are coalesced into one event per ~N chars or T seconds
+STREAM_FLUSH_CHARS = 256
+STREAM_FLUSH_INTERVAL_S = 0.25
+
 
 class WorkflowStatus(str, Enum):
     ELICITING = "eliciting"
@@ -32,6 +53,15 @@ class WorkflowStatus(str, Enum):
     FAILED = "failed"
 
 
+# Status a workflow shows while each stage runs (a resumed workflow re-enters at the first incomplete one)
+STAGE_STATUS = {
+    "elicitor": WorkflowStatus.ELICITING,
+    "architect": WorkflowStatus.PLANNING,
+    "synthesizer": WorkflowStatus.SYNTHESIZING,
+    "critic": WorkflowStatus.CRITIQUING,
+}
+
+
 @dataclass
 class WorkflowEvent:
     """A single event emitted during the workflow."""
@@ -44,6 +74,7 @@ class WorkflowEvent:
 class WorkflowState:
     """Full mutable state of a project workflow."""
     status: WorkflowStatus = WorkflowStatus.ELICITING
+    user_id: int | None = None  # Project owner; scopes per-user caches (from the project row, not persisted)
     idea: str = ""
     project_type: str = "build"
     codebase_context: str = ""
@@ -59,9 +90,93 @@ class WorkflowState:
     refinement_count: int = 0
     total_tokens: int = 0
     total_cost: float = 0.0
+    degraded_stages: list[str] = field(default_factory=list)  # Stages skipped due to provider outages
+    # "<spec hash>:<prompt hash>" → that prompt's issues; "<spec hash>:package:<package hash>" → package-level issues
+    critique_cache: dict[str, list[dict]] = field(default_factory=dict)
+    stage_runs: list[dict] = field(default_factory=list)  # StageRun per graph node: phase, timing, tokens, cost
     error: str = ""
 
 
+class WorkflowInterrupted(Exception):
+    """The workflow stopped at a stage boundary on request (e.g. worker shutdown); resume() continues it."""
+
+    def __init__(self, message: str, state: "WorkflowState"):
+        super().__init__(message)
+        self.state = state
+
+
+def completed_stages(stage_runs: list[dict]) -> set[str]:
+    """Stages whose outputs are checkpointed in the state."""
+    return {run["name"] for run in stage_runs if run["status"] == "completed"}
+
+
+def resume_status(stage_runs: list[dict]) -> WorkflowStatus:
+    """Status of the stage a resumed workflow re-enters at."""
+    done = completed_stages(stage_runs)
+    for stage, stage_status in STAGE_STATUS.items():
+        if stage not in done:
+            return stage_status
+    return WorkflowStatus.CRITIQUING
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:12]
+
+
+def _prompt_dicts(prompts: list[ParsedPrompt]) -> list[dict]:
+    """parsed_prompts entries; "hash" keys the prompt's cached critique verdict."""
+    return [
+        {"number": p.number, "title": p.title, "content": p.content, "hash": p.content_hash}
+        for p in prompts
+    ]
+
+
+def _critique_dict(critique: CriticResult) -> dict:
+    """CriticResult as stored in WorkflowState.critique_results."""
+    return {
+        "issues_found": critique.issues_found,
+        "severity": critique.severity,
+        "issues": [
+            {
+                "prompt_number": i.prompt_number,
+                "category": i.category,
+                "severity": i.severity,
+                "description": i.description,
+                "suggestion": i.suggestion,
+            }
+            for i in critique.issues
+        ],
+        "overall_assessment": critique.overall_assessment,
+    }
+
+
+class _DeltaBuffer:
+    """Coalesces streamed LLM text deltas into fewer, larger events."""
+
+    def __init__(self, emit: Callable[[str, dict], None], event_type: str):
+        self._emit = emit
+        self._event_type = event_type
+        self._parts: list[str] = []
+        self._size = 0
+        self._seq = 0
+        self._last_flush = time.monotonic()
+
+    def __call__(self, text: str) -> None:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= STREAM_FLUSH_CHARS or time.monotonic() - self._last_flush >= STREAM_FLUSH_INTERVAL_S:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._parts:
+            return
+        self._emit(self._event_type, {"delta": "".join(self._parts), "seq": self._seq})
+        self._seq += 1
+        self._parts = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+
 class Orchestrator:
     """Central workflow coordinator — no LLM, pure routing logic.
 
@@ -75,14 +190,56 @@ class Orchestrator:
 
         state = orch.approve_spec(state)
         # state.status == COMPLETED (runs synthesizer + critic automatically)
+
+    Each phase runs a StageGraph; the stages declare the WorkflowState fields
+    they read and write, so independent stages run concurrently and stages can
+    be left out per project type (WORKFLOW_SKIP_STAGES or Stage.project_types).
+
+    With stream_deltas=True the architect and synthesizer completions are
+    streamed and emitted incrementally as spec_delta / prompt_delta events
+    (each {"delta": text, "seq": n}) ahead of spec_ready / prompts_generated,
+    and each question / prompt is emitted as question_ready / prompt_ready as
+    soon as its block is complete.
+
+    checkpoint_fn is called with the state after every completed stage, so a
+    failed or interrupted workflow can resume() from its last good stage
+    instead of starting over. interrupt_fn is polled between stages; when it
+    returns True the phase stops and WorkflowInterrupted is raised.
     """
 
-    def __init__(self, emit_fn: Callable[[WorkflowEvent], None] | None = None):
+    def __init__(
+        self,
+        emit_fn: Callable[[WorkflowEvent], None] | None = None,
+        stream_deltas: bool = False,
+        checkpoint_fn: Callable[[WorkflowState], None] | None = None,
+        interrupt_fn: Callable[[], bool] | None = None,
+    ):
         self.elicitor = ElicitorAgent()
         self.architect = ArchitectAgent()
         self.synthesizer = SynthesizerAgent()
         self.critic = CriticAgent()
         self._emit_fn = emit_fn or self._default_emit
+        self._stream_deltas = stream_deltas
+        self._checkpoint_fn = checkpoint_fn
+        self._interrupt_fn = interrupt_fn
+
+        self.elicit_graph = StageGraph("elicit", [
+            Stage("elicitor", self._run_elicitor,
+                  inputs=("idea", "project_type", "codebase_context"), outputs=("questions",)),
+        ])
+        self.plan_graph = StageGraph("plan", [
+            Stage("architect", self._run_architect,
+                  inputs=("idea", "user_answers", "project_type", "codebase_context"),
+                  outputs=("spec_md", "tech_stack")),
+        ])
+        self.generate_graph = StageGraph("generate", [
+            Stage("synthesizer", self._run_synthesizer,
+                  inputs=("spec_md", "project_type", "codebase_context"),
+                  outputs=("raw_prompts", "parsed_prompts")),
+            Stage("critic", self._run_critic_loop,
+                  inputs=("spec_md", "project_type", "raw_prompts", "parsed_prompts", "critique_cache"),
+                  outputs=("raw_prompts", "parsed_prompts", "critique_results", "critique_cache")),
+        ])
 
     # ─── Event emission ──────────────────────────────────────────
 
@@ -94,6 +251,22 @@ class Orchestrator:
     def _default_emit(event: WorkflowEvent) -> None:
         logger.info("[WS] %s: %s", event.event_type, event.data.get("message", ""))
 
+    def _delta_buffer(self, event_type: str) -> _DeltaBuffer | None:
+        """Return an on_delta callback for streaming, or None when disabled."""
+        if not self._stream_deltas:
+            return None
+        return _DeltaBuffer(self._emit, event_type)
+
+    def _emit_question(self, q: ParsedQuestion) -> None:
+        self._emit("question_ready", {
+            "question": {"number": q.number, "topic": q.topic, "text": q.text, "options": q.options},
+        })
+
+    def _emit_prompt(self, p: ParsedPrompt) -> None:
+        self._emit("prompt_ready", {
+            "prompt": {"number": p.number, "title": p.title, "content": p.content},
+        })
+
     # ─── Token / cost tracking helpers ───────────────────────────
 
     @staticmethod
@@ -103,43 +276,19 @@ class Orchestrator:
 
     # ─── Workflow steps ──────────────────────────────────────────
 
-    def start_workflow(self, idea: str, project_type: str = "build", codebase_context: str = "") -> WorkflowState:
+    def start_workflow(
+        self, idea: str, project_type: str = "build", codebase_context: str = "", user_id: int | None = None
+    ) -> WorkflowState:
         """Phase 1: Elicitor generates clarifying questions.
 
-        Returns state with status AWAITING_ANSWERS.
+        Returns state with status AWAITING_ANSWERS. user_id (the project
+        owner) enables the per-user idea cache.
         """
-        state = WorkflowState(idea=idea, project_type=project_type, codebase_context=codebase_context, status=WorkflowStatus.ELICITING)
-        self._emit("progress_update", {
-            "stage": "eliciting",
-            "message": "Analyzing your request and preparing questions...",
-        })
-
-        try:
-            result: ElicitorResult = self.elicitor.execute({
-                "idea": idea,
-                "project_type": project_type,
-                "codebase_context": codebase_context,
-            })
-        except Exception as e:
-            return self._fail(state, f"Elicitor failed: {e}")
-
-        state.questions = [
-            {
-                "number": q.number,
-                "topic": q.topic,
-                "text": q.text,
-                "options": q.options,
-            }
-            for q in result.questions
-        ]
-        self._accumulate(state, result.total_tokens, result.cost_usd)
-
-        state.status = WorkflowStatus.AWAITING_ANSWERS
-        self._emit("questions_ready", {
-            "questions": state.questions,
-            "message": "Questions ready — waiting for your answers.",
-        })
-        return state
+        state = WorkflowState(
+            idea=idea, project_type=project_type, codebase_context=codebase_context,
+            status=WorkflowStatus.ELICITING, user_id=user_id,
+        )
+        return self._elicit(state)
 
     def submit_answers(self, state: WorkflowState, answers: str) -> WorkflowState:
         """Phase 2: Architect generates spec.md from idea + answers.
@@ -150,41 +299,7 @@ class Orchestrator:
             return self._fail(state, f"Cannot submit answers in status {state.status}")
 
         state.user_answers = answers
-        state.status = WorkflowStatus.PLANNING
-        self._emit("progress_update", {
-            "stage": "planning",
-            "message": "Planning your app's architecture...",
-        })
-
-        try:
-            result: ArchitectResult = self.architect.execute({
-                "idea": state.idea,
-                "questions_and_answers": answers,
-                "project_type": state.project_type,
-                "codebase_context": state.codebase_context,
-            })
-        except Exception as e:
-            return self._fail(state, f"Architect failed: {e}")
-
-        state.spec_md = result.spec_md
-        state.tech_stack = {
-            "frontend": result.tech_stack.frontend,
-            "backend": result.tech_stack.backend,
-            "database": result.tech_stack.database,
-            "styling": result.tech_stack.styling,
-        }
-        self._accumulate(state, result.total_tokens, result.cost_usd)
-
-        if not result.is_complete:
-            logger.warning("Spec missing sections: %s (proceeding anyway)", result.missing_sections)
-
-        state.status = WorkflowStatus.AWAITING_APPROVAL
-        self._emit("spec_ready", {
-            "spec_md": state.spec_md,
-            "tech_stack": state.tech_stack,
-            "message": "Spec ready — please review and approve.",
-        })
-        return state
+        return self._plan(state)
 
     def approve_spec(self, state: WorkflowState) -> WorkflowState:
         """Phase 3+4: Synthesizer → Critic → auto-refine if needed.
@@ -195,15 +310,36 @@ class Orchestrator:
             return self._fail(state, f"Cannot approve spec in status {state.status}")
 
         state.spec_approved = True
+        return self._generate(state)
 
-        # ── Synthesizer ──
-        state = self._run_synthesizer(state)
-        if state.status == WorkflowStatus.FAILED:
-            return state
+    def resume(self, state: WorkflowState) -> WorkflowState:
+        """Continue a failed or interrupted workflow from its first incomplete stage.
 
-        # ── Critic + auto-refine loop ──
-        state = self._run_critic_loop(state)
-        return state
+        Checkpointed stages are not re-run. Past the questions (which need the
+        user's answers) the workflow runs to completion, as it does after
+        submit_answers; without saved answers it goes back to AWAITING_ANSWERS.
+        """
+        done = completed_stages(state.stage_runs)
+        logger.info("Resuming workflow (checkpointed stages: %s)", sorted(done) or "none")
+        state.status = resume_status(state.stage_runs)
+        state.error = ""
+
+        if "elicitor" not in done:
+            return self._elicit(state)
+        if "architect" not in done:
+            if not state.user_answers:
+                state.status = WorkflowStatus.AWAITING_ANSWERS
+                self._emit("questions_ready", {
+                    "questions": state.questions,
+                    "message": "Questions ready — waiting for your answers.",
+                })
+                return state
+            state = self._plan(state)
+            if state.status != WorkflowStatus.AWAITING_APPROVAL:
+                return state
+
+        state.spec_approved = True
+        return self._generate(state, done=done)
 
     def request_refinement(
         self, state: WorkflowState, target_prompt: int, feedback: str
@@ -225,16 +361,14 @@ class Orchestrator:
                 "current_prompts": state.raw_prompts,
                 "target_prompt_number": target_prompt,
                 "feedback": feedback,
+                "project_type": state.project_type,
             })
         except Exception as e:
             state.status = WorkflowStatus.COMPLETED  # Revert — prompts still usable
             return self._fail(state, f"Refinement failed: {e}")
 
         state.raw_prompts = result.raw_markdown
-        state.parsed_prompts = [
-            {"number": p.number, "title": p.title, "content": p.content}
-            for p in result.prompts
-        ]
+        state.parsed_prompts = _prompt_dicts(result.prompts)
         state.refinement_history.append({
             "target_prompt": target_prompt,
             "feedback": feedback,
@@ -243,41 +377,201 @@ class Orchestrator:
         })
         self._accumulate(state, result.total_tokens, result.cost_usd)
 
+        # Re-check quality; only the refined prompt lacks a cached verdict, so this is one small audit
+        if settings.CRITIC_AFTER_USER_REFINEMENT:
+            try:
+                critique = self._critique(state)
+                state.critique_results = _critique_dict(critique)
+                self._accumulate(state, critique.total_tokens, critique.cost_usd)
+            except Exception as e:
+                logger.warning("Post-refinement critique failed: %s (keeping the refined prompts)", e)
+
         state.status = WorkflowStatus.COMPLETED
         self._emit("refinement_completed", {
             "section": target_prompt,
+            "severity": state.critique_results.get("severity"),
             "message": f"Prompt {target_prompt} refined successfully.",
         })
         return state
 
     # ─── Internal helpers ────────────────────────────────────────
 
-    def _run_synthesizer(self, state: WorkflowState) -> WorkflowState:
+    def _elicit(self, state: WorkflowState) -> WorkflowState:
+        self._run_phase(self.elicit_graph, state)
+        if state.status == WorkflowStatus.FAILED:
+            return state
+
+        state.status = WorkflowStatus.AWAITING_ANSWERS
+        self._emit("questions_ready", {
+            "questions": state.questions,
+            "message": "Questions ready — waiting for your answers.",
+        })
+        return state
+
+    def _plan(self, state: WorkflowState) -> WorkflowState:
+        self._run_phase(self.plan_graph, state)
+        if state.status == WorkflowStatus.FAILED:
+            return state
+
+        state.status = WorkflowStatus.AWAITING_APPROVAL
+        self._emit("spec_ready", {
+            "spec_md": state.spec_md,
+            "tech_stack": state.tech_stack,
+            "message": "Spec ready — please review and approve.",
+        })
+        return state
+
+    def _generate(self, state: WorkflowState, done: set[str] = frozenset()) -> WorkflowState:
+        self._run_phase(self.generate_graph, state, done)
+        if state.status == WorkflowStatus.FAILED:
+            return state
+
+        # Done — mark completed
+        state.status = WorkflowStatus.COMPLETED
+        self._emit("prompts_generated", {
+            "count": len(state.parsed_prompts),
+            "message": f"Generated {len(state.parsed_prompts)} prompts.",
+        })
+        self._emit("workflow_completed", {
+            "status": "completed",
+            "total_tokens": state.total_tokens,
+            "total_cost": round(state.total_cost, 4),
+            "degraded_stages": state.degraded_stages,
+            "message": "Workflow complete — your prompts are ready!",
+        })
+        return state
+
+    def _run_phase(self, graph: StageGraph, state: WorkflowState, done: set[str] = frozenset()) -> None:
+        """Run a phase's stage graph, checkpointing after each completed stage.
+
+        Adds each stage's usage to the totals and records its StageRun. Raises
+        WorkflowInterrupted if interrupt_fn stopped the phase early.
+        """
+        def finished(run) -> None:
+            self._accumulate(state, run.tokens, run.cost)
+            state.stage_runs.append({"phase": graph.name, **asdict(run)})
+            if run.status == "completed" and self._checkpoint_fn is not None:
+                try:
+                    self._checkpoint_fn(state)
+                except Exception:
+                    logger.exception("Checkpoint after stage %s failed", run.name)
+
+        runs = graph.run(
+            state,
+            state.project_type,
+            failed=lambda s: s.status == WorkflowStatus.FAILED,
+            interrupted=self._interrupt_fn,
+            skip=settings.WORKFLOW_SKIP_STAGES.get(state.project_type, ()),
+            done=done,
+            on_finished=finished,
+        )
+        stopped = [run.name for run in runs if run.status == "not_run"]
+        if stopped and state.status != WorkflowStatus.FAILED:
+            raise WorkflowInterrupted(f"{graph.name} phase interrupted before {', '.join(stopped)}", state)
+
+    def _run_elicitor(self, state: WorkflowState) -> StageUsage:
+        state.status = WorkflowStatus.ELICITING
+        self._emit("progress_update", {
+            "stage": "eliciting",
+            "message": "Analyzing your request and preparing questions...",
+        })
+
+        # Near-duplicate ideas from the same user reuse earlier questions;
+        # codebase-specific requests always go to the Elicitor.
+        use_idea_cache = settings.IDEA_CACHE_ENABLED and state.user_id is not None and not state.codebase_context
+        match = idea_index.lookup(state.user_id, state.project_type, state.idea) if use_idea_cache else None
+
+        usage = StageUsage()
+        if match is not None:
+            logger.info("Idea cache hit (similarity %.2f to %r) — reusing questions", match.similarity, match.idea)
+            questions: list[ParsedQuestion] = [ParsedQuestion(**q) for q in match.questions]
+        else:
+            try:
+                result: ElicitorResult = self.elicitor.execute({
+                    "idea": state.idea,
+                    "project_type": state.project_type,
+                    "codebase_context": state.codebase_context,
+                }, on_question=self._emit_question if self._stream_deltas else None)
+            except Exception as e:
+                self._fail(state, f"Elicitor failed: {e}")
+                return usage
+
+            questions = result.questions
+            usage.add(result.total_tokens, result.cost_usd)
+            if use_idea_cache:
+                idea_index.add(state.user_id, state.project_type, state.idea, [asdict(q) for q in questions])
+
+        state.questions = [
+            {
+                "number": q.number,
+                "topic": q.topic,
+                "text": q.text,
+                "options": q.options,
+            }
+            for q in questions
+        ]
+        return usage
+
+    def _run_architect(self, state: WorkflowState) -> StageUsage:
+        state.status = WorkflowStatus.PLANNING
+        self._emit("progress_update", {
+            "stage": "planning",
+            "message": "Planning your app's architecture...",
+        })
+
+        deltas = self._delta_buffer("spec_delta")
+        try:
+            result: ArchitectResult = self.architect.execute({
+                "idea": state.idea,
+                "questions_and_answers": state.user_answers,
+                "project_type": state.project_type,
+                "codebase_context": state.codebase_context,
+            }, on_delta=deltas)
+        except Exception as e:
+            self._fail(state, f"Architect failed: {e}")
+            return StageUsage()
+        if deltas is not None:
+            deltas.flush()
+
+        state.spec_md = result.spec_md
+        state.tech_stack = {
+            "frontend": result.tech_stack.frontend,
+            "backend": result.tech_stack.backend,
+            "database": result.tech_stack.database,
+            "styling": result.tech_stack.styling,
+        }
+
+        if not result.is_complete:
+            logger.warning("Spec missing sections: %s (proceeding anyway)", result.missing_sections)
+        return StageUsage(result.total_tokens, result.cost_usd)
+
+    def _run_synthesizer(self, state: WorkflowState) -> StageUsage:
         state.status = WorkflowStatus.SYNTHESIZING
         self._emit("progress_update", {
             "stage": "synthesizing",
             "message": "Writing optimized prompts...",
         })
 
+        deltas = self._delta_buffer("prompt_delta")
         try:
             result: SynthesizerResult = self.synthesizer.execute({
                 "spec_md": state.spec_md,
                 "project_type": state.project_type,
                 "codebase_context": state.codebase_context,
-            })
+            }, on_delta=deltas, on_prompt=self._emit_prompt if self._stream_deltas else None)
         except Exception as e:
-            return self._fail(state, f"Synthesizer failed: {e}")
+            self._fail(state, f"Synthesizer failed: {e}")
+            return StageUsage()
+        if deltas is not None:
+            deltas.flush()
 
         state.raw_prompts = result.raw_markdown
-        state.parsed_prompts = [
-            {"number": p.number, "title": p.title, "content": p.content}
-            for p in result.prompts
-        ]
-        self._accumulate(state, result.total_tokens, result.cost_usd)
-        return state
+        state.parsed_prompts = _prompt_dicts(result.prompts)
+        return StageUsage(result.total_tokens, result.cost_usd)
 
-    def _run_critic_loop(self, state: WorkflowState) -> WorkflowState:
+    def _run_critic_loop(self, state: WorkflowState) -> StageUsage:
         """Run Critic, auto-refine up to MAX_CRITIC_RETRIES if major/critical."""
+        usage = StageUsage()
         for attempt in range(1 + MAX_CRITIC_RETRIES):
             state.status = WorkflowStatus.CRITIQUING
             self._emit("progress_update", {
@@ -286,30 +580,20 @@ class Orchestrator:
             })
 
             try:
-                critique: CriticResult = self.critic.execute({
-                    "spec_md": state.spec_md,
-                    "prompts_markdown": state.raw_prompts,
-                    "project_type": state.project_type,
-                })
+                critique = self._critique(state)
+            except PROVIDER_UNAVAILABLE as e:
+                if not self._degrade(state, "critic", e):
+                    self._fail(state, f"Critic failed: {e}")
+                    return usage
+                # After an auto-refine the previous critique describes prompts that were replaced
+                state.critique_results = {"skipped": True, "reason": str(e), "attempt": attempt}
+                break
             except Exception as e:
-                return self._fail(state, f"Critic failed: {e}")
-
-            state.critique_results = {
-                "issues_found": critique.issues_found,
-                "severity": critique.severity,
-                "issues": [
-                    {
-                        "prompt_number": i.prompt_number,
-                        "category": i.category,
-                        "severity": i.severity,
-                        "description": i.description,
-                        "suggestion": i.suggestion,
-                    }
-                    for i in critique.issues
-                ],
-                "overall_assessment": critique.overall_assessment,
-            }
-            self._accumulate(state, critique.total_tokens, critique.cost_usd)
+                self._fail(state, f"Critic failed: {e}")
+                return usage
+
+            state.critique_results = _critique_dict(critique)
+            usage.add(critique.total_tokens, critique.cost_usd)
 
             if not critique.needs_refinement:
                 break
@@ -323,42 +607,109 @@ class Orchestrator:
                     "message": "Auto-refining prompts based on quality review...",
                 })
 
-                feedback = "\n".join(
-                    f"- Prompt {i.prompt_number} ({i.category}): {i.description}. Suggestion: {i.suggestion}"
-                    for i in critique.major_issues
-                )
+                # Issues tied to specific prompts are fixed one prompt at a time (spliced, so
+                # the rest of the package keeps its hashes and cached verdicts); package-level
+                # issues need the whole package regenerated
+                issues = critique.major_issues
+                numbers = sorted({i.prompt_number for i in issues})
+                targets = [0] if 0 in numbers else numbers
 
                 try:
-                    refined: SynthesizerResult = self.synthesizer.refine_section({
-                        "spec_md": state.spec_md,
-                        "current_prompts": state.raw_prompts,
-                        "target_prompt_number": 0,  # 0 = refine all flagged
-                        "feedback": f"Quality review feedback — please address these issues:\n{feedback}",
-                    })
+                    for target in targets:
+                        feedback = "\n".join(
+                            f"- Prompt {i.prompt_number} ({i.category}): {i.description}. Suggestion: {i.suggestion}"
+                            for i in issues if target in (0, i.prompt_number)
+                        )
+                        refined: SynthesizerResult = self.synthesizer.refine_section({
+                            "spec_md": state.spec_md,
+                            "current_prompts": state.raw_prompts,
+                            "target_prompt_number": target,  # 0 = refine all flagged
+                            "feedback": f"Quality review feedback — please address these issues:\n{feedback}",
+                            "project_type": state.project_type,
+                        })
+                        state.raw_prompts = refined.raw_markdown
+                        state.parsed_prompts = _prompt_dicts(refined.prompts)
+                        usage.add(refined.total_tokens, refined.cost_usd)
                 except Exception as e:
                     logger.warning("Auto-refinement failed: %s (proceeding with current prompts)", e)
                     break
-
-                state.raw_prompts = refined.raw_markdown
-                state.parsed_prompts = [
-                    {"number": p.number, "title": p.title, "content": p.content}
-                    for p in refined.prompts
-                ]
-                self._accumulate(state, refined.total_tokens, refined.cost_usd)
-
-        # Done — mark completed
-        state.status = WorkflowStatus.COMPLETED
-        self._emit("prompts_generated", {
-            "count": len(state.parsed_prompts),
-            "message": f"Generated {len(state.parsed_prompts)} prompts.",
-        })
-        self._emit("workflow_completed", {
-            "status": "completed",
-            "total_tokens": state.total_tokens,
-            "total_cost": round(state.total_cost, 4),
-            "message": "Workflow complete — your prompts are ready!",
+        return usage
+
+    def _critique(self, state: WorkflowState) -> CriticResult:
+        """Lint the package, then LLM-audit only prompts without a cached verdict.
+
+        Verdicts are cached per (spec hash, prompt hash) in state.critique_cache,
+        so after a refinement only the changed prompts are re-audited; their
+        fresh findings are merged with the cached ones. Package-level findings
+        (prompt_number 0) are cached per (spec hash, package hash): reused while
+        no prompt changed, and while any are outstanding a changed package is
+        re-audited in full, since a partial audit can't tell whether they were
+        fixed. Raises the Critic's provider errors.
+        """
+        prompts = [ParsedPrompt(p["number"], p["title"], p["content"]) for p in state.parsed_prompts]
+
+        # Structural lint first; a clean, small package may not need the full LLM audit
+        lint = run_lint(state.spec_md, prompts, state.project_type)
+        action = pre_critic_action(lint.issues, len(prompts), state.project_type)
+        logger.info(
+            "Pre-critic lint: %d issue(s) in %.1fms — LLM audit: %s", len(lint.issues), lint.latency_ms, action
+        )
+        if action == "skip":
+            return lint
+
+        spec_hash = _content_hash(state.spec_md)
+        # Verdicts given against another spec no longer apply
+        cache = {k: v for k, v in state.critique_cache.items() if k.startswith(f"{spec_hash}:")}
+        keys = {p.number: f"{spec_hash}:{p.content_hash}" for p in prompts}
+        package_key = f"{spec_hash}:package:{_content_hash(''.join(keys.values()))}"
+        stale = [p.number for p in prompts if keys[p.number] not in cache]
+        if stale and any(issues for key, issues in cache.items() if key.startswith(f"{spec_hash}:package:")):
+            stale = [p.number for p in prompts]
+
+        parts = [lint] if lint.issues else []
+        cached = [CriticIssue(**issue) for p in prompts if keys[p.number] in cache for issue in cache[keys[p.number]]]
+        if not stale:
+            cached += [CriticIssue(**issue) for issue in cache.get(package_key, [])]
+        if cached or not stale:
+            parts.append(critique_from_issues(cached, "Unchanged prompts: cached verdicts reused.", model="critique_cache"))
+
+        if stale:
+            critic_input = {
+                "spec_md": state.spec_md,
+                "prompts_markdown": state.raw_prompts,
+                "project_type": state.project_type,
+                "structure_checked": not lint.issues,
+            }
+            if len(stale) < len(prompts):
+                critic_input["audit_numbers"] = stale
+            if action == "shrink":
+                critic_input["max_tokens"] = settings.CRITIC_SHRUNK_MAX_TOKENS
+            fresh = self.critic.execute(critic_input)
+            parts.append(fresh)
+            if not any(i.category == "parse_error" for i in fresh.issues):
+                for number in stale:
+                    cache[keys[number]] = [asdict(i) for i in fresh.issues if i.prompt_number == number]
+                cache[package_key] = [asdict(i) for i in fresh.issues if i.prompt_number == 0]
+
+        # Keep verdicts for the current package only, so the cache stays package-sized
+        state.critique_cache = {key: cache[key] for key in (*keys.values(), package_key) if key in cache}
+        logger.info(
+            "Critique: %d prompt(s) audited, %d verdict(s) reused from cache", len(stale), len(prompts) - len(stale)
+        )
+        return merge_critiques(parts, latency_ms=sum(part.latency_ms for part in parts))
+
+    def _degrade(self, state: WorkflowState, stage: str, error: Exception) -> bool:
+        """Apply STAGE_FAILURE_POLICY; True if the stage was skipped instead of failing."""
+        if STAGE_FAILURE_POLICY.get(stage) != "skip":
+            return False
+        logger.warning("Skipping %s stage — provider unavailable: %s", stage, error)
+        if stage not in state.degraded_stages:
+            state.degraded_stages.append(stage)
+        self._emit("progress_update", {
+            "stage": stage,
+            "message": f"Skipping {stage} review — provider temporarily unavailable.",
         })
-        return state
+        return True
 
     def _fail(self, state: WorkflowState, error: str) -> WorkflowState:
         logger.error("Workflow failed: %s", error)
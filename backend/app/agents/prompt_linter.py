@@ -0,0 +1,154 @@
+"""Deterministic structural checks on a prompt package, run before the LLM Critic.
+
+Many Critic findings are structural and need no model to spot: duplicate or
+skipped prompt numbers, empty prompt bodies, fewer prompts than the spec has
+build stages, more prompts than the project type calls for, or a chosen
+technology that no prompt mentions. lint_prompts() finds those in
+milliseconds and reports them as CriticIssues, so they feed the same
+refinement loop as LLM findings.
+
+pre_critic_action() applies PRE_CRITIC_POLICY: when the lint is clean and
+the package is small, the LLM audit can be skipped or run with a smaller
+budget.
+"""
+
+import re
+import time
+
+from app.agents.architect import parse_tech_stack
+from app.agents.critic import CriticIssue, CriticResult, critique_from_issues
+from app.agents.synthesizer import ParsedPrompt
+from app.config import settings
+from app.utils.markdown_index import SectionIndex
+
+MIN_PROMPT_CHARS = 50  # Shorter bodies are reported as empty
+
+# Upper bound on package size per project type (see synthesizer_prompt.md)
+MAX_PROMPTS_BY_TYPE = {
+    "enhance": 3,
+    "refactor": 2,
+    "debug": 2,
+}
+
+STAGE_SECTIONS = ("build stages", "implementation stages")
+_STAGE_HEADER = re.compile(r"stage\s+\d+", re.IGNORECASE)
+
+
+def _stage_count(index: SectionIndex) -> int:
+    """Number of "### Stage N" headers under the spec's stages section."""
+    for section in index:
+        if section.level == 2 and section.title.lower().startswith(STAGE_SECTIONS):
+            return sum(
+                1 for sub in index
+                if sub.level == 3 and section.start < sub.start < section.end and _STAGE_HEADER.match(sub.title)
+            )
+    return 0
+
+
+def _mentioned(choice: str, text: str) -> bool:
+    """Whether the core name of a tech choice, e.g. "Next.js" of "Next.js 14 (App Router)", appears in text."""
+    name = choice.split("(")[0].strip().split(" ")[0].lower()
+    return not name or name in text
+
+
+def lint_prompts(spec_md: str, prompts: list[ParsedPrompt], project_type: str = "build") -> list[CriticIssue]:
+    """Structural issues in a prompt package, in the Critic's issue format."""
+    if not prompts:
+        return [CriticIssue(
+            prompt_number=0,
+            category="missing_prompts",
+            severity="critical",
+            description="The package contains no parseable \"## Prompt N: Title\" sections.",
+            suggestion="Regenerate the package using the required prompt headers.",
+        )]
+
+    issues: list[CriticIssue] = []
+    numbers = [p.number for p in prompts]
+
+    duplicates = sorted({n for n in numbers if numbers.count(n) > 1})
+    for number in duplicates:
+        issues.append(CriticIssue(
+            prompt_number=number,
+            category="numbering",
+            severity="major",
+            description=f"Prompt number {number} is used more than once.",
+            suggestion="Number prompts sequentially from 1 without repeats.",
+        ))
+    if not duplicates and numbers != list(range(1, len(prompts) + 1)):
+        issues.append(CriticIssue(
+            prompt_number=0,
+            category="numbering",
+            severity="major",
+            description=f"Prompts are numbered {numbers} instead of 1 to {len(prompts)} in order.",
+            suggestion="Number prompts sequentially from 1 without gaps.",
+        ))
+
+    for prompt in prompts:
+        if len(prompt.content.strip().rstrip("-").strip()) < MIN_PROMPT_CHARS:
+            issues.append(CriticIssue(
+                prompt_number=prompt.number,
+                category="empty_prompt",
+                severity="major",
+                description=f"Prompt {prompt.number} ({prompt.title}) has no real instructions.",
+                suggestion="Write out the role, context, task, requirements and success criteria.",
+            ))
+
+    index = SectionIndex(spec_md)
+    max_prompts = MAX_PROMPTS_BY_TYPE.get(project_type)
+    if max_prompts is not None and len(prompts) > max_prompts:
+        issues.append(CriticIssue(
+            prompt_number=0,
+            category="over_engineering",
+            severity="major",
+            description=f"{len(prompts)} prompts for a {project_type} project; at most {max_prompts} are expected.",
+            suggestion="Merge or drop prompts that go beyond the requested change.",
+        ))
+    elif project_type == "build":
+        stages = _stage_count(index)
+        if len(prompts) < stages:
+            issues.append(CriticIssue(
+                prompt_number=0,
+                category="missing_stage",
+                severity="major",
+                description=f"The spec lists {stages} build stages but the package has only {len(prompts)} prompts.",
+                suggestion="Cover every build stage with at least one prompt.",
+            ))
+
+        text = "\n".join(f"{p.title}\n{p.content}" for p in prompts).lower()
+        stack = parse_tech_stack(spec_md, index)
+        for layer, choice in vars(stack).items():
+            if choice and not _mentioned(choice, text):
+                # Only a heuristic on the choice's first word (prompts may say "Postgres" for
+                # "PostgreSQL"), so it is reported but never triggers a refinement on its own
+                issues.append(CriticIssue(
+                    prompt_number=0,
+                    category="tech_stack",
+                    severity="minor",
+                    description=f"The spec's {layer} choice ({choice}) is not mentioned in any prompt.",
+                    suggestion=f"Name {choice} explicitly in the prompts that build the {layer}.",
+                ))
+
+    return issues
+
+
+def pre_critic_action(issues: list[CriticIssue], prompt_count: int, project_type: str) -> str:
+    """What to do with the LLM audit: "full", "shrink" (smaller budget) or "skip".
+
+    Only a clean lint on a package of at most PRE_CRITIC_SMALL_PACKAGE_PROMPTS
+    prompts can reduce the audit; otherwise it runs in full.
+    """
+    if issues or prompt_count > settings.PRE_CRITIC_SMALL_PACKAGE_PROMPTS:
+        return "full"
+    return settings.PRE_CRITIC_POLICY.get(project_type, "full")
+
+
+def run_lint(spec_md: str, prompts: list[ParsedPrompt], project_type: str = "build") -> CriticResult:
+    """lint_prompts() timed and wrapped as a CriticResult."""
+    start = time.monotonic()
+    issues = lint_prompts(spec_md, prompts, project_type)
+    return critique_from_issues(
+        issues,
+        f"Structural lint found {len(issues)} issue(s)." if issues else "Structural lint passed.",
+        model="prompt_linter",
+        latency_ms=(time.monotonic() - start) * 1000,
+    )
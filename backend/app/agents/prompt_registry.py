@@ -0,0 +1,126 @@
+"""Process-wide registry of agent system prompt templates.
+
+All of agents/prompts/*.md are read once (at worker start, or on first use)
+instead of on every LLM call. A template can have per-project-type variants
+next to it, named <name>.<project_type>.md:
+
+    critic_prompt.md          default
+    critic_prompt.debug.md    used for project_type="debug"
+
+Each template carries a stable content hash, so caches and cost ledgers can
+key on the prompt version. With PROMPT_HOT_RELOAD (default: on when DEBUG)
+the directory is re-checked at most once per RELOAD_CHECK_SECONDS and
+reloaded when any file's mtime changes.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = Path(__file__).parent / "prompts"
+RELOAD_CHECK_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """One loaded prompt file."""
+    name: str                 # Default template file name, e.g. "critic_prompt.md"
+    project_type: str | None  # None for the default template
+    text: str
+    content_hash: str         # First 12 hex chars of the SHA-256 of text
+
+    @property
+    def version(self) -> str:
+        """Identifier for logs and ledgers, e.g. "critic_prompt.debug.md@3f2a9c1d0b7e"."""
+        stem, _, suffix = self.name.rpartition(".")
+        filename = f"{stem}.{self.project_type}.{suffix}" if self.project_type else self.name
+        return f"{filename}@{self.content_hash}"
+
+
+def _parse_filename(path: Path) -> tuple[str, str | None]:
+    """Split e.g. critic_prompt.debug.md into ("critic_prompt.md", "debug")."""
+    stem, _, variant = path.stem.partition(".")
+    return f"{stem}{path.suffix}", variant or None
+
+
+class PromptRegistry:
+    """Loads prompt templates once and serves them from memory."""
+
+    def __init__(self, directory: Path = PROMPTS_DIR, hot_reload: bool | None = None):
+        self.directory = directory
+        self._hot_reload = hot_reload
+        self._templates: dict[tuple[str, str | None], PromptTemplate] = {}
+        self._mtimes: dict[Path, float] = {}
+        self._loaded = False
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def hot_reload(self) -> bool:
+        if self._hot_reload is not None:
+            return self._hot_reload
+        if settings.PROMPT_HOT_RELOAD is not None:
+            return settings.PROMPT_HOT_RELOAD
+        return settings.DEBUG
+
+    def _scan(self) -> dict[Path, float]:
+        return {path: path.stat().st_mtime for path in sorted(self.directory.glob("*.md"))}
+
+    def load(self) -> None:
+        """(Re)read every template in the directory."""
+        mtimes = self._scan()
+        templates = {}
+        for path in mtimes:
+            name, project_type = _parse_filename(path)
+            text = path.read_text()
+            templates[(name, project_type)] = PromptTemplate(
+                name=name,
+                project_type=project_type,
+                text=text,
+                content_hash=hashlib.sha256(text.encode()).hexdigest()[:12],
+            )
+        with self._lock:
+            self._templates = templates
+            self._mtimes = mtimes
+            self._loaded = True
+            self._last_check = time.monotonic()
+        logger.info("Loaded %d prompt templates from %s", len(templates), self.directory)
+
+    def _ensure_fresh(self) -> None:
+        if not self._loaded:
+            self.load()
+            return
+        if not self.hot_reload or time.monotonic() - self._last_check < RELOAD_CHECK_SECONDS:
+            return
+        self._last_check = time.monotonic()
+        if self._scan() != self._mtimes:
+            logger.info("Prompt templates changed on disk — reloading")
+            self.load()
+
+    def get(self, name: str, project_type: str | None = None) -> PromptTemplate:
+        """Template for name, preferring the project_type variant when one exists."""
+        self._ensure_fresh()
+        templates = self._templates
+        template = templates.get((name, project_type)) or templates.get((name, None))
+        if template is None:
+            raise FileNotFoundError(f"No prompt template {name!r} in {self.directory}")
+        return template
+
+    def versions(self) -> dict[str, str]:
+        """Content hash of every loaded template, keyed by file name."""
+        self._ensure_fresh()
+        return {
+            t.name if t.project_type is None else f"{t.name} [{t.project_type}]": t.content_hash
+            for t in self._templates.values()
+        }
+
+
+# Singleton instance (per worker process)
+prompt_registry = PromptRegistry()
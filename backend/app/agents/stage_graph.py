@@ -0,0 +1,178 @@
+"""Declarative stage graph for the Orchestrator's workflow phases.
+
+Each Stage names the WorkflowState fields it reads (inputs) and writes
+(outputs). A stage depends on every earlier-declared stage that writes one of
+its inputs or outputs, or reads one of its outputs, so declaration order only
+matters between stages that share state. Stages whose dependencies are done
+run together on a thread pool, each in a copy of the caller's context so the
+workflow deadline carries over; a lone ready stage runs inline.
+
+Bookkeeping fields every stage touches (status, totals, error) are not
+declared. A stage reports failure the Orchestrator's way, by setting the
+state to FAILED; the graph then starts nothing further and lets stages
+already running finish. The same happens when the caller asks to be
+interrupted (e.g. a worker shutting down). Every node yields a StageRun with
+its timing, tokens and cost, handed to on_finished as soon as the node ends so
+the caller can checkpoint; stages listed as done (checkpointed by an earlier
+run) are not re-run.
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Collection
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_stage_executor = ThreadPoolExecutor(max_workers=settings.WORKFLOW_STAGE_WORKERS, thread_name_prefix="workflow-stage")
+
+
+@dataclass
+class StageUsage:
+    """LLM usage of one stage run."""
+    tokens: int = 0
+    cost: float = 0.0
+
+    def add(self, tokens: int, cost: float) -> None:
+        self.tokens += tokens
+        self.cost += cost
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[[Any], StageUsage]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    project_types: tuple[str, ...] | None = None  # None = every project type
+
+
+@dataclass
+class StageRun:
+    """What happened to one stage: "completed", "failed", "skipped" (not planned) or "not_run" (stopped early)."""
+    name: str
+    status: str
+    duration_ms: float = 0.0
+    tokens: int = 0
+    cost: float = 0.0
+
+
+def _depends(earlier: Stage, later: Stage) -> bool:
+    writes = set(earlier.outputs)
+    return bool(writes & set(later.inputs) or writes & set(later.outputs) or set(earlier.inputs) & set(later.outputs))
+
+
+class StageGraph:
+    """Stages of one workflow phase, run in dependency order."""
+
+    def __init__(self, name: str, stages: list[Stage]):
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names in {name} graph: {names}")
+        self.name = name
+        self.stages = stages
+        self.depends_on = {
+            stage.name: {earlier.name for earlier in stages[:i] if _depends(earlier, stage)}
+            for i, stage in enumerate(stages)
+        }
+
+    def plan(
+        self, project_type: str, skip: Collection[str] = (), done: Collection[str] = ()
+    ) -> list[Stage]:
+        """Stages still to run for this project type.
+
+        Dropping a stage whose outputs a kept stage reads is an error; stages in
+        done already produced their outputs.
+        """
+        active = [
+            stage for stage in self.stages
+            if stage.name not in skip and (stage.project_types is None or project_type in stage.project_types)
+        ]
+        dropped = [stage for stage in self.stages if stage not in active and stage.name not in done]
+        active = [stage for stage in active if stage.name not in done]
+        for stage in active:
+            for other in dropped:
+                if self.stages.index(other) < self.stages.index(stage) and set(other.outputs) & set(stage.inputs):
+                    raise ValueError(
+                        f"{self.name} graph: {stage.name} reads {sorted(set(other.outputs) & set(stage.inputs))} "
+                        f"from {other.name}, which is skipped for {project_type} projects"
+                    )
+        return active
+
+    def run(
+        self,
+        state: Any,
+        project_type: str,
+        failed: Callable[[Any], bool],
+        interrupted: Callable[[], bool] | None = None,
+        skip: Collection[str] = (),
+        done: Collection[str] = (),
+        on_finished: Callable[[StageRun], None] | None = None,
+    ) -> list[StageRun]:
+        """Run the planned stages; returns a StageRun per declared stage not in done, in declaration order.
+
+        on_finished is called from the calling thread. Exceptions raised by a
+        stage propagate once stages already running have finished.
+        """
+        planned = self.plan(project_type, skip, done)
+        runs = {stage.name: StageRun(stage.name, "skipped") for stage in self.stages if stage.name not in done}
+        finished = {stage.name for stage in self.stages if stage not in planned}
+        pending = list(planned)
+        in_flight: dict[Future, Stage] = {}
+        error: Exception | None = None
+
+        def should_stop() -> bool:
+            return error is not None or failed(state) or (interrupted is not None and interrupted())
+
+        def record(run: StageRun) -> None:
+            runs[run.name] = run
+            finished.add(run.name)
+            if on_finished is not None:
+                on_finished(run)
+
+        stopped = should_stop()
+        while pending or in_flight:
+            ready = [] if stopped else [s for s in pending if self.depends_on[s.name] <= finished]
+            if len(ready) == 1 and not in_flight:
+                pending.remove(ready[0])
+                record(_execute(ready[0], state, failed))
+                stopped = should_stop()
+                continue
+
+            for stage in ready:
+                pending.remove(stage)
+                future = _stage_executor.submit(contextvars.copy_context().run, _execute, stage, state, failed)
+                in_flight[future] = stage
+            if not in_flight:
+                break
+
+            completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in completed:
+                stage = in_flight.pop(future)
+                try:
+                    record(future.result())
+                except Exception as e:
+                    error = error or e
+                    record(StageRun(stage.name, "failed"))
+            stopped = stopped or should_stop()
+
+        for stage in pending:
+            runs[stage.name].status = "not_run"
+        if error is not None:
+            raise error
+        return [runs[stage.name] for stage in self.stages if stage.name in runs]
+
+
+def _execute(stage: Stage, state: Any, failed: Callable[[Any], bool]) -> StageRun:
+    start = time.monotonic()
+    usage = stage.run(state) or StageUsage()
+    duration_ms = (time.monotonic() - start) * 1000
+    status = "failed" if failed(state) else "completed"
+    logger.info(
+        "Stage %s %s in %.0fms (%d tokens, $%.4f)", stage.name, status, duration_ms, usage.tokens, usage.cost
+    )
+    return StageRun(stage.name, status, duration_ms, usage.tokens, usage.cost)
@@ -0,0 +1,82 @@
+"""Incremental parsing of "## <Kind> N: Title" blocks from streamed LLM output.
+
+The batch parsers (parse_prompts, parse_questions) need the whole completion.
+IncrementalBlockParser takes text chunks as they arrive and returns each item
+as soon as its block is closed — by the next header, or by a sentinel such as
+"## Final Notes" — so the first prompt can be shown while later ones are
+still generating.
+
+Items are built by the same per-block function the batch parser uses, from
+the same slice of text, so feeding a completion in any chunking and calling
+close() yields exactly the batch result. A header only counts once text after
+it proves the regex can't match differently: its title line must be
+terminated, and it must not be a whitespace title that more text could
+replace. The buffer is cut back to the open block whenever a header settles,
+so each chunk costs work proportional to the open block, not the whole
+completion.
+"""
+
+import re
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class IncrementalBlockParser(Generic[T]):
+    """Feed chunks with feed(); call close() once the stream ends."""
+
+    def __init__(
+        self,
+        header: re.Pattern,
+        build: Callable[[re.Match, str], T],
+        sentinels: tuple[str, ...] = (),
+    ):
+        self._header = header
+        self._build = build
+        self._sentinels = sentinels
+        self._text = ""                     # Unconsumed text: the open block (or the preamble)
+        self._open: re.Match | None = None  # Last settled header whose block is unfinished
+        self._open_emitted = False          # Its block was already closed by a sentinel
+        self.items: list[T] = []
+
+    def feed(self, chunk: str) -> list[T]:
+        """Add streamed text; returns items whose blocks closed."""
+        self._text += chunk
+        return self._advance(final=False)
+
+    def close(self) -> list[T]:
+        """End of stream: returns the remaining items."""
+        return self._advance(final=True)
+
+    @staticmethod
+    def _settled(match: re.Match, text: str) -> bool:
+        """Whether more text can no longer change this header match."""
+        title = match.group(match.lastindex)
+        return match.end() < len(text) and not title[:1].isspace()
+
+    def _advance(self, final: bool) -> list[T]:
+        text = self._text
+        closed: list[T] = []
+        block_start = 0  # The buffer starts where the open header's block does
+        unsettled_from = len(text)
+
+        # The header regexes aren't anchored, so scanning the cut buffer from 0 finds
+        # the same matches as scanning the whole completion from the last settled header
+        for match in self._header.finditer(text):
+            if not final and not self._settled(match, text):
+                unsettled_from = match.start()
+                break
+            if self._open is not None and not self._open_emitted:
+                closed.append(self._build(self._open, text[block_start:match.start()]))
+            self._open, self._open_emitted = match, False
+            block_start = match.end()
+
+        if self._open is not None and not self._open_emitted:
+            block = text[block_start:unsettled_from]
+            if final or any(s in block for s in self._sentinels):
+                closed.append(self._build(self._open, block))
+                self._open_emitted = True
+
+        self._text = text[block_start:]
+        self.items.extend(closed)
+        return closed
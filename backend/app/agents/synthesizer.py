@@ -1,9 +1,15 @@
+import hashlib
 import logging
 import re
 from dataclasses import dataclass, field
+from typing import Callable
 
 from app.agents.base_agent import AgentResult, BaseAgent
+from app.agents.stream_parser import IncrementalBlockParser
+from app.config import settings
 from app.utils.llm_client import CLAUDE_SONNET
+from app.utils.llm_rate_limiter import estimate_tokens
+from app.utils.markdown_index import SectionIndex
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +21,11 @@ class ParsedPrompt:
     title: str
     content: str  # Full markdown content of this prompt section
 
+    @property
+    def content_hash(self) -> str:
+        """Stable hash of title and content; keys per-prompt critique verdicts."""
+        return hashlib.sha256(f"{self.title}\n{self.content}".encode()).hexdigest()[:12]
+
 
 @dataclass
 class SynthesizerResult:
@@ -29,39 +40,119 @@ class SynthesizerResult:
     latency_ms: float = 0
 
 
+PROMPT_HEADER = re.compile(r"##\s*Prompt\s+(\d+)\s*:\s*(.+)")
+PROMPT_SENTINELS = ("## Final Notes", "## Instructions for Use")
+
+
+def _prompt_from_block(header: re.Match, block: str) -> ParsedPrompt:
+    """Build one prompt from its header match and the text up to the next header."""
+    # Stop at "## Final Notes" or "## Instructions" if they come before the next prompt
+    for sentinel in PROMPT_SENTINELS:
+        idx = block.find(sentinel)
+        if idx != -1:
+            block = block[:idx]
+
+    return ParsedPrompt(
+        number=int(header.group(1)),
+        title=header.group(2).strip(),
+        content=block.strip(),
+    )
+
+
 def parse_prompts(markdown: str) -> list[ParsedPrompt]:
     """Parse the Synthesizer's output into individual prompts.
 
     Looks for ## Prompt N: Title headers and splits content between them.
     """
     prompts: list[ParsedPrompt] = []
-
-    pattern = r"##\s*Prompt\s+(\d+)\s*:\s*(.+)"
-    headers = list(re.finditer(pattern, markdown))
+    headers = list(PROMPT_HEADER.finditer(markdown))
 
     for i, match in enumerate(headers):
-        number = int(match.group(1))
-        title = match.group(2).strip()
-
         start = match.end()
         end = headers[i + 1].start() if i + 1 < len(headers) else len(markdown)
+        prompts.append(_prompt_from_block(match, markdown[start:end]))
+
+    return prompts
+
+
+def _strip_fences(raw: str) -> str:
+    """Strip wrapping ```markdown fences if present."""
+    raw = raw.strip()
+    if raw.startswith("```"):
+        first_newline = raw.index("\n")
+        raw = raw[first_newline + 1:]
+    if raw.endswith("```"):
+        raw = raw[:-3].rstrip()
+    return raw
+
+
+_TRAILING_RULE = re.compile(r"\n+(?:-{3,}|\*{3,})\s*$")
 
-        # Stop at "## Final Notes" or "## Instructions" if they come before the next prompt
-        block = markdown[start:end]
-        for sentinel in ["## Final Notes", "## Instructions for Use"]:
-            idx = block.find(sentinel)
+
+def splice_prompt(markdown: str, prompt: ParsedPrompt) -> str:
+    """Replace the block of prompt.number in a prompt package, keeping everything else verbatim.
+
+    The block spans what parse_prompts() would give that prompt, so text
+    after it ("## Final Notes", separators between prompts) is untouched.
+    """
+    headers = list(PROMPT_HEADER.finditer(markdown))
+    for i, match in enumerate(headers):
+        if int(match.group(1)) != prompt.number:
+            continue
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(markdown)
+        for sentinel in PROMPT_SENTINELS:
+            idx = markdown.find(sentinel, match.end(), end)
             if idx != -1:
-                block = block[:idx]
+                end = idx
+
+        old_block = markdown[match.end():end]
+        old_content = old_block.strip()
+        content = prompt.content.strip()
+        # Keep a horizontal rule that separated this prompt from the next one
+        rule = _TRAILING_RULE.search(old_content)
+        if rule and not _TRAILING_RULE.search(content):
+            content += rule.group(0)
+        leading = old_block[:len(old_block) - len(old_block.lstrip())] or "\n\n"
+        trailing = old_block[len(old_block.rstrip()):]
+        return (
+            markdown[:match.start()]
+            + f"## Prompt {prompt.number}: {prompt.title}{leading}{content}{trailing}"
+            + markdown[end:]
+        )
+    raise ValueError(f"Prompt {prompt.number} not found in the prompt package")
 
-        content = block.strip()
 
-        prompts.append(ParsedPrompt(
-            number=number,
-            title=title,
-            content=content,
-        ))
+_WORD = re.compile(r"[a-z0-9]{4,}")
+
+
+def relevant_spec_sections(spec_md: str, query: str, limit: int) -> str:
+    """The spec's ## sections sharing the most words with query, in document order.
+
+    Falls back to the whole spec when it has no ## sections.
+    """
+    index = SectionIndex(spec_md)
+    sections = [section for section in index if section.level == 2]
+    if len(sections) <= limit:
+        return spec_md if not sections else "\n\n".join(
+            spec_md[section.start:section.end].strip() for section in sections
+        )
+
+    query_words = set(_WORD.findall(query.lower()))
+    scored = sorted(
+        sections,
+        key=lambda section: len(query_words & set(_WORD.findall(spec_md[section.start:section.end].lower()))),
+        reverse=True,
+    )
+    chosen = sorted(scored[:limit], key=lambda section: section.start)
+    return "\n\n".join(spec_md[section.start:section.end].strip() for section in chosen)
 
-    return prompts
+
+class IncrementalPromptParser(IncrementalBlockParser[ParsedPrompt]):
+    """Streaming parse_prompts(): each prompt is returned once the next header
+    or a closing sentinel arrives (see app.agents.stream_parser)."""
+
+    def __init__(self):
+        super().__init__(PROMPT_HEADER, _prompt_from_block, PROMPT_SENTINELS)
 
 
 MAX_TOKENS_BY_TYPE = {
@@ -71,6 +162,10 @@ MAX_TOKENS_BY_TYPE = {
     "debug": 2048,
 }
 
+# Splice refinement: spec context and output budget for a single-prompt rewrite
+SPLICE_SPEC_SECTIONS = 3
+SPLICE_MIN_MAX_TOKENS = 1024
+
 
 class SynthesizerAgent(BaseAgent):
     """Prompt Synthesizer agent — transforms spec.md into sequential prompts.
@@ -79,15 +174,22 @@ class SynthesizerAgent(BaseAgent):
     """
 
     model = CLAUDE_SONNET
-
-    def get_system_prompt(self) -> str:
-        return self._load_prompt_file("synthesizer_prompt.md")
-
-    def execute(self, input_data: dict) -> SynthesizerResult:
+    prompt_file = "synthesizer_prompt.md"
+
+    def execute(
+        self,
+        input_data: dict,
+        on_delta: Callable[[str], None] | None = None,
+        on_prompt: Callable[[ParsedPrompt], None] | None = None,
+    ) -> SynthesizerResult:
         """Generate a prompt package from an approved spec.md.
 
         Args:
             input_data: {"spec_md": "the full spec.md content"}
+            on_delta: optional callback streaming raw prompt text as it is generated
+            on_prompt: optional callback receiving each prompt as soon as it is
+                complete (streams the completion); the last ones arrive once
+                generation finishes
 
         Returns:
             SynthesizerResult with parsed prompts and token usage.
@@ -103,26 +205,34 @@ class SynthesizerAgent(BaseAgent):
 
         max_tokens = MAX_TOKENS_BY_TYPE.get(project_type, 8192)
 
+        parser = IncrementalPromptParser() if on_prompt is not None else None
+        stream = on_delta
+        if parser is not None:
+            def stream(text: str) -> None:
+                if on_delta is not None:
+                    on_delta(text)
+                for prompt in parser.feed(text):
+                    on_prompt(prompt)
+
         result: AgentResult = self._call_llm(
             user_message=user_message,
             max_tokens=max_tokens,
             temperature=0.7,
+            on_delta=stream,
+            project_type=project_type,
         )
 
-        raw = result.content.strip()
-
-        # Strip wrapping ```markdown fences if present
-        if raw.startswith("```"):
-            first_newline = raw.index("\n")
-            raw = raw[first_newline + 1:]
-        if raw.endswith("```"):
-            raw = raw[:-3].rstrip()
-
+        raw = _strip_fences(result.content)
         prompts = parse_prompts(raw)
 
         if not prompts:
             logger.warning("Synthesizer returned no parseable prompts. Raw output:\n%s", raw[:500])
 
+        # The streamed prompts match the batch parse; hand over the ones still open
+        if parser is not None:
+            for prompt in prompts[len(parser.items):]:
+                on_prompt(prompt)
+
         return SynthesizerResult(
             prompts=prompts,
             raw_markdown=raw,
@@ -137,24 +247,107 @@ class SynthesizerAgent(BaseAgent):
     def refine_section(self, input_data: dict) -> SynthesizerResult:
         """Refine a specific prompt section based on feedback.
 
+        A single existing target is rewritten on its own and spliced back
+        into the package (see refine_prompt); target 0 ("all flagged") or
+        SYNTHESIZER_SPLICE_REFINEMENT=False regenerates the whole package.
+
         Args:
             input_data: {
                 "spec_md": "the full spec.md",
                 "current_prompts": "full raw markdown of current prompts",
                 "target_prompt_number": int,
-                "feedback": "user's refinement request"
+                "feedback": "user's refinement request",
+                "project_type": "build" (optional)
             }
 
         Returns:
             SynthesizerResult with the complete updated prompt package.
         """
+        target = input_data["target_prompt_number"]
+        if settings.SYNTHESIZER_SPLICE_REFINEMENT and target > 0:
+            current = parse_prompts(input_data["current_prompts"])
+            if any(p.number == target for p in current):
+                return self.refine_prompt(input_data, current)
+        return self.regenerate_package(input_data)
+
+    def refine_prompt(self, input_data: dict, current: list[ParsedPrompt]) -> SynthesizerResult:
+        """Rewrite only the target prompt and splice it into the package.
+
+        Sends the spec sections relevant to the prompt and the feedback, the
+        package outline for context and the target prompt itself; asks for
+        the replacement block only. Output tokens scale with the prompt
+        being edited, not the package.
+        """
+        target = input_data["target_prompt_number"]
+        feedback = input_data["feedback"]
+        project_type = input_data.get("project_type", "build")
+        prompt = next(p for p in current if p.number == target)
+        body = _TRAILING_RULE.sub("", prompt.content)  # The separator is kept by splice_prompt
+
+        spec_context = relevant_spec_sections(
+            input_data["spec_md"], f"{prompt.title}\n{body}\n{feedback}", SPLICE_SPEC_SECTIONS
+        )
+        outline = "\n".join(
+            f"{p.number}. {p.title}{'  ← to update' if p.number == target else ''}" for p in current
+        )
+        user_message = (
+            f"[Project Type: {project_type}]\n\n"
+            f"## Relevant spec.md Sections\n\n{spec_context}\n\n"
+            f"## Prompt Package Outline\n\n{outline}\n\n"
+            f"## Prompt to Update\n\n## Prompt {target}: {prompt.title}\n\n{body}\n\n"
+            f"## Refinement Request\n\n"
+            f"Please update **Prompt {target}** based on this feedback:\n\n"
+            f"{feedback}\n\n"
+            f"Return ONLY the updated \"## Prompt {target}: <title>\" block, header included. "
+            f"Do not return any other prompt, notes or separators."
+        )
+        max_tokens = min(
+            MAX_TOKENS_BY_TYPE.get(project_type, 8192),
+            max(SPLICE_MIN_MAX_TOKENS, 2 * estimate_tokens(body)),
+        )
+
+        result: AgentResult = self._call_llm(
+            user_message=user_message,
+            max_tokens=max_tokens,
+            temperature=0.7,
+            project_type=project_type,
+        )
+
+        raw = _strip_fences(result.content)
+        returned = parse_prompts(raw)
+        if returned:
+            updated = ParsedPrompt(number=target, title=returned[0].title, content=returned[0].content)
+        elif raw:
+            # No header came back: the whole output is the new body
+            updated = ParsedPrompt(number=target, title=prompt.title, content=raw)
+        else:
+            raise ValueError(f"Synthesizer returned an empty replacement for Prompt {target}")
+
+        package = splice_prompt(input_data["current_prompts"], updated)
+        logger.info("Spliced refined Prompt %d into the package (%d → %d chars)", target, len(body), len(updated.content))
+
+        return SynthesizerResult(
+            prompts=parse_prompts(package),
+            raw_markdown=package,
+            input_tokens=result.input_tokens,
+            output_tokens=result.output_tokens,
+            total_tokens=result.total_tokens,
+            cost_usd=result.cost_usd,
+            model=result.model,
+            latency_ms=result.latency_ms,
+        )
+
+    def regenerate_package(self, input_data: dict) -> SynthesizerResult:
+        """Regenerate the complete prompt package with the feedback applied."""
         spec_md = input_data["spec_md"]
         current_prompts = input_data["current_prompts"]
         target = input_data["target_prompt_number"]
         feedback = input_data["feedback"]
 
+        # The spec is identical across refinements and critic-loop passes, so it
+        # goes in a cacheable prefix ahead of the per-request content.
+        spec_prefix = f"## Original spec.md\n\n{spec_md}\n\n"
         user_message = (
-            f"## Original spec.md\n\n{spec_md}\n\n"
             f"## Current Prompt Package\n\n{current_prompts}\n\n"
             f"## Refinement Request\n\n"
             f"Please update **Prompt {target}** based on this feedback:\n\n"
@@ -167,15 +360,11 @@ class SynthesizerAgent(BaseAgent):
             user_message=user_message,
             max_tokens=8192,
             temperature=0.7,
+            cache_prefix=spec_prefix,
+            project_type=input_data.get("project_type", "build"),
         )
 
-        raw = result.content.strip()
-        if raw.startswith("```"):
-            first_newline = raw.index("\n")
-            raw = raw[first_newline + 1:]
-        if raw.endswith("```"):
-            raw = raw[:-3].rstrip()
-
+        raw = _strip_fences(result.content)
         prompts = parse_prompts(raw)
 
         return SynthesizerResult(
@@ -3,6 +3,10 @@ from fastapi import APIRouter, Depends
 
 from app.api.dependencies import get_current_user
 from app.models.user import User
+from app.utils.idea_index import idea_index
+from app.utils.llm_cache import llm_response_cache
+from app.utils.llm_hedging import hedge_stats
+from app.websocket.event_publisher import event_publisher
 from app.websocket.socket_manager import sio
 
 router = APIRouter(prefix="/api/debug", tags=["debug"])
@@ -20,3 +24,27 @@ async def emit_test_event(
         "message": f"Test event from user {current_user.full_name}",
     }, room=room)
     return {"sent": True, "room": room}
+
+
+@router.get("/llm-cache")
+async def llm_cache_stats(current_user: User = Depends(get_current_user)):
+    """Hit/miss counters of the LLM response cache, summed over the workers."""
+    return llm_response_cache.cluster_stats()
+
+
+@router.get("/idea-cache")
+async def idea_cache_stats(current_user: User = Depends(get_current_user)):
+    """Hit rate of the near-duplicate idea → questions cache, summed over the workers."""
+    return idea_index.stats()
+
+
+@router.get("/llm-hedging")
+async def llm_hedging_stats(current_user: User = Depends(get_current_user)):
+    """Hedge rate, win rate and extra cost of hedged LLM calls, summed over the workers."""
+    return hedge_stats.cluster_stats()
+
+
+@router.get("/event-publisher")
+async def event_publisher_stats(current_user: User = Depends(get_current_user)):
+    """Events published, coalesced and dropped by the workers' publishers, with mean publish latency."""
+    return event_publisher.cluster_stats()
@@ -9,12 +9,14 @@ from app.models.project import Project
 from app.models.prompt import Prompt
 from app.models.user import User
 from app.api.dependencies import get_current_user
+from app.agents.orchestrator import resume_status
 from app.schemas.project import ProjectCreate, ProjectResponse
 from app.services.rate_limit_service import check_project_limit, check_refinement_limit
 from app.tasks.workflow_tasks import (
     start_project_workflow,
     process_user_response,
     refine_prompts_task,
+    resume_workflow,
 )
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
@@ -164,6 +166,31 @@ def refine_prompts(
     }
 
 
+@router.post("/{project_id}/resume")
+def resume_project(
+    project_id: int,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Resume a failed workflow from its last completed stage."""
+    project = _get_user_project(project_id, user, db)
+
+    if project.status != "failed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Only failed projects can be resumed, currently '{project.status}'.",
+        )
+
+    # Mark as processing (at the stage it re-enters) so the UI knows and a second request is rejected
+    stage_status = resume_status((project.workflow_data or {}).get("stage_runs", []))
+    project.status = stage_status.value
+    db.commit()
+
+    resume_workflow.delay(project.id)
+
+    return {"message": "Resuming workflow", "project_id": project.id, "stage": stage_status.value}
+
+
 # ─── Prompts ──────────────────────────────────────────────────────
 
 @router.get("/{project_id}/prompts")
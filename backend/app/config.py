@@ -1,5 +1,10 @@
 from pydantic_settings import BaseSettings
 
+# Model IDs (re-exported by app.utils.llm_client; defined here so settings-level defaults can key on them)
+CLAUDE_HAIKU = "claude-haiku-4-5-20251001"
+CLAUDE_SONNET = "claude-sonnet-4-20250514"
+GPT_4O_MINI = "gpt-4o-mini"
+
 
 class Settings(BaseSettings):
     # Database
@@ -17,6 +22,107 @@ class Settings(BaseSettings):
     ANTHROPIC_API_KEY: str = ""
     OPENAI_API_KEY: str = ""
 
+    # LLM backend: "live" (real providers) or "fake" (local stand-in server for
+    # load/latency tests: uvicorn app.utils.fake_llm_server:app --port 8090)
+    LLM_BACKEND: str = "live"
+    FAKE_LLM_BASE_URL: str = "http://localhost:8090"
+
+    # Fake provider behaviour (read by the fake server process)
+    FAKE_LLM_LATENCY_MEDIAN_MS: float = 800.0  # Time to first token, lognormal
+    FAKE_LLM_LATENCY_SIGMA: float = 0.5
+    FAKE_LLM_TOKENS_PER_SECOND: float = 60.0
+    FAKE_LLM_ERROR_429_RATE: float = 0.0
+    FAKE_LLM_TIMEOUT_RATE: float = 0.0  # Fraction of requests that hang
+    FAKE_LLM_TIMEOUT_SECONDS: float = 300.0  # How long a hanging request hangs
+    FAKE_LLM_PROFILES: dict[str, dict] = {}  # model → overrides, e.g. {"gpt-4o-mini": {"tokens_per_second": 150}}
+    FAKE_LLM_CRITIC_SEVERITY: str = "minor"  # "major" exercises the auto-refine loop
+    FAKE_LLM_SEED: int | None = None
+
+    # Record/replay cassettes for LLM calls: "off", "record" or "replay" (see app.utils.llm_cassette)
+    LLM_CASSETTE_MODE: str = "off"
+    LLM_CASSETTE_PATH: str = "cassettes/llm_calls.jsonl.gz"
+    LLM_CASSETTE_TIME_SCALE: float = 1.0  # Replay latency multiplier; 0 = no waiting
+
+    # LLM HTTP transport (async client connection pool)
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 120.0
+
+    # LLM response cache (opt-in per agent: elicitor, architect, synthesizer, critic)
+    LLM_CACHE_AGENTS: list[str] = []
+    LLM_CACHE_TTL_SECONDS: int = 86400  # 24 hours
+    LLM_CACHE_MAX_ENTRIES: int = 256  # In-process LRU tier
+    LLM_CACHE_REDIS_MAX_ENTRIES: int = 10000
+    LLM_CACHE_MAX_ENTRY_BYTES: int = 256 * 1024
+
+    # Single-flight coalescing of identical in-flight LLM calls (see app.utils.llm_singleflight)
+    LLM_SINGLE_FLIGHT_ENABLED: bool = True
+    LLM_SINGLE_FLIGHT_LOCK_SECONDS: int = 600  # Leader lock expiry if its worker dies mid-call
+    LLM_SINGLE_FLIGHT_MAX_WAIT_SECONDS: float = 600.0  # Followers call directly after this
+
+    # Cluster-wide provider rate limits (Redis token buckets; see app.utils.llm_rate_limiter). The
+    # defaults are the providers' entry-tier quotas: Anthropic limits input and output tokens per
+    # minute separately ("input_tpm"/"output_tpm"), OpenAI limits their sum ("tpm"). Off until
+    # enabled with your account's quotas, e.g. {"gpt-4o-mini": {"rpm": 5000, "tpm": 2000000}}
+    LLM_RATE_LIMIT_ENABLED: bool = False
+    LLM_RATE_LIMIT_MAX_WAIT_SECONDS: float = 300.0
+    LLM_RATE_LIMITS: dict[str, dict[str, int]] = {}
+
+    # Per-provider circuit breaker (shared across workers via Redis)
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 3  # Failed calls within the window that trip it
+    CIRCUIT_BREAKER_WINDOW_SECONDS: int = 60
+    CIRCUIT_BREAKER_OPEN_SECONDS: int = 30  # Fail-fast period before a half-open probe
+
+    # Hedged requests per agent, e.g. {"architect": {"percentile": 95, "fallback_model": "..."}}
+    LLM_HEDGE_POLICIES: dict[str, dict] = {}
+
+    # Near-duplicate idea cache (reuses Elicitor questions for a user's similar ideas; opt-in)
+    IDEA_CACHE_ENABLED: bool = False
+    IDEA_CACHE_THRESHOLD: float = 0.8  # Estimated Jaccard similarity over character shingles
+    IDEA_CACHE_MAX_ENTRIES: int = 5000
+
+    # Refine a single prompt by rewriting just its block and splicing it into the package
+    SYNTHESIZER_SPLICE_REFINEMENT: bool = True
+
+    # Critic fan-out (opt-in): project_type → prompts per concurrent audit call, e.g. {"build": 2};
+    # unset = one call for the package
+    CRITIC_FANOUT_GROUP_SIZES: dict[str, int] = {}
+    CRITIC_FANOUT_MAX_TOKENS: int = 1024
+
+    # Structural pre-critic lint (app.agents.prompt_linter). When it is clean and the package has at
+    # most PRE_CRITIC_SMALL_PACKAGE_PROMPTS prompts, the LLM audit per project_type is "full",
+    # "shrink" (CRITIC_SHRUNK_MAX_TOKENS budget) or "skip"; unlisted types get "full"
+    PRE_CRITIC_POLICY: dict[str, str] = {"enhance": "shrink", "refactor": "shrink", "debug": "skip"}
+    PRE_CRITIC_SMALL_PACKAGE_PROMPTS: int = 3
+    CRITIC_SHRUNK_MAX_TOKENS: int = 768
+
+    # Re-run the (cached, incremental) critique after every user refinement
+    CRITIC_AFTER_USER_REFINEMENT: bool = True
+
+    # Critic output that fails schema validation is repaired by a small model, never re-generated
+    CRITIC_REPAIR_ATTEMPTS: int = 1
+
+    # Agent prompt templates: re-read agents/prompts/*.md when they change (None → follow DEBUG)
+    PROMPT_HOT_RELOAD: bool | None = None
+
+    # Workflow deadlines (derived from the Celery soft time limit; see app.utils.deadline)
+    WORKFLOW_DEADLINE_MARGIN_SECONDS: int = 30  # Reserved for saving state after the last LLM call
+    LLM_OUTPUT_TOKENS_PER_SECOND: float = 50.0  # Conservative generation rate for shrinking max_tokens
+    LLM_MIN_MAX_TOKENS: int = 512
+
+    # Worker → Socket.IO event publisher (app.websocket.event_publisher): batching window and queue bound
+    EVENT_PUBLISH_WINDOW_MS: int = 50
+    EVENT_PUBLISH_MAX_QUEUE: int = 1000
+    # Per-project event log replayed to reconnecting sockets (app.websocket.event_stream)
+    EVENT_STREAM_MAXLEN: int = 1000
+    EVENT_STREAM_TTL_SECONDS: int = 86400
+
+    # Workflow stage graph (app.agents.stage_graph): threads for independent stages, and stages
+    # to leave out per project_type, e.g. {"debug": ["critic"]}
+    WORKFLOW_STAGE_WORKERS: int = 4
+    WORKFLOW_SKIP_STAGES: dict[str, list[str]] = {}
+
     # Google OAuth
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
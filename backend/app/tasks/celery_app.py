@@ -1,7 +1,16 @@
+import logging
+
+import redis
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_ready, worker_shutting_down
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Set while a worker is in warm shutdown; its running workflows stop at the next stage boundary
+DRAINING_KEY_PREFIX = "worker_draining:"
+
 celery_app = Celery(
     "promptr",
     broker=settings.REDIS_URL,
@@ -28,3 +37,70 @@ celery_app.conf.update(
     # Task discovery
     imports=["app.tasks.workflow_tasks"],
 )
+
+
+@worker_process_init.connect
+def _load_prompt_templates(**kwargs) -> None:
+    """Read the agent prompt templates once per worker process, before the first task."""
+    from app.agents.prompt_registry import prompt_registry
+
+    prompt_registry.load()
+
+
+@worker_process_shutdown.connect
+def _flush_events(**kwargs) -> None:
+    """Publish events still queued in this pool process before it exits."""
+    from app.websocket.event_publisher import event_publisher
+
+    event_publisher.flush()
+    logger.info("Event publisher: %s", event_publisher.stats())
+
+
+@worker_process_shutdown.connect
+def _flush_counters(**kwargs) -> None:
+    """Report this pool process's last counts to the cluster-wide stats."""
+    from app.utils.cluster_stats import flush_all
+
+    flush_all()
+
+
+_redis: redis.Redis | None = None
+
+
+def _redis_client() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+    return _redis
+
+
+@worker_shutting_down.connect
+def _mark_draining(sender=None, **kwargs) -> None:
+    """SIGTERM/warm shutdown: ask this worker's running workflows to checkpoint and re-enqueue.
+
+    Signals reach the main worker process only, so the flag goes through Redis
+    where the pool processes can see it.
+    """
+    try:
+        _redis_client().set(f"{DRAINING_KEY_PREFIX}{sender}", 1, ex=settings.MAX_WORKFLOW_DURATION_SECONDS + 60)
+    except redis.RedisError:
+        logger.exception("Could not mark worker %s as draining", sender)
+
+
+@worker_ready.connect
+def _clear_draining(sender=None, **kwargs) -> None:
+    """A restarted worker with the same hostname is not draining."""
+    try:
+        _redis_client().delete(f"{DRAINING_KEY_PREFIX}{sender.hostname}")
+    except redis.RedisError:
+        logger.exception("Could not clear draining flag for worker %s", sender.hostname)
+
+
+def worker_draining(hostname: str | None) -> bool:
+    """Whether the worker running a task is shutting down (False if Redis is unreachable)."""
+    if not hostname:
+        return False
+    try:
+        return bool(_redis_client().exists(f"{DRAINING_KEY_PREFIX}{hostname}"))
+    except redis.RedisError:
+        return False
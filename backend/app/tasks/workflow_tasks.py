@@ -5,17 +5,25 @@ Each task:
 2. Reconstructs WorkflowState from project fields
 3. Calls the appropriate Orchestrator method
 4. Persists the updated state back to the database
+
+State is also saved after every completed stage, so a failed workflow can be
+resumed from its last good stage (resume_workflow), and a worker in warm
+shutdown stops its workflows at the next stage boundary and re-enqueues them.
 """
 
 import logging
 from datetime import datetime
 
-from app.tasks.celery_app import celery_app
+from app.config import settings
+from app.tasks.celery_app import celery_app, worker_draining
 from app.database import SessionLocal
 from app.models.project import Project
 from app.models.conversation_event import ConversationEvent
 from app.models.user_session import UserSession
-from app.agents.orchestrator import Orchestrator, WorkflowState, WorkflowStatus
+from app.agents.orchestrator import Orchestrator, WorkflowEvent, WorkflowInterrupted, WorkflowState, WorkflowStatus
+from app.utils.deadline import deadline_scope
+from app.websocket.event_publisher import event_publisher
+from app.websocket.socket_manager import emit_to_project_sync
 
 logger = logging.getLogger(__name__)
 
@@ -29,11 +37,48 @@ def _load_project(db, project_id: int) -> Project:
     return project
 
 
+def _project_emitter(project_id: int):
+    """Build an Orchestrator emit_fn that forwards events to the project room."""
+    def emit(event: WorkflowEvent) -> None:
+        Orchestrator._default_emit(event)
+        try:
+            emit_to_project_sync(project_id, event.event_type, event.data)
+        except Exception:
+            logger.exception("Failed to emit %s for project %d", event.event_type, project_id)
+    return emit
+
+
+def _orchestrator(task, db, project: Project) -> Orchestrator:
+    """Orchestrator for a workflow task: streams to the project room, checkpoints
+    to the DB after every stage and stops when the task's worker is draining."""
+    return Orchestrator(
+        emit_fn=_project_emitter(project.id),
+        stream_deltas=True,
+        checkpoint_fn=lambda state: _save_state(db, project, state),
+        interrupt_fn=lambda: worker_draining(task.request.hostname),
+    )
+
+
+def _requeue(db, project: Project, interrupted: WorkflowInterrupted) -> dict:
+    """Save an interrupted workflow and hand it to another worker."""
+    logger.warning("Workflow for project %d interrupted (%s) — re-enqueueing resume", project.id, interrupted)
+    _save_state(db, project, interrupted.state)
+    resume_workflow.delay(project.id)
+    return {"status": "requeued", "stage": interrupted.state.status.value}
+
+
+def _workflow_deadline():
+    """Deadline scope for a task's LLM work: the soft time limit minus a margin
+    left for persisting state, so calls give up cleanly instead of being killed."""
+    return deadline_scope(seconds=settings.MAX_WORKFLOW_DURATION_SECONDS - settings.WORKFLOW_DEADLINE_MARGIN_SECONDS)
+
+
 def _state_from_project(project: Project) -> WorkflowState:
     """Reconstruct an in-memory WorkflowState from the DB project."""
     wd = project.workflow_data or {}
     return WorkflowState(
         status=WorkflowStatus(project.status),
+        user_id=project.user_id,
         idea=project.initial_idea,
         project_type=getattr(project, "project_type", "build") or "build",
         codebase_context=getattr(project, "codebase_context", "") or "",
@@ -49,6 +94,9 @@ def _state_from_project(project: Project) -> WorkflowState:
         refinement_count=project.refinement_count,
         total_tokens=wd.get("total_tokens", 0),
         total_cost=wd.get("total_cost", 0.0),
+        degraded_stages=wd.get("degraded_stages", []),
+        critique_cache=wd.get("critique_cache", {}),
+        stage_runs=wd.get("stage_runs", []),
     )
 
 
@@ -77,6 +125,9 @@ def _save_state(db, project: Project, state: WorkflowState) -> None:
         "refinement_history": state.refinement_history,
         "total_tokens": state.total_tokens,
         "total_cost": state.total_cost,
+        "degraded_stages": state.degraded_stages,
+        "critique_cache": state.critique_cache,
+        "stage_runs": state.stage_runs,
     }
 
     if state.error:
@@ -143,12 +194,14 @@ def start_project_workflow(self, project_id: int) -> dict:
         project = _load_project(db, project_id)
         logger.info("Starting workflow for project %d: %s", project_id, project.title)
 
-        orch = Orchestrator()
-        state = orch.start_workflow(
-            project.initial_idea,
-            project_type=getattr(project, "project_type", "build") or "build",
-            codebase_context=getattr(project, "codebase_context", "") or "",
-        )
+        orch = _orchestrator(self, db, project)
+        with _workflow_deadline():
+            state = orch.start_workflow(
+                project.initial_idea,
+                project_type=getattr(project, "project_type", "build") or "build",
+                codebase_context=getattr(project, "codebase_context", "") or "",
+                user_id=project.user_id,
+            )
 
         _save_state(db, project, state)
 
@@ -157,6 +210,8 @@ def start_project_workflow(self, project_id: int) -> dict:
                    {"questions": state.questions})
 
         return {"status": state.status.value, "questions": len(state.questions)}
+    except WorkflowInterrupted as e:
+        return _requeue(db, _load_project(db, project_id), e)
     except Exception as e:
         logger.exception("start_project_workflow failed for project %d", project_id)
         try:
@@ -169,6 +224,7 @@ def start_project_workflow(self, project_id: int) -> dict:
             logger.exception("Failed to mark project %d as failed", project_id)
         return {"status": "failed", "error": str(e)}
     finally:
+        event_publisher.flush()
         db.close()
 
 
@@ -190,16 +246,17 @@ def process_user_response(self, project_id: int, answers: str) -> dict:
         if state.status == WorkflowStatus.PLANNING:
             state.status = WorkflowStatus.AWAITING_ANSWERS
 
-        orch = Orchestrator()
-        state = orch.submit_answers(state, answers)
+        orch = _orchestrator(self, db, project)
+        with _workflow_deadline():
+            state = orch.submit_answers(state, answers)
 
-        if state.status == WorkflowStatus.FAILED:
-            _save_state(db, project, state)
-            return {"status": "failed", "error": state.error}
+            if state.status == WorkflowStatus.FAILED:
+                _save_state(db, project, state)
+                return {"status": "failed", "error": state.error}
 
-        # User answered → architect ran → now awaiting approval
-        # Continue to synthesizer + critic automatically
-        state = orch.approve_spec(state)
+            # User answered → architect ran → now awaiting approval
+            # Continue to synthesizer + critic automatically
+            state = orch.approve_spec(state)
 
         _save_state(db, project, state)
 
@@ -220,6 +277,8 @@ def process_user_response(self, project_id: int, answers: str) -> dict:
             "total_tokens": state.total_tokens,
             "total_cost": round(state.total_cost, 4),
         }
+    except WorkflowInterrupted as e:
+        return _requeue(db, _load_project(db, project_id), e)
     except Exception as e:
         logger.exception("process_user_response failed for project %d", project_id)
         try:
@@ -232,6 +291,7 @@ def process_user_response(self, project_id: int, answers: str) -> dict:
             logger.exception("Failed to mark project %d as failed", project_id)
         return {"status": "failed", "error": str(e)}
     finally:
+        event_publisher.flush()
         db.close()
 
 
@@ -249,8 +309,9 @@ def refine_prompts_task(self, project_id: int, refinement_request: str,
 
         state = _state_from_project(project)
 
-        orch = Orchestrator()
-        state = orch.request_refinement(state, target_section, refinement_request)
+        orch = Orchestrator(emit_fn=_project_emitter(project_id), stream_deltas=True)
+        with _workflow_deadline():
+            state = orch.request_refinement(state, target_section, refinement_request)
 
         _save_state(db, project, state)
 
@@ -276,4 +337,61 @@ def refine_prompts_task(self, project_id: int, refinement_request: str,
             logger.exception("Failed to update project %d error", project_id)
         return {"status": "failed", "error": str(e)}
     finally:
+        event_publisher.flush()
+        db.close()
+
+
+@celery_app.task(name="workflow.resume", bind=True, max_retries=0)
+def resume_workflow(self, project_id: int) -> dict:
+    """Re-enter a failed or interrupted workflow at its first incomplete stage.
+
+    Checkpointed stage outputs (questions, spec, prompts, critique) are reused,
+    so only the remaining stages are paid for again.
+    """
+    db = SessionLocal()
+    try:
+        project = _load_project(db, project_id)
+        state = _state_from_project(project)
+        if state.status in (WorkflowStatus.AWAITING_ANSWERS, WorkflowStatus.COMPLETED):
+            logger.info("Project %d is %s — nothing to resume", project_id, state.status.value)
+            return {"status": state.status.value}
+
+        logger.info("Resuming workflow for project %d from %s", project_id, state.status.value)
+        orch = _orchestrator(self, db, project)
+        with _workflow_deadline():
+            state = orch.resume(state)
+
+        _save_state(db, project, state)
+
+        if state.status == WorkflowStatus.AWAITING_ANSWERS:
+            _add_event(db, project_id, "agent_question", "elicitor",
+                       state.questions[0]["text"] if state.questions else "No questions generated",
+                       {"questions": state.questions})
+        elif state.status == WorkflowStatus.COMPLETED:
+            _add_event(db, project_id, "agent_response", "synthesizer",
+                       f"Generated {len(state.parsed_prompts)} prompts",
+                       {"critique": state.critique_results})
+            _record_session(db, project, state)
+
+        return {
+            "status": state.status.value,
+            "prompts_count": len(state.parsed_prompts),
+            "total_tokens": state.total_tokens,
+            "total_cost": round(state.total_cost, 4),
+        }
+    except WorkflowInterrupted as e:
+        return _requeue(db, _load_project(db, project_id), e)
+    except Exception as e:
+        logger.exception("resume_workflow failed for project %d", project_id)
+        try:
+            project = _load_project(db, project_id)
+            project.status = "failed"
+            project.workflow_data = {**(project.workflow_data or {}), "error": str(e)}
+            project.updated_at = datetime.utcnow()
+            db.commit()
+        except Exception:
+            logger.exception("Failed to mark project %d as failed", project_id)
+        return {"status": "failed", "error": str(e)}
+    finally:
+        event_publisher.flush()
         db.close()
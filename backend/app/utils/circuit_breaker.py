@@ -0,0 +1,125 @@
+"""Per-provider circuit breaker shared across workers through Redis.
+
+States (derived from two Redis keys per provider):
+    closed    — neither key exists; calls flow, failures are counted
+    open      — "open" key exists (TTL = open duration); calls fail fast
+    half_open — "open" expired but "tripped" remains; one caller at a time
+                wins the probe lock and is let through to test the provider
+
+CIRCUIT_BREAKER_FAILURE_THRESHOLD failed calls within the window trip the
+breaker. A successful call closes it; a failed probe re-opens it. If Redis
+is unreachable the breaker stays out of the way (calls are allowed).
+"""
+
+import logging
+
+import redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "llm_breaker:"
+PROBE_TIMEOUT_SECONDS = 120  # Probe lock expiry if the probing worker dies
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        super().__init__(f"{provider} circuit breaker is open — failing fast")
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker per provider, state held in Redis."""
+
+    def __init__(self):
+        self._redis: redis.Redis | None = None
+
+    @property
+    def redis_client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+        return self._redis
+
+    @staticmethod
+    def _keys(provider: str) -> tuple[str, str, str, str]:
+        base = f"{REDIS_KEY_PREFIX}{provider}:"
+        return base + "open", base + "tripped", base + "failures", base + "probe"
+
+    def state(self, provider: str) -> str:
+        open_key, tripped_key, _, _ = self._keys(provider)
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.exists(open_key)
+            pipe.exists(tripped_key)
+            is_open, tripped = pipe.execute()
+        except redis.RedisError:
+            return "closed"
+        if is_open:
+            return "open"
+        return "half_open" if tripped else "closed"
+
+    def before_call(self, provider: str) -> None:
+        """Raise CircuitOpenError unless a call to provider may proceed."""
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return
+        state = self.state(provider)
+        if state == "closed":
+            return
+        if state == "half_open":
+            _, _, _, probe_key = self._keys(provider)
+            try:
+                if self.redis_client.set(probe_key, 1, nx=True, ex=PROBE_TIMEOUT_SECONDS):
+                    logger.info("%s circuit half-open — probing", provider)
+                    return
+            except redis.RedisError:
+                return
+        raise CircuitOpenError(provider)
+
+    def is_open(self, provider: str) -> bool:
+        """True if other callers have tripped the breaker (used to stop retrying)."""
+        return settings.CIRCUIT_BREAKER_ENABLED and self.state(provider) == "open"
+
+    def record_success(self, provider: str) -> None:
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return
+        open_key, tripped_key, failures_key, probe_key = self._keys(provider)
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.delete(tripped_key)
+            pipe.delete(failures_key, probe_key, open_key)
+            was_tripped, _ = pipe.execute()
+            if was_tripped:
+                logger.info("%s circuit breaker CLOSED — provider recovered", provider)
+        except redis.RedisError as e:
+            logger.warning("Circuit breaker update failed: %s", e)
+
+    def record_failure(self, provider: str) -> None:
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return
+        open_key, tripped_key, failures_key, probe_key = self._keys(provider)
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.incr(failures_key)
+            pipe.expire(failures_key, settings.CIRCUIT_BREAKER_WINDOW_SECONDS)
+            pipe.exists(tripped_key)
+            failures, _, tripped = pipe.execute()
+
+            if tripped or failures >= settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+                pipe = self.redis_client.pipeline()
+                pipe.set(open_key, 1, ex=settings.CIRCUIT_BREAKER_OPEN_SECONDS)
+                pipe.set(tripped_key, 1, ex=settings.CIRCUIT_BREAKER_OPEN_SECONDS * 20)
+                pipe.delete(probe_key)
+                pipe.execute()
+                logger.warning(
+                    "%s circuit breaker OPEN for %ds after %d failures",
+                    provider, settings.CIRCUIT_BREAKER_OPEN_SECONDS, failures,
+                )
+        except redis.RedisError as e:
+            logger.warning("Circuit breaker update failed: %s", e)
+
+
+# Singleton instance
+circuit_breaker = CircuitBreaker()
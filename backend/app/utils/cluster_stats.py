@@ -0,0 +1,87 @@
+"""Counters summed across every process through a Redis hash.
+
+LLM calls run in Celery pool processes while the debug endpoints run in the
+API process, so per-process counters there would always read zero. Each
+process keeps its own counts and adds what it counted since the last report
+to a shared hash, at most every REPORT_INTERVAL_SECONDS (and on flush()), so
+a hot path doesn't pay a Redis round-trip per increment. Redis being down
+only delays the report.
+"""
+
+import logging
+import threading
+import time
+
+import redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+REPORT_INTERVAL_SECONDS = 1.0
+
+
+class ClusterCounters:
+    """Per-process counters mirrored into the Redis hash at key."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self._lock = threading.Lock()
+        self._unreported: dict[str, float] = {}
+        self._last_report = time.monotonic()
+        self._redis: redis.Redis | None = None
+
+    @property
+    def redis_client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+        return self._redis
+
+    def add(self, name: str, n: float = 1) -> None:
+        """Count n more of name; reports to Redis once the interval has passed."""
+        with self._lock:
+            self._unreported[name] = self._unreported.get(name, 0) + n
+            due = time.monotonic() - self._last_report >= REPORT_INTERVAL_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Report everything counted so far (best effort; kept for the next report on failure)."""
+        with self._lock:
+            counts, self._unreported = self._unreported, {}
+            self._last_report = time.monotonic()
+        if not counts:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for name, n in counts.items():
+                if isinstance(n, int):
+                    pipe.hincrby(self.key, name, n)
+                else:
+                    pipe.hincrbyfloat(self.key, name, n)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not report %s counters: %s", self.key, e)
+            with self._lock:
+                for name, n in counts.items():
+                    self._unreported[name] = self._unreported.get(name, 0) + n
+
+    def totals(self) -> dict[str, float]:
+        """Cluster-wide totals (reported so far) by counter name."""
+        return {k.decode(): float(v) for k, v in self.redis_client.hgetall(self.key).items()}
+
+
+_registry: list[ClusterCounters] = []
+
+
+def cluster_counters(key: str) -> ClusterCounters:
+    """A ClusterCounters for key, flushed by flush_all() at process shutdown."""
+    counters = ClusterCounters(key)
+    _registry.append(counters)
+    return counters
+
+
+def flush_all() -> None:
+    """Report every process counter not yet sent (call before the process exits)."""
+    for counters in _registry:
+        counters.flush()
@@ -1,30 +1,50 @@
 from app.utils.llm_client import CLAUDE_HAIKU, CLAUDE_SONNET, GPT_4O_MINI
 
 # Pricing per 1M tokens (USD)
+# cache_write / cache_read price prompt-cache writes and hits (Anthropic: 1.25x
+# and 0.1x input; OpenAI: no write surcharge, cached input at 0.5x).
 MODEL_PRICING: dict[str, dict[str, float]] = {
     CLAUDE_HAIKU: {
         "input": 1.00,
         "output": 5.00,
+        "cache_write": 1.25,
+        "cache_read": 0.10,
     },
     CLAUDE_SONNET: {
         "input": 3.00,
         "output": 15.00,
+        "cache_write": 3.75,
+        "cache_read": 0.30,
     },
     GPT_4O_MINI: {
         "input": 0.15,
         "output": 0.60,
+        "cache_write": 0.15,
+        "cache_read": 0.075,
     },
 }
 
 
-def calculate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
-    """Calculate USD cost for a single LLM call."""
+def calculate_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> float:
+    """Calculate USD cost for a single LLM call.
+
+    input_tokens are uncached prompt tokens; prompt-cache reads and writes
+    are passed separately and priced at their own rates.
+    """
     pricing = MODEL_PRICING.get(model)
     if pricing is None:
         return 0.0
     input_cost = (input_tokens / 1_000_000) * pricing["input"]
     output_cost = (output_tokens / 1_000_000) * pricing["output"]
-    return round(input_cost + output_cost, 6)
+    cache_read_cost = (cache_read_tokens / 1_000_000) * pricing["cache_read"]
+    cache_write_cost = (cache_write_tokens / 1_000_000) * pricing["cache_write"]
+    return round(input_cost + output_cost + cache_read_cost + cache_write_cost, 6)
 
 
 def estimate_project_cost() -> dict:
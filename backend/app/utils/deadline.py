@@ -0,0 +1,79 @@
+"""Workflow deadlines propagated to every LLM call via a context variable.
+
+A Celery task knows its soft time limit; nothing below it used to. The task
+opens a deadline scope, and everything running inside it (Orchestrator,
+agents, LLMClient — including hedge threads, which copy the context) can ask
+how much budget is left:
+
+    with deadline_scope(seconds=570):
+        orch.approve_spec(state)
+
+LLMClient turns the remaining budget into per-request timeouts and stops
+retrying when another attempt can't fit; agents use it to shrink max_tokens.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+# Don't start an attempt with less than this much budget left (seconds)
+MIN_ATTEMPT_SECONDS = 5.0
+
+_deadline: ContextVar[float | None] = ContextVar("workflow_deadline", default=None)
+
+
+class DeadlineExceeded(RuntimeError):
+    """The workflow's time budget can't fit another LLM attempt."""
+
+
+@contextmanager
+def deadline_scope(seconds: float | None = None, at: float | None = None) -> Iterator[None]:
+    """Set a deadline (relative seconds or absolute time.monotonic() value).
+
+    Nested scopes can only tighten an enclosing deadline, never extend it.
+    """
+    if at is None and seconds is not None:
+        at = time.monotonic() + seconds
+    current = _deadline.get()
+    if at is None or (current is not None and current < at):
+        at = current
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> float | None:
+    """Absolute deadline (time.monotonic() based), or None if unbounded."""
+    return _deadline.get()
+
+
+def remaining() -> float | None:
+    """Seconds left in the current scope, or None if there is no deadline."""
+    at = _deadline.get()
+    if at is None:
+        return None
+    return at - time.monotonic()
+
+
+def check(what: str = "LLM call") -> None:
+    """Raise DeadlineExceeded if there isn't budget for another attempt."""
+    left = remaining()
+    if left is not None and left < MIN_ATTEMPT_SECONDS:
+        raise DeadlineExceeded(f"Workflow deadline reached before {what} ({max(left, 0):.1f}s left)")
+
+
+def request_timeout(default: float) -> float:
+    """Per-request timeout: the default, capped by the remaining budget."""
+    left = remaining()
+    if left is None:
+        return default
+    return max(1.0, min(default, left))
+
+
+def can_retry(wait: float) -> bool:
+    """Whether sleeping `wait` seconds still leaves room for another attempt."""
+    left = remaining()
+    return left is None or left - wait >= MIN_ATTEMPT_SECONDS
@@ -0,0 +1,378 @@
+"""Local stand-in for the Anthropic and OpenAI APIs, for load and latency tests.
+
+Speaks just enough of both wire formats for the SDKs LLMClient uses:
+
+    POST /v1/messages           Anthropic Messages (JSON or SSE stream)
+    POST /v1/chat/completions   OpenAI Chat Completions (JSON or SSE stream)
+
+Each request waits a time-to-first-token drawn from a lognormal distribution,
+then "generates" its output at a fixed token rate. A configurable fraction of
+requests fail with 429 or hang past the client timeout. Responses are canned
+but format-correct for whichever agent is asking (detected from the system
+prompt), so the full Orchestrator / Celery path runs offline:
+
+    uvicorn app.utils.fake_llm_server:app --port 8090
+    LLM_BACKEND=fake celery -A app.tasks.celery_app worker
+
+Latency and error knobs come from the FAKE_LLM_* settings; per-model
+overrides go in FAKE_LLM_PROFILES and can be changed at runtime through
+PUT /config. GET /stats reports request and error counts.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.agents.architect import get_required_sections
+from app.config import settings
+
+CHARS_PER_TOKEN = 4
+CHUNK_TOKENS = 4  # Tokens per streamed delta
+
+
+@dataclass
+class LatencyProfile:
+    """Timing and failure behaviour for one model."""
+    latency_median_ms: float = settings.FAKE_LLM_LATENCY_MEDIAN_MS
+    latency_sigma: float = settings.FAKE_LLM_LATENCY_SIGMA
+    tokens_per_second: float = settings.FAKE_LLM_TOKENS_PER_SECOND
+    error_429_rate: float = settings.FAKE_LLM_ERROR_429_RATE
+    timeout_rate: float = settings.FAKE_LLM_TIMEOUT_RATE
+
+
+_profiles: dict[str, dict] = {m: dict(p) for m, p in settings.FAKE_LLM_PROFILES.items()}
+_rng = random.Random(settings.FAKE_LLM_SEED)
+_stats = {"requests": 0, "streamed": 0, "errors_429": 0, "timeouts": 0, "output_tokens": 0}
+
+
+def profile_for(model: str) -> LatencyProfile:
+    return LatencyProfile(**_profiles.get(model, {}))
+
+
+def _tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _text(content) -> str:
+    """Flatten a message/system field that may be a string or content blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content or [])
+
+
+# ─── Canned agent outputs ────────────────────────────────────────
+
+def _filler(topic: str, sentences: int) -> str:
+    return " ".join(
+        f"This part of the {topic} covers detail {i + 1} with enough text to look like real output."
+        for i in range(sentences)
+    )
+
+
+def _questions() -> str:
+    topics = ["Platform", "Audience", "Scope"]
+    return "\n\n".join(
+        f"## Question {n}: {topic}\n{_filler(topic.lower(), 2)} Which option fits best?\n"
+        f"- Option A for {topic.lower()}\n- Option B for {topic.lower()}\n- Something else"
+        for n, topic in enumerate(topics[:settings.MAX_QUESTIONS_PER_SESSION], start=1)
+    )
+
+
+def _spec(project_type: str) -> str:
+    parts = []
+    for section in get_required_sections(project_type):
+        body = _filler(section.lower(), 6)
+        if section == "Recommended Tech Stack":
+            body = (
+                "### Frontend\n**Next.js**\nReact framework with server rendering.\n\n"
+                "### Backend\n**FastAPI**\nPython API server.\n\n"
+                "### Database\n**PostgreSQL**\nRelational storage.\n\n"
+                "### Styling\n**Tailwind CSS**\nUtility-first styling."
+            )
+        parts.append(f"## {section}\n{body}")
+    return "\n\n".join(parts)
+
+
+# Package sizes within what synthesizer_prompt.md asks for, so the pre-critic lint passes
+PROMPT_COUNT_BY_TYPE = {"build": 5, "enhance": 2, "refactor": 1, "debug": 1}
+
+
+def _prompts(count: int = 5) -> str:
+    return "\n\n".join(
+        f"## Prompt {n}: Build step {n}\n"
+        f"Use the spec's stack: Next.js, FastAPI, PostgreSQL and Tailwind CSS.\n"
+        f"{_filler(f'step {n} prompt', 12)}"
+        for n in range(1, count + 1)
+    )
+
+
+def _refined(user: str) -> str:
+    """Echo the prompt(s) being refined with the targeted prompt marked as updated."""
+    block = re.search(r"## Prompt to Update\n\n(.*?)\n\n## Refinement Request", user, re.DOTALL)
+    if block is not None:
+        # Splice refinement: only the replacement block is expected back
+        return block.group(1).rstrip() + "\n\nUpdated to address the review feedback."
+    match = re.search(r"## Current Prompt Package\n\n(.*?)\n\n## Refinement Request", user, re.DOTALL)
+    target = re.search(r"update \*\*Prompt (\d+)\*\*", user)
+    if match is None:
+        return _prompts()
+    package = match.group(1)
+    if target is None:
+        return package
+    n = target.group(1)
+    return re.sub(
+        rf"(## Prompt {n}:.*?)(?=\n## Prompt |\Z)",
+        lambda m: m.group(1).rstrip() + "\n\nUpdated to address the review feedback.",
+        package,
+        count=1,
+        flags=re.DOTALL,
+    )
+
+
+def _critique() -> str:
+    severity = settings.FAKE_LLM_CRITIC_SEVERITY
+    issues = [] if severity == "none" else [{
+        "prompt_number": 1,
+        "category": "specificity",
+        "severity": severity,
+        "description": "Prompt 1 does not name the error states to handle.",
+        "suggestion": "List the loading, empty and error states explicitly.",
+    }]
+    return json.dumps({
+        "issues_found": bool(issues),
+        "severity": severity,
+        "issues": issues,
+        "overall_assessment": "Prompts are usable; see issues for minor gaps.",
+    }, indent=2)
+
+
+def canned_output(system: str, user: str) -> str:
+    """Pick a format-correct response for the agent that sent the request."""
+    project_type = re.search(r"\[Project Type: (\w+)\]", user)
+    project_type = project_type.group(1) if project_type else "build"
+    if "# Role: Requirements Elicitor" in system:
+        return _questions()
+    if "# Role: Technical Architect" in system:
+        return _spec(project_type)
+    if "# Role: Prompt Synthesizer" in system:
+        return _refined(user) if "## Refinement Request" in user else _prompts(PROMPT_COUNT_BY_TYPE.get(project_type, 5))
+    if "# Role: Quality Assurance Critic" in system or "# Role: Critic Output Repair" in system:
+        return _critique()
+    return "OK"
+
+
+# ─── Timing / failure simulation ────────────────────────────────
+
+class _Plan:
+    """What happens to one request: output text, pacing and injected failure."""
+
+    def __init__(self, model: str, text: str, max_tokens: int):
+        profile = profile_for(model)
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        self.stop_reason = "max_tokens" if len(text) > max_chars else "end_turn"
+        self.text = text[:max_chars]
+        self.output_tokens = _tokens(self.text)
+        self.ttft = _rng.lognormvariate(0, profile.latency_sigma) * profile.latency_median_ms / 1000
+        self.seconds_per_token = 1 / profile.tokens_per_second if profile.tokens_per_second > 0 else 0.0
+
+        roll = _rng.random()
+        self.failure = None
+        if roll < profile.error_429_rate:
+            self.failure = "429"
+        elif roll < profile.error_429_rate + profile.timeout_rate:
+            self.failure = "timeout"
+
+    def chunks(self) -> list[str]:
+        size = CHUNK_TOKENS * CHARS_PER_TOKEN
+        return [self.text[i:i + size] for i in range(0, len(self.text), size)]
+
+    async def fail(self, error_body: dict) -> JSONResponse:
+        """Apply the injected failure; returns the 429 response (timeouts just hang)."""
+        if self.failure == "timeout":
+            _stats["timeouts"] += 1
+            await asyncio.sleep(settings.FAKE_LLM_TIMEOUT_SECONDS)
+        _stats["errors_429"] += 1
+        return JSONResponse(error_body, status_code=429, headers={"retry-after": "1"})
+
+
+def _sse(event: str | None, data: dict | str) -> str:
+    payload = data if isinstance(data, str) else json.dumps(data)
+    return (f"event: {event}\n" if event else "") + f"data: {payload}\n\n"
+
+
+# ─── App ─────────────────────────────────────────────────────────
+
+app = FastAPI(title="Fake LLM provider", docs_url=None, redoc_url=None)
+
+
+@app.post("/v1/messages")
+async def anthropic_messages(request: Request):
+    body = await request.json()
+    model = body["model"]
+    system = _text(body.get("system", ""))
+    user = "\n".join(_text(m["content"]) for m in body.get("messages", []) if m["role"] == "user")
+    plan = _Plan(model, canned_output(system, user), body.get("max_tokens", 4096))
+    input_tokens = _tokens(system + user)
+    _stats["requests"] += 1
+
+    if plan.failure:
+        return await plan.fail({
+            "type": "error",
+            "error": {"type": "rate_limit_error", "message": "Fake provider: rate limit injected"},
+        })
+
+    message_id = f"msg_fake_{uuid.uuid4().hex[:24]}"
+    usage = {
+        "input_tokens": input_tokens,
+        "output_tokens": plan.output_tokens,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": 0,
+    }
+    _stats["output_tokens"] += plan.output_tokens
+
+    # A forced tool call is how clients request structured output
+    tool = (body.get("tool_choice") or {}).get("name")
+
+    if not body.get("stream"):
+        await asyncio.sleep(plan.ttft + plan.output_tokens * plan.seconds_per_token)
+        if tool:
+            block = {"type": "tool_use", "id": f"toolu_fake_{uuid.uuid4().hex[:20]}", "name": tool,
+                     "input": json.loads(plan.text)}
+        else:
+            block = {"type": "text", "text": plan.text}
+        return {
+            "id": message_id,
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [block],
+            "stop_reason": plan.stop_reason,
+            "stop_sequence": None,
+            "usage": usage,
+        }
+
+    async def events():
+        _stats["streamed"] += 1
+        yield _sse("message_start", {"type": "message_start", "message": {
+            "id": message_id, "type": "message", "role": "assistant", "model": model,
+            "content": [], "stop_reason": None, "stop_sequence": None,
+            "usage": {**usage, "output_tokens": 1},
+        }})
+        await asyncio.sleep(plan.ttft)
+        if tool:
+            content_block = {"type": "tool_use", "id": f"toolu_fake_{uuid.uuid4().hex[:20]}", "name": tool, "input": {}}
+        else:
+            content_block = {"type": "text", "text": ""}
+        yield _sse("content_block_start", {
+            "type": "content_block_start", "index": 0, "content_block": content_block,
+        })
+        for chunk in plan.chunks():
+            delta = {"type": "input_json_delta", "partial_json": chunk} if tool else {"type": "text_delta", "text": chunk}
+            yield _sse("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": delta})
+            await asyncio.sleep(_tokens(chunk) * plan.seconds_per_token)
+        yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+        yield _sse("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": plan.stop_reason, "stop_sequence": None},
+            "usage": {"output_tokens": plan.output_tokens},
+        })
+        yield _sse("message_stop", {"type": "message_stop"})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/v1/chat/completions")
+async def openai_chat_completions(request: Request):
+    body = await request.json()
+    model = body["model"]
+    messages = body.get("messages", [])
+    system = "\n".join(_text(m["content"]) for m in messages if m["role"] == "system")
+    user = "\n".join(_text(m["content"]) for m in messages if m["role"] == "user")
+    max_tokens = body.get("max_completion_tokens") or body.get("max_tokens") or 4096
+    plan = _Plan(model, canned_output(system, user), max_tokens)
+    prompt_tokens = _tokens(system + user)
+    _stats["requests"] += 1
+
+    if plan.failure:
+        return await plan.fail({"error": {
+            "message": "Fake provider: rate limit injected",
+            "type": "requests",
+            "param": None,
+            "code": "rate_limit_exceeded",
+        }})
+
+    completion_id = f"chatcmpl-fake{uuid.uuid4().hex[:20]}"
+    created = int(time.time())
+    finish_reason = "length" if plan.stop_reason == "max_tokens" else "stop"
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": plan.output_tokens,
+        "total_tokens": prompt_tokens + plan.output_tokens,
+        "prompt_tokens_details": {"cached_tokens": 0},
+    }
+    _stats["output_tokens"] += plan.output_tokens
+
+    if not body.get("stream"):
+        await asyncio.sleep(plan.ttft + plan.output_tokens * plan.seconds_per_token)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": plan.text},
+                "finish_reason": finish_reason,
+            }],
+            "usage": usage,
+        }
+
+    def chunk(delta: dict, finish: str | None = None, **extra) -> str:
+        return _sse(None, {
+            "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}], **extra,
+        })
+
+    async def events():
+        _stats["streamed"] += 1
+        await asyncio.sleep(plan.ttft)
+        yield chunk({"role": "assistant", "content": ""})
+        for text in plan.chunks():
+            yield chunk({"content": text})
+            await asyncio.sleep(_tokens(text) * plan.seconds_per_token)
+        yield chunk({}, finish_reason)
+        if (body.get("stream_options") or {}).get("include_usage"):
+            yield _sse(None, {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [], "usage": usage,
+            })
+        yield _sse(None, "[DONE]")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def stats():
+    return {**_stats, "profiles": {m: asdict(profile_for(m)) for m in _profiles}}
+
+
+@app.put("/config")
+async def configure(request: Request):
+    """Replace per-model profile overrides, e.g. {"gpt-4o-mini": {"error_429_rate": 0.2}}."""
+    body = await request.json()
+    for model, overrides in body.items():
+        LatencyProfile(**overrides)  # Reject unknown keys before applying
+        _profiles[model] = dict(overrides)
+    return {m: asdict(profile_for(m)) for m in _profiles}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy", "service": "fake-llm"}
@@ -0,0 +1,223 @@
+"""Near-duplicate index of past project ideas → Elicitor questions.
+
+Many submitted ideas are near-identical ("todo app", "a simple todo app").
+Each idea is reduced to a MinHash signature over character shingles; LSH
+banding finds candidate matches in O(bands) and the signature agreement
+estimates Jaccard similarity. A hit at or above the threshold lets the
+Orchestrator reuse the stored questions instead of calling the Elicitor.
+Entries are scoped per user: questions generated from one user's idea can
+quote it, so they are never served to anyone else.
+
+No embedding service: signatures are computed in-process and stored in
+Redis with their LSH bands, so every worker shares one index and it survives
+restarts. The index is bounded by max_entries (least recently used entries
+are evicted first); if Redis is unavailable a lookup is a miss and an add is
+skipped.
+
+Keys:
+    idea_index:entry:<id>                                   → JSON (user_id, project_type, idea, signature, questions)
+    idea_index:band:<user_id>:<project_type>:<band>:<hash>  → set of entry ids
+    idea_index:lru                                          → entry ids scored by last use
+"""
+
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from dataclasses import dataclass
+
+import redis
+
+from app.config import settings
+from app.utils.cluster_stats import cluster_counters
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: candidates surface from Jaccard ≈ 0.5 upwards
+ROWS = NUM_PERM // BANDS
+
+KEY_PREFIX = "idea_index:"
+LRU_KEY = "idea_index:lru"
+NEXT_ID_KEY = "idea_index:next_id"
+STATS_KEY = "idea_index:stats"
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_rng = random.Random(1337)  # Fixed seed: signatures must be stable across processes
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERM)
+]
+
+
+# Filler words that don't change what is being built
+STOPWORDS = {
+    "a", "an", "the", "i", "im", "want", "would", "like", "to", "build", "make",
+    "create", "my", "simple", "basic", "please", "that", "for", "me",
+}
+
+
+def normalize_idea(idea: str) -> str:
+    """Lowercase, drop filler words and punctuation so trivial edits don't matter."""
+    words = re.sub(r"[^a-z0-9]+", " ", idea.lower()).split()
+    return " ".join(w for w in words if w not in STOPWORDS)
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set[int]:
+    """Hashed character k-grams of the normalized text."""
+    padded = f" {text} "
+    if len(padded) <= k:
+        grams = {padded}
+    else:
+        grams = {padded[i:i + k] for i in range(len(padded) - k + 1)}
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), "little")
+        for g in grams
+    }
+
+
+def minhash(shingle_hashes: set[int]) -> tuple[int, ...]:
+    """MinHash signature of a shingle set."""
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in shingle_hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+@dataclass
+class IdeaMatch:
+    """A stored idea similar enough to reuse its questions."""
+    idea: str
+    questions: list[dict]
+    similarity: float
+
+
+def _entry_key(entry_id: int | str) -> str:
+    return f"{KEY_PREFIX}entry:{entry_id}"
+
+
+def _band_keys(user_id: int, project_type: str, sig: tuple[int, ...]) -> list[str]:
+    return [
+        f"{KEY_PREFIX}band:{user_id}:{project_type}:{b}:{'.'.join(map(str, sig[b * ROWS:(b + 1) * ROWS]))}"
+        for b in range(BANDS)
+    ]
+
+
+class IdeaIndex:
+    """MinHash/LSH index of (user, project_type, idea) → questions, held in Redis."""
+
+    def __init__(self, threshold: float | None = None, max_entries: int | None = None):
+        self.threshold = threshold if threshold is not None else settings.IDEA_CACHE_THRESHOLD
+        self.max_entries = max_entries or settings.IDEA_CACHE_MAX_ENTRIES
+        self._redis: redis.Redis | None = None
+        self._counters = cluster_counters(STATS_KEY)
+
+    @property
+    def redis_client(self) -> redis.Redis:
+        if self._redis is None:
+            # Short timeouts: a slow Redis should degrade to a miss, not stall the workflow
+            self._redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+        return self._redis
+
+    def lookup(self, user_id: int, project_type: str, idea: str) -> IdeaMatch | None:
+        """Return the user's most similar stored idea at or above the threshold."""
+        normalized = normalize_idea(idea)
+        if not normalized:
+            return None
+        sig = minhash(shingles(normalized))
+        self._counters.add("lookups")
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for band_key in _band_keys(user_id, project_type, sig):
+                pipe.smembers(band_key)
+            candidates = sorted({int(i) for members in pipe.execute() for i in members})
+            if not candidates:
+                return None
+            entries = self.redis_client.mget([_entry_key(i) for i in candidates])
+        except redis.RedisError as e:
+            logger.warning("Idea index lookup failed: %s", e)
+            return None
+
+        best_id, best_score, best_entry = None, 0.0, None
+        for entry_id, raw in zip(candidates, entries):
+            if raw is None:
+                continue  # Evicted since its bands were read
+            entry = json.loads(raw)
+            score = similarity(sig, tuple(entry["signature"]))
+            if score > best_score:
+                best_id, best_score, best_entry = entry_id, score, entry
+
+        if best_id is None or best_score < self.threshold:
+            return None
+
+        self._counters.add("hits")
+        try:
+            self.redis_client.zadd(LRU_KEY, {best_id: time.time()})
+        except redis.RedisError:
+            pass  # Only affects eviction order
+        return IdeaMatch(idea=best_entry["idea"], questions=best_entry["questions"], similarity=best_score)
+
+    def add(self, user_id: int, project_type: str, idea: str, questions: list[dict]) -> None:
+        """Store the questions (JSON-serializable) generated for a user's idea."""
+        normalized = normalize_idea(idea)
+        if not normalized or not questions:
+            return
+        sig = minhash(shingles(normalized))
+        entry = {"user_id": user_id, "project_type": project_type, "idea": idea, "signature": list(sig), "questions": questions}
+
+        try:
+            entry_id = self.redis_client.incr(NEXT_ID_KEY)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.set(_entry_key(entry_id), json.dumps(entry))
+            for band_key in _band_keys(user_id, project_type, sig):
+                pipe.sadd(band_key, entry_id)
+            pipe.zadd(LRU_KEY, {entry_id: time.time()})
+            pipe.zcard(LRU_KEY)
+            size = pipe.execute()[-1]
+
+            overflow = size - self.max_entries
+            if overflow > 0:
+                self._evict([int(i) for i, _ in self.redis_client.zpopmin(LRU_KEY, overflow)])
+        except redis.RedisError as e:
+            logger.warning("Idea index add failed: %s", e)
+
+    def _evict(self, entry_ids: list[int]) -> None:
+        """Remove entries (already popped from the LRU) and their band memberships."""
+        if not entry_ids:
+            return
+        entries = self.redis_client.mget([_entry_key(i) for i in entry_ids])
+        pipe = self.redis_client.pipeline(transaction=False)
+        for entry_id, raw in zip(entry_ids, entries):
+            if raw is not None:
+                entry = json.loads(raw)
+                for band_key in _band_keys(entry["user_id"], entry["project_type"], tuple(entry["signature"])):
+                    pipe.srem(band_key, entry_id)
+            pipe.delete(_entry_key(entry_id))
+        pipe.execute()
+
+    def stats(self) -> dict:
+        """Entries, lookups and hit rate, summed over every worker."""
+        counts = self._counters.totals()
+        lookups, hits = int(counts.get("lookups", 0)), int(counts.get("hits", 0))
+        return {
+            "entries": self.redis_client.zcard(LRU_KEY),
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "threshold": self.threshold,
+        }
+
+
+# Singleton instance (per worker process; the index itself is shared)
+idea_index = IdeaIndex()
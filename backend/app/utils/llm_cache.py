@@ -0,0 +1,188 @@
+"""Content-addressed cache of LLM responses.
+
+Two tiers: a per-process LRU (bounded by entry count, with TTL) in front of a
+shared Redis tier (TTL per entry, total entries capped via a sorted-set
+index). Keys are a SHA-256 over the full request, so only byte-identical
+requests hit. LLMClient turns hits into LLMResponse objects with zero token
+usage (nothing is billed) and latency_ms measuring the cache lookup itself.
+Hit/miss counters are kept per process and summed across workers in Redis
+(cluster_stats()).
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+
+from app.config import settings
+from app.utils.cluster_stats import cluster_counters
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "llm_cache:"
+REDIS_INDEX_KEY = "llm_cache:index"  # ZSET of cache keys scored by insert time
+STATS_KEY = "llm_cache:stats"
+
+
+def request_key(
+    model: str,
+    system_prompt: str,
+    user_message: str,
+    temperature: float,
+    max_tokens: int,
+    json_schema: dict | None = None,
+) -> str:
+    """Stable content hash of an LLM request."""
+    fields = [model, system_prompt, user_message, temperature, max_tokens]
+    if json_schema is not None:
+        fields.append(json_schema)  # Appended only when set, so existing keys stay valid
+    payload = json.dumps(fields, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """In-process LRU + Redis cache for LLM responses."""
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl_seconds: int | None = None,
+        redis_max_entries: int | None = None,
+        max_entry_bytes: int | None = None,
+    ):
+        self.max_entries = max_entries or settings.LLM_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.LLM_CACHE_TTL_SECONDS
+        self.redis_max_entries = redis_max_entries or settings.LLM_CACHE_REDIS_MAX_ENTRIES
+        self.max_entry_bytes = max_entry_bytes or settings.LLM_CACHE_MAX_ENTRY_BYTES
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()  # key → (expires_at, payload)
+        self._lock = threading.Lock()
+        self._redis: redis.Redis | None = None
+        self._stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+        self._cluster = cluster_counters(STATS_KEY)
+
+    @property
+    def redis_client(self) -> redis.Redis:
+        if self._redis is None:
+            # Short timeouts: a slow Redis should degrade to a cache miss, not stall the call
+            self._redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+        return self._redis
+
+    # ─── Lookup / store ──────────────────────────────────────────
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached {"content", "model"} payload for key, or None on a miss."""
+        payload = self._memory_get(key)
+        if payload is not None:
+            self._count("memory_hits")
+            return payload
+
+        payload = self._redis_get(key)
+        if payload is not None:
+            self._memory_set(key, payload)
+            self._count("redis_hits")
+            return payload
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, content: str, model: str) -> None:
+        """Store a provider response in both tiers (skipped if oversized)."""
+        if len(content.encode()) > self.max_entry_bytes:
+            return
+        payload = {"content": content, "model": model}
+        self._memory_set(key, payload)
+        self._redis_set(key, payload)
+        self._count("stores")
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus current tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        stats["hit_rate"] = _hit_rate(stats)
+        return stats
+
+    def cluster_stats(self) -> dict:
+        """Hit/miss counters summed over every worker, plus the Redis tier's size."""
+        raw = self._cluster.totals()
+        stats = {name: int(raw.get(name, 0)) for name in self._stats}
+        stats["hit_rate"] = _hit_rate(stats)
+        stats["redis_entries"] = self.redis_client.zcard(REDIS_INDEX_KEY)
+        return stats
+
+    def clear(self) -> None:
+        """Drop the in-process tier (Redis entries expire on their own)."""
+        with self._lock:
+            self._memory.clear()
+
+    # ─── Internal helpers ────────────────────────────────────────
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += n
+        self._cluster.add(name, n)
+
+    def _memory_get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.monotonic():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return payload
+
+    def _memory_set(self, key: str, payload: dict) -> None:
+        evicted = 0
+        with self._lock:
+            self._memory[key] = (time.monotonic() + self.ttl_seconds, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _redis_get(self, key: str) -> dict | None:
+        try:
+            raw = self.redis_client.get(REDIS_KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning("LLM cache Redis read failed: %s", e)
+            self._count("errors")
+            return None
+        return json.loads(raw) if raw else None
+
+    def _redis_set(self, key: str, payload: dict) -> None:
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.set(REDIS_KEY_PREFIX + key, json.dumps(payload), ex=self.ttl_seconds)
+            pipe.zadd(REDIS_INDEX_KEY, {key: time.time()})
+            # Forget index entries whose keys have already expired via TTL
+            pipe.zremrangebyscore(REDIS_INDEX_KEY, 0, time.time() - self.ttl_seconds)
+            pipe.zcard(REDIS_INDEX_KEY)
+            size = pipe.execute()[-1]
+
+            overflow = size - self.redis_max_entries
+            if overflow > 0:
+                oldest = self.redis_client.zpopmin(REDIS_INDEX_KEY, overflow)
+                if oldest:
+                    self.redis_client.delete(*(REDIS_KEY_PREFIX + k.decode() for k, _ in oldest))
+                    self._count("evictions", len(oldest))
+        except redis.RedisError as e:
+            logger.warning("LLM cache Redis write failed: %s", e)
+            self._count("errors")
+
+
+def _hit_rate(stats: dict) -> float:
+    lookups = stats["memory_hits"] + stats["redis_hits"] + stats["misses"]
+    return round((stats["memory_hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0
+
+
+# Singleton instance
+llm_response_cache = LLMResponseCache()
@@ -0,0 +1,114 @@
+"""Record/replay cassettes for LLM calls.
+
+With LLM_CASSETTE_MODE="record", LLMClient appends every provider response
+(content, usage, latency) to a cassette file; with "replay" it serves them
+back instead of calling the provider, waiting the recorded latency scaled by
+LLM_CASSETTE_TIME_SCALE (1.0 = original timing, 0 = as fast as possible).
+Replaying a recorded workflow makes benchmarks reproducible and separates
+parser, DB and event overhead from provider variance.
+
+The cassette is JSON lines (gzip-compressed if the path ends in .gz), one
+interaction per line, keyed by the same request hash as the response cache so
+prompts are not stored. Identical requests recorded more than once are
+replayed in recorded order; the last one repeats once they run out.
+"""
+
+import gzip
+import json
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# LLMResponse fields stored per interaction
+RESPONSE_FIELDS = (
+    "content", "model", "input_tokens", "output_tokens", "total_tokens",
+    "latency_ms", "cache_read_tokens", "cache_write_tokens",
+)
+
+
+class CassetteMiss(LookupError):
+    """Replay mode found no recorded response for a request."""
+
+
+class LLMCassette:
+    """Append-only recorder and in-order replayer of LLM interactions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tracks: dict[str, deque[dict]] | None = None  # Loaded on first replay
+        self._loaded_path: str | None = None
+        self._stats = {"recorded": 0, "replayed": 0, "replay_delay_s": 0.0}
+
+    @property
+    def mode(self) -> str:
+        return settings.LLM_CASSETTE_MODE
+
+    @property
+    def path(self) -> Path:
+        return Path(settings.LLM_CASSETTE_PATH)
+
+    def _open(self, mode: str):
+        if self.path.suffix == ".gz":
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    # ─── Record ──────────────────────────────────────────────────
+
+    def record(self, key: str, response: dict) -> None:
+        """Append one interaction; response holds the LLMResponse fields."""
+        entry = {"key": key, **{f: response[f] for f in RESPONSE_FIELDS}}
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._open("a") as f:
+                f.write(line)
+            self._stats["recorded"] += 1
+
+    # ─── Replay ──────────────────────────────────────────────────
+
+    def _load(self) -> dict[str, deque[dict]]:
+        tracks: dict[str, deque[dict]] = {}
+        with self._open("r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    tracks.setdefault(entry.pop("key"), deque()).append(entry)
+        logger.info("Loaded cassette %s (%d distinct requests)", self.path, len(tracks))
+        return tracks
+
+    def play(self, key: str) -> tuple[dict, float]:
+        """Return (response fields, seconds to wait) for the next recorded answer to key."""
+        with self._lock:
+            if self._tracks is None or self._loaded_path != str(self.path):
+                self._tracks = self._load()
+                self._loaded_path = str(self.path)
+            track = self._tracks.get(key)
+            if not track:
+                raise CassetteMiss(f"No recorded LLM response in {self.path} for request {key[:12]}")
+            entry = track.popleft() if len(track) > 1 else track[0]
+            delay = entry["latency_ms"] / 1000 * settings.LLM_CASSETTE_TIME_SCALE
+            self._stats["replayed"] += 1
+            self._stats["replay_delay_s"] += delay
+        return dict(entry), delay
+
+    def rewind(self) -> None:
+        """Reload the cassette so the next replay starts from the first recording."""
+        with self._lock:
+            self._tracks = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "mode": self.mode, "path": str(self.path)}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {"recorded": 0, "replayed": 0, "replay_delay_s": 0.0}
+
+
+# Singleton instance
+llm_cassette = LLMCassette()
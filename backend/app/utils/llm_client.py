@@ -1,20 +1,33 @@
+import asyncio
+import contextvars
+import json
 import logging
+import os
+import re
+import threading
 import time
-from dataclasses import dataclass, field
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Coroutine, Generator, TypeVar
 
 import anthropic
+import httpx
 import openai
 
-from app.config import settings
+from app.config import CLAUDE_HAIKU, CLAUDE_SONNET, GPT_4O_MINI, settings
+from app.utils import deadline
+from app.utils.circuit_breaker import CircuitOpenError, circuit_breaker
+from app.utils.llm_cache import llm_response_cache, request_key
+from app.utils.llm_cassette import llm_cassette
+from app.utils.llm_hedging import HedgePolicy, hedge_stats, latency_tracker
+from app.utils.llm_singleflight import llm_single_flight
+from app.utils.llm_rate_limiter import RateLimitQueueFull, estimate_tokens, provider_rate_limiter
 
 logger = logging.getLogger(__name__)
 
-# Model ID constants
-CLAUDE_HAIKU = "claude-haiku-4-5-20251001"
-CLAUDE_SONNET = "claude-sonnet-4-20250514"
-GPT_4O_MINI = "gpt-4o-mini"
+T = TypeVar("T")
 
-# Provider detection
+# Provider detection (model ID constants come from app.config)
 ANTHROPIC_MODELS = {CLAUDE_HAIKU, CLAUDE_SONNET}
 OPENAI_MODELS = {GPT_4O_MINI}
 
@@ -27,6 +40,207 @@ class LLMResponse:
     output_tokens: int = 0
     total_tokens: int = 0
     latency_ms: float = 0
+    cache_read_tokens: int = 0   # Prompt tokens served from the provider's prompt cache
+    cache_write_tokens: int = 0  # Prompt tokens written to the provider's prompt cache
+    from_cache: bool = False     # Served by the LLM response cache; nothing was billed
+    flight_role: str = ""        # "leader" / "follower" when coalesced with identical in-flight calls
+    # A losing hedged request's usage (estimated at the time the winner returned); billed too
+    wasted_model: str = ""
+    wasted_input_tokens: int = 0
+    wasted_output_tokens: int = 0
+
+
+# Transient errors worth retrying with backoff
+ANTHROPIC_RETRYABLE = (anthropic.APITimeoutError, anthropic.APIConnectionError, anthropic.RateLimitError)
+OPENAI_RETRYABLE = (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)
+
+REPLAY_CHUNK_CHARS = 64  # Delta size when replaying a cassette into a stream
+
+
+class LLMProviderError(RuntimeError):
+    """A provider call failed after exhausting its retries."""
+
+
+def provider_for(model: str) -> str:
+    if model in ANTHROPIC_MODELS:
+        return "anthropic"
+    if model in OPENAI_MODELS:
+        return "openai"
+    raise ValueError(f"Unknown model: {model}")
+
+
+def _client_options(provider: str) -> dict:
+    """SDK client kwargs for Settings.LLM_BACKEND.
+
+    "live" uses the real provider endpoints; "fake" points both SDKs at the
+    local stand-in server (app.utils.fake_llm_server), which ignores keys.
+    """
+    api_key = settings.ANTHROPIC_API_KEY if provider == "anthropic" else settings.OPENAI_API_KEY
+    if settings.LLM_BACKEND == "live":
+        return {"api_key": api_key}
+    if settings.LLM_BACKEND != "fake":
+        raise ValueError(f"Unknown LLM_BACKEND: {settings.LLM_BACKEND}")
+    base_url = settings.FAKE_LLM_BASE_URL.rstrip("/")
+    return {
+        "api_key": api_key or "fake",
+        "base_url": base_url + "/v1" if provider == "openai" else base_url,
+    }
+
+
+def _replayed_response(entry: dict, delay: float) -> LLMResponse:
+    """LLMResponse for a cassette entry, with the latency actually waited."""
+    return LLMResponse(**{**entry, "latency_ms": delay * 1000})
+
+
+# Errors meaning the provider (its capacity, or the workflow's time budget) is unavailable rather
+# than the request being wrong; optional stages degrade on these instead of failing the workflow
+PROVIDER_UNAVAILABLE = (CircuitOpenError, LLMProviderError, RateLimitQueueFull, deadline.DeadlineExceeded)
+
+
+def _is_server_error(error: Exception) -> bool:
+    return isinstance(error, (anthropic.APIStatusError, openai.APIStatusError)) and error.status_code >= 500
+
+
+def _is_provider_failure(error: BaseException) -> bool:
+    """Whether an error says the provider is unhealthy (counts toward its breaker).
+
+    The call paths raise every such failure (retries exhausted, 5xx
+    responses, streams broken off mid-way) as LLMProviderError.
+    """
+    return isinstance(error, LLMProviderError)
+
+
+# Prompt caching: Anthropic caches up to explicit breakpoints (the system
+# prompt and an optional user-message prefix such as the spec); OpenAI caches
+# identical prompt prefixes automatically, so the prefix just has to come first.
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _anthropic_system(system_prompt: str) -> list[dict]:
+    return [{"type": "text", "text": system_prompt, "cache_control": CACHE_CONTROL}]
+
+
+def _anthropic_messages(user_message: str, cache_prefix: str = "") -> list[dict]:
+    if not cache_prefix:
+        return [{"role": "user", "content": user_message}]
+    return [{"role": "user", "content": [
+        {"type": "text", "text": cache_prefix, "cache_control": CACHE_CONTROL},
+        {"type": "text", "text": user_message},
+    ]}]
+
+
+def _openai_messages(system_prompt: str, user_message: str, cache_prefix: str = "") -> list[dict]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": cache_prefix + user_message},
+    ]
+
+
+def _schema_name(json_schema: dict) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]", "_", json_schema.get("title", "response"))[:64]
+
+
+def _anthropic_structured(json_schema: dict | None) -> dict:
+    """Request kwargs forcing a single tool call whose input is the structured output."""
+    if json_schema is None:
+        return {}
+    name = _schema_name(json_schema)
+    return {
+        "tools": [{"name": name, "description": "Return the response as structured data.", "input_schema": json_schema}],
+        "tool_choice": {"type": "tool", "name": name},
+    }
+
+
+def _openai_structured(json_schema: dict | None) -> dict:
+    """Request kwargs for schema-constrained JSON output (the schema must be strict-mode compatible)."""
+    if json_schema is None:
+        return {}
+    return {"response_format": {
+        "type": "json_schema",
+        "json_schema": {"name": _schema_name(json_schema), "schema": json_schema, "strict": True},
+    }}
+
+
+def _anthropic_content(blocks) -> str:
+    # A forced tool call (structured output) carries the answer as its input
+    for block in blocks:
+        if block.type == "tool_use":
+            return json.dumps(block.input)
+    return "".join(block.text for block in blocks if block.type == "text")
+
+
+def _anthropic_usage(usage) -> dict:
+    # input_tokens excludes cached tokens; cache fields may be None
+    cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    return {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.input_tokens + usage.output_tokens + cache_read + cache_write,
+        "cache_read_tokens": cache_read,
+        "cache_write_tokens": cache_write,
+    }
+
+
+def _openai_usage(usage) -> dict:
+    # prompt_tokens includes cached tokens; split them out so they are priced separately
+    details = getattr(usage, "prompt_tokens_details", None)
+    cache_read = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+    return {
+        "input_tokens": usage.prompt_tokens - cache_read,
+        "output_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+        "cache_read_tokens": cache_read,
+        "cache_write_tokens": 0,
+    }
+
+
+def _anthropic_response(response, model: str, latency: float) -> LLMResponse:
+    return LLMResponse(
+        content=_anthropic_content(response.content),
+        model=model,
+        latency_ms=latency,
+        **_anthropic_usage(response.usage),
+    )
+
+
+def _openai_response(response, model: str, latency: float) -> LLMResponse:
+    return LLMResponse(
+        content=response.choices[0].message.content,
+        model=model,
+        latency_ms=latency,
+        **_openai_usage(response.usage),
+    )
+
+
+class _HedgeCancelled(Exception):
+    """Raised inside a losing hedged stream to abort it."""
+
+
+class _HedgeAttempt:
+    """One side of a hedged race; its stream aborts once cancelled is set."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.cancelled = threading.Event()
+        self.output_chars = 0
+
+    def on_delta(self, text: str) -> None:
+        self.output_chars += len(text)
+        if self.cancelled.is_set():
+            raise _HedgeCancelled()
+
+    def record_waste(self, future: Future, prompt_tokens: int) -> None:
+        """Account the loser's spend: exact usage if it finished, else an estimate."""
+        if not future.cancelled() and future.exception() is None:
+            response = future.result()
+            hedge_stats.record_waste(self.model, response.input_tokens, response.output_tokens)
+        else:
+            hedge_stats.record_waste(self.model, prompt_tokens, self.output_chars // 4)
+
+
+# Shared pool for hedged attempts (two threads per in-flight hedged call)
+_hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
 
 
 class LLMClient:
@@ -39,13 +253,13 @@ class LLMClient:
     @property
     def anthropic_client(self) -> anthropic.Anthropic:
         if self._anthropic is None:
-            self._anthropic = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+            self._anthropic = anthropic.Anthropic(**_client_options("anthropic"))
         return self._anthropic
 
     @property
     def openai_client(self) -> openai.OpenAI:
         if self._openai is None:
-            self._openai = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+            self._openai = openai.OpenAI(**_client_options("openai"))
         return self._openai
 
     def call(
@@ -56,15 +270,254 @@ class LLMClient:
         max_tokens: int = 4096,
         temperature: float = 0.7,
         max_retries: int = 3,
+        on_delta: Callable[[str], None] | None = None,
+        cache_prefix: str = "",
+        use_cache: bool = False,
+        hedge: HedgePolicy | None = None,
+        json_schema: dict | None = None,
     ) -> LLMResponse:
-        """Call an LLM with automatic provider routing and retry logic."""
+        """Call an LLM with automatic provider routing and retry logic.
+
+        If on_delta is given the completion is streamed and on_delta is called
+        with each text delta as it arrives; the returned LLMResponse is the same
+        as for a non-streamed call.
+
+        cache_prefix is sent immediately before user_message and marked as a
+        prompt-cache breakpoint, so a large repeated prefix (e.g. the spec) is
+        billed at the cache-read rate on subsequent calls.
+
+        use_cache serves byte-identical requests from the LLM response cache
+        (see app.utils.llm_cache) and stores fresh responses in it.
+
+        hedge enables hedged requests for non-streamed calls (see
+        app.utils.llm_hedging): once the call outlives the policy's latency
+        percentile, a second request races it and the first answer wins.
+
+        In cassette record/replay mode (see app.utils.llm_cassette) the
+        response cache is bypassed so recordings capture every provider call.
+
+        Identical calls already in flight on any worker are coalesced: only
+        the leader calls the provider, and LLMResponse.flight_role reports
+        "leader" or "follower".
+
+        json_schema requests provider-native structured output (OpenAI
+        response_format, a forced Anthropic tool call); content is then the
+        JSON document as a string.
+        """
+        if use_cache and llm_cassette.mode == "off":
+            start = time.monotonic()
+            key = request_key(model, system_prompt, cache_prefix + user_message, temperature, max_tokens, json_schema)
+            cached = llm_response_cache.get(key)
+            if cached is not None:
+                if on_delta is not None:
+                    on_delta(cached["content"])
+                return LLMResponse(
+                    content=cached["content"],
+                    model=cached["model"],
+                    latency_ms=(time.monotonic() - start) * 1000,
+                    from_cache=True,
+                )
+            response = self.call(
+                model, system_prompt, user_message, max_tokens, temperature, max_retries,
+                on_delta=on_delta, cache_prefix=cache_prefix, hedge=hedge, json_schema=json_schema,
+            )
+            llm_response_cache.set(key, response.content, response.model)
+            return response
+
+        key = request_key(model, system_prompt, cache_prefix + user_message, temperature, max_tokens, json_schema)
+        if llm_cassette.mode == "replay":
+            return self._replay(key, on_delta)
+
+        def fetch() -> LLMResponse:
+            if hedge is not None and on_delta is None:
+                return self._call_hedged(
+                    hedge, model, system_prompt, user_message, max_tokens, temperature, max_retries, cache_prefix,
+                    json_schema,
+                )
+            return self._call_provider(
+                model, system_prompt, user_message, max_tokens, temperature, max_retries, on_delta, cache_prefix,
+                json_schema,
+            )
+
+        response = self._single_flight(key, fetch, on_delta)
+        if llm_cassette.mode == "record":
+            llm_cassette.record(key, asdict(response))
+        return response
+
+    @staticmethod
+    def _single_flight(
+        key: str, fetch: Callable[[], LLMResponse], on_delta: Callable[[str], None] | None
+    ) -> LLMResponse:
+        """Share one provider request among identical concurrent calls (see app.utils.llm_singleflight).
+
+        Followers get the leader's response verbatim; a streaming follower
+        receives the whole content as a single delta.
+        """
+        own: list[LLMResponse] = []
+
+        def lead() -> dict:
+            own.append(fetch())
+            return asdict(own[0])
+
+        payload, role = llm_single_flight.run(key, lead)
+        if own:
+            own[0].flight_role = role
+            return own[0]
+        if on_delta is not None:
+            on_delta(payload["content"])
+        return LLMResponse(**{**payload, "flight_role": role})
+
+    @staticmethod
+    def _replay(key: str, on_delta: Callable[[str], None] | None) -> LLMResponse:
+        """Serve a recorded response, paced like the original (scaled) call."""
+        entry, delay = llm_cassette.play(key)
+        if on_delta is None:
+            time.sleep(delay)
+        else:
+            content = entry["content"]
+            chunks = [content[i:i + REPLAY_CHUNK_CHARS] for i in range(0, len(content), REPLAY_CHUNK_CHARS)]
+            for chunk in chunks:
+                time.sleep(delay / len(chunks))
+                on_delta(chunk)
+        return _replayed_response(entry, delay)
+
+    def _call_provider(
+        self,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        temperature: float,
+        max_retries: int,
+        on_delta: Callable[[str], None] | None,
+        cache_prefix: str,
+        json_schema: dict | None = None,
+    ) -> LLMResponse:
+        """One rate-limited, circuit-broken provider request; records its latency for hedging."""
+        provider = provider_for(model)
+        deadline.check(f"{model} call")
+        circuit_breaker.before_call(provider)  # Fail fast while the provider is down
+
+        # Reserve cluster-wide RPM/TPM capacity, then settle on actual usage
+        reservation = provider_rate_limiter.acquire(model, system_prompt + cache_prefix + user_message, max_tokens)
+        try:
+            response = self._dispatch(
+                model, system_prompt, user_message, max_tokens, temperature, max_retries, on_delta, cache_prefix,
+                json_schema,
+            )
+        except Exception as e:
+            provider_rate_limiter.reconcile(reservation, 0, 0)
+            if _is_provider_failure(e):
+                circuit_breaker.record_failure(provider)
+            raise
+        provider_rate_limiter.reconcile(
+            reservation, response.total_tokens - response.output_tokens, response.output_tokens
+        )
+        circuit_breaker.record_success(provider)
+        latency_tracker.record(model, max_tokens, response.latency_ms)
+        return response
+
+    def _call_hedged(
+        self,
+        policy: HedgePolicy,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        temperature: float,
+        max_retries: int,
+        cache_prefix: str,
+        json_schema: dict | None = None,
+    ) -> LLMResponse:
+        """Race a hedge request against a slow primary and keep the first answer.
+
+        Both requests are streamed so the loser can be cancelled mid-generation
+        by aborting its stream.
+        """
+        delay = latency_tracker.hedge_delay(model, max_tokens, policy)
+        if delay is None:
+            return self._call_provider(
+                model, system_prompt, user_message, max_tokens, temperature, max_retries, None, cache_prefix,
+                json_schema,
+            )
+
+        hedge_stats.record_call()
+        prompt_tokens = estimate_tokens(system_prompt + cache_prefix + user_message)
+
+        def run(attempt: _HedgeAttempt) -> LLMResponse:
+            return self._call_provider(
+                attempt.model, system_prompt, user_message, max_tokens, temperature, max_retries,
+                attempt.on_delta, cache_prefix, json_schema,
+            )
+
+        primary = _HedgeAttempt(model)
+        attempts = {_hedge_executor.submit(contextvars.copy_context().run, run, primary): primary}
+        done, _ = wait(attempts, timeout=delay)
+        if done:
+            return done.pop().result()
+
+        hedge = _HedgeAttempt(policy.fallback_model or model)
+        logger.info(f"Hedging {model} call after {delay:.1f}s with {hedge.model}")
+        hedge_stats.record_fired()
+        attempts[_hedge_executor.submit(contextvars.copy_context().run, run, hedge)] = hedge
+
+        pending = set(attempts)
+        errors: list[Exception] = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+
+                winner = attempts[future]
+                hedge_stats.record_winner(hedge_won=winner is hedge)
+                for loser_future in pending:
+                    loser = attempts[loser_future]
+                    loser.cancelled.set()
+                    loser_future.add_done_callback(lambda f, a=loser: a.record_waste(f, prompt_tokens))
+                    response.wasted_model = loser.model
+                    response.wasted_input_tokens = prompt_tokens
+                    response.wasted_output_tokens = loser.output_chars // 4
+                return response
+
+        raise errors[0]
+
+    def _dispatch(
+        self,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        temperature: float,
+        max_retries: int,
+        on_delta: Callable[[str], None] | None,
+        cache_prefix: str,
+        json_schema: dict | None = None,
+    ) -> LLMResponse:
+        """Route one request to its provider, streaming if on_delta is set."""
+        if on_delta is not None:
+            deltas = self.stream(
+                model, system_prompt, user_message, max_tokens, temperature, max_retries, cache_prefix, json_schema
+            )
+            try:
+                while True:
+                    try:
+                        on_delta(next(deltas))
+                    except StopIteration as done:
+                        return done.value
+            finally:
+                deltas.close()  # If on_delta raised, abort the underlying HTTP stream now
+
         if model in ANTHROPIC_MODELS:
             return self._call_anthropic(
-                model, system_prompt, user_message, max_tokens, temperature, max_retries
+                model, system_prompt, user_message, max_tokens, temperature, max_retries, cache_prefix, json_schema
             )
         elif model in OPENAI_MODELS:
             return self._call_openai(
-                model, system_prompt, user_message, max_tokens, temperature, max_retries
+                model, system_prompt, user_message, max_tokens, temperature, max_retries, cache_prefix, json_schema
             )
         else:
             raise ValueError(f"Unknown model: {model}")
@@ -77,6 +530,8 @@ class LLMClient:
         max_tokens: int,
         temperature: float,
         max_retries: int,
+        cache_prefix: str = "",
+        json_schema: dict | None = None,
     ) -> LLMResponse:
         last_error = None
         for attempt in range(max_retries):
@@ -86,29 +541,29 @@ class LLMClient:
                     model=model,
                     max_tokens=max_tokens,
                     temperature=temperature,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_message}],
+                    system=_anthropic_system(system_prompt),
+                    messages=_anthropic_messages(user_message, cache_prefix),
+                    timeout=deadline.request_timeout(settings.LLM_REQUEST_TIMEOUT_SECONDS),
+                    **_anthropic_structured(json_schema),
                 )
                 latency = (time.monotonic() - start) * 1000
-
-                return LLMResponse(
-                    content=response.content[0].text,
-                    model=model,
-                    input_tokens=response.usage.input_tokens,
-                    output_tokens=response.usage.output_tokens,
-                    total_tokens=response.usage.input_tokens + response.usage.output_tokens,
-                    latency_ms=latency,
-                )
-            except (anthropic.APITimeoutError, anthropic.APIConnectionError, anthropic.RateLimitError) as e:
+                return _anthropic_response(response, model, latency)
+            except ANTHROPIC_RETRYABLE as e:
                 last_error = e
                 wait = 2 ** attempt
+                if circuit_breaker.is_open("anthropic"):
+                    raise CircuitOpenError("anthropic") from e
+                if not deadline.can_retry(wait):
+                    raise deadline.DeadlineExceeded(f"No time left to retry Anthropic call: {e}") from e
                 logger.warning(f"Anthropic API error (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {wait}s")
                 time.sleep(wait)
             except anthropic.APIError as e:
                 logger.error(f"Anthropic API error (non-retryable): {e}")
+                if _is_server_error(e):
+                    raise LLMProviderError(f"Anthropic API server error: {e}") from e
                 raise
 
-        raise RuntimeError(f"Anthropic API failed after {max_retries} retries: {last_error}")
+        raise LLMProviderError(f"Anthropic API failed after {max_retries} retries: {last_error}")
 
     def _call_openai(
         self,
@@ -118,6 +573,8 @@ class LLMClient:
         max_tokens: int,
         temperature: float,
         max_retries: int,
+        cache_prefix: str = "",
+        json_schema: dict | None = None,
     ) -> LLMResponse:
         last_error = None
         for attempt in range(max_retries):
@@ -127,33 +584,572 @@ class LLMClient:
                     model=model,
                     max_tokens=max_tokens,
                     temperature=temperature,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_message},
-                    ],
+                    messages=_openai_messages(system_prompt, user_message, cache_prefix),
+                    timeout=deadline.request_timeout(settings.LLM_REQUEST_TIMEOUT_SECONDS),
+                    **_openai_structured(json_schema),
                 )
                 latency = (time.monotonic() - start) * 1000
+                return _openai_response(response, model, latency)
+            except OPENAI_RETRYABLE as e:
+                last_error = e
+                wait = 2 ** attempt
+                if circuit_breaker.is_open("openai"):
+                    raise CircuitOpenError("openai") from e
+                if not deadline.can_retry(wait):
+                    raise deadline.DeadlineExceeded(f"No time left to retry OpenAI call: {e}") from e
+                logger.warning(f"OpenAI API error (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {wait}s")
+                time.sleep(wait)
+            except openai.APIError as e:
+                logger.error(f"OpenAI API error (non-retryable): {e}")
+                if _is_server_error(e):
+                    raise LLMProviderError(f"OpenAI API server error: {e}") from e
+                raise
+
+        raise LLMProviderError(f"OpenAI API failed after {max_retries} retries: {last_error}")
 
-                usage = response.usage
+    # ─── Streaming ───────────────────────────────────────────────
+
+    def stream(
+        self,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        max_retries: int = 3,
+        cache_prefix: str = "",
+        json_schema: dict | None = None,
+    ) -> Generator[str, None, LLMResponse]:
+        """Stream a completion, yielding text deltas as they arrive.
+
+        The generator's return value (StopIteration.value, or the result of
+        ``yield from``) is the final LLMResponse with full content and usage.
+        Transient errors are retried only before the first delta is yielded;
+        once text has reached the caller a retry would duplicate it.
+        """
+        if model in ANTHROPIC_MODELS:
+            attempt_fn, retryable, provider = self._stream_anthropic, ANTHROPIC_RETRYABLE, "Anthropic"
+        elif model in OPENAI_MODELS:
+            attempt_fn, retryable, provider = self._stream_openai, OPENAI_RETRYABLE, "OpenAI"
+        else:
+            raise ValueError(f"Unknown model: {model}")
+
+        last_error = None
+        for attempt in range(max_retries):
+            started = False
+            try:
+                deltas = attempt_fn(
+                    model, system_prompt, user_message, max_tokens, temperature, cache_prefix, json_schema
+                )
+                while True:
+                    try:
+                        delta = next(deltas)
+                    except StopIteration as done:
+                        return done.value
+                    started = True
+                    yield delta
+            except retryable as e:
+                if started:
+                    raise LLMProviderError(f"{provider} stream broke off: {e}") from e
+                last_error = e
+                wait = 2 ** attempt
+                if circuit_breaker.is_open(provider_for(model)):
+                    raise CircuitOpenError(provider_for(model)) from e
+                if not deadline.can_retry(wait):
+                    raise deadline.DeadlineExceeded(f"No time left to retry {provider} stream: {e}") from e
+                logger.warning(f"{provider} stream error (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {wait}s")
+                time.sleep(wait)
+            except (anthropic.APIStatusError, openai.APIStatusError) as e:
+                if _is_server_error(e):
+                    raise LLMProviderError(f"{provider} API server error: {e}") from e
+                raise
+
+        raise LLMProviderError(f"{provider} API stream failed after {max_retries} retries: {last_error}")
+
+    def _stream_anthropic(
+        self,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        temperature: float,
+        cache_prefix: str = "",
+        json_schema: dict | None = None,
+    ) -> Generator[str, None, LLMResponse]:
+        start = time.monotonic()
+        with self.anthropic_client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=_anthropic_system(system_prompt),
+            messages=_anthropic_messages(user_message, cache_prefix),
+            timeout=deadline.request_timeout(settings.LLM_REQUEST_TIMEOUT_SECONDS),
+            **_anthropic_structured(json_schema),
+        ) as stream:
+            for event in stream:
+                # Structured output arrives as the forced tool call's input JSON
+                if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    yield event.delta.text
+                elif event.type == "content_block_delta" and event.delta.type == "input_json_delta":
+                    yield event.delta.partial_json
+            response = stream.get_final_message()
+        latency = (time.monotonic() - start) * 1000
+        return _anthropic_response(response, model, latency)
+
+    def _stream_openai(
+        self,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        temperature: float,
+        cache_prefix: str = "",
+        json_schema: dict | None = None,
+    ) -> Generator[str, None, LLMResponse]:
+        start = time.monotonic()
+        chunks = self.openai_client.chat.completions.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=_openai_messages(system_prompt, user_message, cache_prefix),
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout=deadline.request_timeout(settings.LLM_REQUEST_TIMEOUT_SECONDS),
+            **_openai_structured(json_schema),
+        )
+        parts: list[str] = []
+        usage = None
+        for chunk in chunks:
+            if chunk.usage is not None:
+                usage = chunk.usage  # Sent on the final, choice-less chunk
+            if chunk.choices and chunk.choices[0].delta.content:
+                text = chunk.choices[0].delta.content
+                parts.append(text)
+                yield text
+        latency = (time.monotonic() - start) * 1000
+
+        return LLMResponse(
+            content="".join(parts),
+            model=model,
+            latency_ms=latency,
+            **(_openai_usage(usage) if usage else {}),
+        )
+
+
+class AsyncLLMClient:
+    """Async counterpart of LLMClient built on the async provider SDKs.
+
+    Each provider gets one pooled HTTP client (sized from Settings), so many
+    concurrent workflows in one process share keep-alive connections. Backoff
+    uses asyncio.sleep and every request carries its own timeout, so a slow
+    call or a retry window never blocks other in-flight calls.
+
+    SDK clients are bound to the event loop they were created on. Sync code
+    (Celery tasks, stage threads) should go through run(), which drives every
+    coroutine on one loop owned by the client, so the pool survives across
+    calls and concurrent callers never share a loop they don't own. Awaited
+    from another loop, the clients are rebuilt for it and the old ones are
+    closed on their own loop.
+
+    Calls go through the same response cache, single-flight coalescing,
+    hedging and latency tracking as LLMClient.call(); only streaming is
+    sync-only.
+    """
+
+    def __init__(
+        self,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        timeout: float | None = None,
+    ):
+        self.max_connections = max_connections or settings.LLM_MAX_CONNECTIONS
+        self.max_keepalive_connections = max_keepalive_connections or settings.LLM_MAX_KEEPALIVE_CONNECTIONS
+        self.timeout = timeout or settings.LLM_REQUEST_TIMEOUT_SECONDS
+        self._reset()
+        # The owned loop's thread and its connections don't survive a fork
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._anthropic: anthropic.AsyncAnthropic | None = None
+        self._openai: openai.AsyncOpenAI | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None  # Loop the SDK clients belong to
+        self._own_loop: asyncio.AbstractEventLoop | None = None
+        # Bridges single-flight (blocking Redis waits) to the loop; one thread per in-flight call
+        self._flight_executor = ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix="llm-flight")
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+        )
+
+    # ─── Event loop ──────────────────────────────────────────────
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run coro on this client's own event loop and wait for its result.
+
+        The loop lives on a daemon thread started on first use. The caller's
+        context (e.g. the workflow deadline) carries over to coro.
+        """
+        with self._lock:
+            if self._own_loop is None:
+                self._own_loop = asyncio.new_event_loop()
+                threading.Thread(target=self._own_loop.run_forever, name="llm-async", daemon=True).start()
+            loop = self._own_loop
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()  # E.g. the task's soft time limit fired while waiting
+            raise
+
+    def _sdk_client(self, provider: str) -> anthropic.AsyncAnthropic | openai.AsyncOpenAI:
+        """The provider's SDK client for the running loop, replacing clients of another loop."""
+        loop = asyncio.get_running_loop()
+        stale: list = []
+        with self._lock:
+            if self._loop is not loop:
+                stale = [c for c in (self._anthropic, self._openai) if c is not None]
+                stale_loop, self._loop = self._loop, loop
+                self._anthropic = self._openai = None
+            if provider == "anthropic":
+                if self._anthropic is None:
+                    self._anthropic = anthropic.AsyncAnthropic(
+                        **_client_options("anthropic"),
+                        max_retries=0,  # Retries are handled in _call_anthropic
+                        http_client=anthropic.DefaultAsyncHttpxClient(limits=self._limits(), timeout=self.timeout),
+                    )
+                client = self._anthropic
+            else:
+                if self._openai is None:
+                    self._openai = openai.AsyncOpenAI(
+                        **_client_options("openai"),
+                        max_retries=0,  # Retries are handled in _call_openai
+                        http_client=openai.DefaultAsyncHttpxClient(limits=self._limits(), timeout=self.timeout),
+                    )
+                client = self._openai
+        if stale:
+            self._close_on(stale_loop, stale)
+        return client
+
+    @staticmethod
+    def _close_on(loop: asyncio.AbstractEventLoop, clients: list) -> None:
+        """Close SDK clients on the loop their connections belong to."""
+        if loop.is_closed():
+            # Their transports can no longer be closed cleanly; the sockets close when collected
+            logger.warning(
+                "Dropping %d async LLM client(s) of a closed event loop — "
+                "use AsyncLLMClient.run() or aclose() before the loop ends", len(clients),
+            )
+            return
+        for client in clients:
+            asyncio.run_coroutine_threadsafe(client.close(), loop)
+
+    @property
+    def anthropic_client(self) -> anthropic.AsyncAnthropic:
+        return self._sdk_client("anthropic")
+
+    @property
+    def openai_client(self) -> openai.AsyncOpenAI:
+        return self._sdk_client("openai")
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections (call on the loop that used them)."""
+        with self._lock:
+            clients = [c for c in (self._anthropic, self._openai) if c is not None]
+            self._anthropic = self._openai = None
+            self._loop = None
+        for client in clients:
+            await client.close()
+
+    # ─── Calls ───────────────────────────────────────────────────
+
+    async def call(
+        self,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        max_retries: int = 3,
+        timeout: float | None = None,
+        cache_prefix: str = "",
+        use_cache: bool = False,
+        hedge: HedgePolicy | None = None,
+        json_schema: dict | None = None,
+    ) -> LLMResponse:
+        """Call an LLM with automatic provider routing and non-blocking retries.
+
+        timeout overrides the client-wide per-request timeout (seconds);
+        cache_prefix, use_cache, hedge and json_schema behave as in
+        LLMClient.call(). Blocking Redis round-trips (cache, breaker, limiter,
+        single-flight) run off-loop.
+        """
+        key = request_key(model, system_prompt, cache_prefix + user_message, temperature, max_tokens, json_schema)
+        if use_cache and llm_cassette.mode == "off":
+            start = time.monotonic()
+            cached = await asyncio.to_thread(llm_response_cache.get, key)
+            if cached is not None:
                 return LLMResponse(
-                    content=response.choices[0].message.content,
+                    content=cached["content"],
+                    model=cached["model"],
+                    latency_ms=(time.monotonic() - start) * 1000,
+                    from_cache=True,
+                )
+            response = await self.call(
+                model, system_prompt, user_message, max_tokens, temperature, max_retries, timeout,
+                cache_prefix=cache_prefix, hedge=hedge, json_schema=json_schema,
+            )
+            await asyncio.to_thread(llm_response_cache.set, key, response.content, response.model)
+            return response
+
+        if llm_cassette.mode == "replay":
+            entry, delay = llm_cassette.play(key)
+            await asyncio.sleep(delay)
+            return _replayed_response(entry, delay)
+
+        timeout = timeout or self.timeout
+
+        async def fetch() -> LLMResponse:
+            if hedge is not None:
+                return await self._call_hedged(
+                    hedge, model, system_prompt, user_message, max_tokens, temperature, max_retries, timeout,
+                    cache_prefix, json_schema,
+                )
+            return await self._call_provider(
+                model, system_prompt, user_message, max_tokens, temperature, max_retries, timeout,
+                cache_prefix, json_schema,
+            )
+
+        response = await self._single_flight(key, fetch)
+        if llm_cassette.mode == "record":
+            await asyncio.to_thread(llm_cassette.record, key, asdict(response))
+        return response
+
+    async def _single_flight(self, key: str, fetch: Callable[[], Awaitable[LLMResponse]]) -> LLMResponse:
+        """LLMClient._single_flight() for coroutines.
+
+        SingleFlight blocks on Redis, so it runs on a helper thread; a leader
+        runs fetch() back on this loop and waits for it there.
+        """
+        loop = asyncio.get_running_loop()
+        own: list[LLMResponse] = []
+
+        def lead() -> dict:
+            own.append(asyncio.run_coroutine_threadsafe(fetch(), loop).result())
+            return asdict(own[0])
+
+        payload, role = await loop.run_in_executor(
+            self._flight_executor, contextvars.copy_context().run, llm_single_flight.run, key, lead
+        )
+        if own:
+            own[0].flight_role = role
+            return own[0]
+        return LLMResponse(**{**payload, "flight_role": role})
+
+    async def _call_provider(
+        self,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        temperature: float,
+        max_retries: int,
+        timeout: float,
+        cache_prefix: str,
+        json_schema: dict | None = None,
+    ) -> LLMResponse:
+        """One rate-limited, circuit-broken provider request; records its latency for hedging."""
+        if model in ANTHROPIC_MODELS:
+            call_fn = self._call_anthropic
+        elif model in OPENAI_MODELS:
+            call_fn = self._call_openai
+        else:
+            raise ValueError(f"Unknown model: {model}")
+
+        # Same cluster-wide breaker and limiter as LLMClient; only the rate-limit wait is awaited
+        provider = provider_for(model)
+        deadline.check(f"{model} call")
+        await asyncio.to_thread(circuit_breaker.before_call, provider)
+        reservation = await asyncio.to_thread(
+            provider_rate_limiter.reserve, model, system_prompt + cache_prefix + user_message, max_tokens
+        )
+        if reservation.wait_seconds > 0:
+            await asyncio.sleep(reservation.wait_seconds)
+        try:
+            response = await call_fn(
+                model, system_prompt, user_message, max_tokens, temperature, max_retries, timeout,
+                cache_prefix, json_schema,
+            )
+        except BaseException as e:  # Including cancellation of a losing hedge
+            await asyncio.to_thread(provider_rate_limiter.reconcile, reservation, 0, 0)
+            if _is_provider_failure(e):
+                await asyncio.to_thread(circuit_breaker.record_failure, provider)
+            raise
+        await asyncio.to_thread(
+            provider_rate_limiter.reconcile, reservation, response.total_tokens - response.output_tokens,
+            response.output_tokens,
+        )
+        await asyncio.to_thread(circuit_breaker.record_success, provider)
+        latency_tracker.record(model, max_tokens, response.latency_ms)
+        return response
+
+    async def _call_hedged(
+        self,
+        policy: HedgePolicy,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        temperature: float,
+        max_retries: int,
+        timeout: float,
+        cache_prefix: str,
+        json_schema: dict | None = None,
+    ) -> LLMResponse:
+        """LLMClient._call_hedged() for coroutines: the losing request's task is cancelled.
+
+        A cancelled request streamed nothing we could count, so its wasted
+        output is estimated from how long it ran.
+        """
+        def attempt(attempt_model: str) -> asyncio.Task:
+            return asyncio.ensure_future(self._call_provider(
+                attempt_model, system_prompt, user_message, max_tokens, temperature, max_retries, timeout,
+                cache_prefix, json_schema,
+            ))
+
+        delay = latency_tracker.hedge_delay(model, max_tokens, policy)
+        if delay is None:
+            return await attempt(model)
+
+        hedge_stats.record_call()
+        prompt_tokens = estimate_tokens(system_prompt + cache_prefix + user_message)
+        primary = attempt(model)
+        attempts = {primary: (model, time.monotonic())}
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if done:
+                return primary.result()
+
+            hedge_model = policy.fallback_model or model
+            logger.info(f"Hedging {model} call after {delay:.1f}s with {hedge_model}")
+            hedge_stats.record_fired()
+            hedge = attempt(hedge_model)
+            attempts[hedge] = (hedge_model, time.monotonic())
+
+            pending = set(attempts)
+            errors: list[BaseException] = []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        errors.append(task.exception())
+                        continue
+                    hedge_stats.record_winner(hedge_won=task is hedge)
+                    response = task.result()
+                    for loser in pending:
+                        loser_model, started = attempts[loser]
+                        ran = time.monotonic() - started
+                        wasted_output = min(max_tokens, int(ran * settings.LLM_OUTPUT_TOKENS_PER_SECOND))
+                        hedge_stats.record_waste(loser_model, prompt_tokens, wasted_output)
+                        response.wasted_model = loser_model
+                        response.wasted_input_tokens = prompt_tokens
+                        response.wasted_output_tokens = wasted_output
+                    return response
+            raise errors[0]
+        finally:
+            for task in attempts:
+                task.cancel()  # No-op for finished tasks
+
+    async def _call_anthropic(
+        self,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        temperature: float,
+        max_retries: int,
+        timeout: float,
+        cache_prefix: str = "",
+        json_schema: dict | None = None,
+    ) -> LLMResponse:
+        last_error = None
+        for attempt in range(max_retries):
+            try:
+                start = time.monotonic()
+                response = await self.anthropic_client.messages.create(
                     model=model,
-                    input_tokens=usage.prompt_tokens,
-                    output_tokens=usage.completion_tokens,
-                    total_tokens=usage.total_tokens,
-                    latency_ms=latency,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    system=_anthropic_system(system_prompt),
+                    messages=_anthropic_messages(user_message, cache_prefix),
+                    timeout=deadline.request_timeout(timeout),
+                    **_anthropic_structured(json_schema),
                 )
-            except (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError) as e:
+                latency = (time.monotonic() - start) * 1000
+                return _anthropic_response(response, model, latency)
+            except ANTHROPIC_RETRYABLE as e:
                 last_error = e
                 wait = 2 ** attempt
+                if circuit_breaker.is_open("anthropic"):
+                    raise CircuitOpenError("anthropic") from e
+                if not deadline.can_retry(wait):
+                    raise deadline.DeadlineExceeded(f"No time left to retry Anthropic call: {e}") from e
+                logger.warning(f"Anthropic API error (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {wait}s")
+                await asyncio.sleep(wait)
+            except anthropic.APIError as e:
+                logger.error(f"Anthropic API error (non-retryable): {e}")
+                if _is_server_error(e):
+                    raise LLMProviderError(f"Anthropic API server error: {e}") from e
+                raise
+
+        raise LLMProviderError(f"Anthropic API failed after {max_retries} retries: {last_error}")
+
+    async def _call_openai(
+        self,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        temperature: float,
+        max_retries: int,
+        timeout: float,
+        cache_prefix: str = "",
+        json_schema: dict | None = None,
+    ) -> LLMResponse:
+        last_error = None
+        for attempt in range(max_retries):
+            try:
+                start = time.monotonic()
+                response = await self.openai_client.chat.completions.create(
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    messages=_openai_messages(system_prompt, user_message, cache_prefix),
+                    timeout=deadline.request_timeout(timeout),
+                    **_openai_structured(json_schema),
+                )
+                latency = (time.monotonic() - start) * 1000
+                return _openai_response(response, model, latency)
+            except OPENAI_RETRYABLE as e:
+                last_error = e
+                wait = 2 ** attempt
+                if circuit_breaker.is_open("openai"):
+                    raise CircuitOpenError("openai") from e
+                if not deadline.can_retry(wait):
+                    raise deadline.DeadlineExceeded(f"No time left to retry OpenAI call: {e}") from e
                 logger.warning(f"OpenAI API error (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {wait}s")
-                time.sleep(wait)
+                await asyncio.sleep(wait)
             except openai.APIError as e:
                 logger.error(f"OpenAI API error (non-retryable): {e}")
+                if _is_server_error(e):
+                    raise LLMProviderError(f"OpenAI API server error: {e}") from e
                 raise
 
-        raise RuntimeError(f"OpenAI API failed after {max_retries} retries: {last_error}")
+        raise LLMProviderError(f"OpenAI API failed after {max_retries} retries: {last_error}")
 
 
-# Singleton instance
+# Singleton instances
 llm_client = LLMClient()
+async_llm_client = AsyncLLMClient()
@@ -0,0 +1,138 @@
+"""Hedged LLM requests: latency tracking, per-agent policies and metrics.
+
+If a call is still running after the tracked latency percentile for its
+kind of request, LLMClient fires a second (hedge) request — same model or a
+configured fallback — and keeps whichever answers first. The loser is
+cancelled by aborting its stream. HedgeStats records how often hedges fire,
+how often they win and what the losing requests cost, per process and summed
+across workers in Redis (cluster_stats()).
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+from app.config import settings
+from app.utils.cluster_stats import cluster_counters
+
+LATENCY_WINDOW = 200   # Most recent latencies kept per (model, max_tokens)
+MIN_SAMPLES = 20       # Don't hedge until the percentile is meaningful
+CHARS_PER_TOKEN = 4
+STATS_KEY = "llm_hedging:stats"
+COUNTERS = ("hedged_calls", "hedges_fired", "hedge_wins", "primary_wins")
+
+
+@dataclass
+class HedgePolicy:
+    """When and how to hedge one agent's LLM calls."""
+    percentile: float = 95.0
+    fallback_model: str | None = None  # None → hedge with the same model
+    min_delay_seconds: float = 2.0
+
+
+def hedge_policy_for(agent_name: str) -> HedgePolicy | None:
+    """Policy from Settings.LLM_HEDGE_POLICIES, or None if the agent doesn't hedge."""
+    config = settings.LLM_HEDGE_POLICIES.get(agent_name)
+    if config is None:
+        return None
+    return HedgePolicy(**config)
+
+
+class LatencyTracker:
+    """Rolling latency samples per (model, max_tokens) request shape."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._window = window
+        self._samples: dict[tuple[str, int], deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, max_tokens: int, latency_ms: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault((model, max_tokens), deque(maxlen=self._window))
+            samples.append(latency_ms)
+
+    def percentile(self, model: str, max_tokens: int, pct: float) -> float | None:
+        """Latency (ms) at pct, or None with fewer than MIN_SAMPLES samples."""
+        with self._lock:
+            samples = sorted(self._samples.get((model, max_tokens), ()))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * pct / 100))
+        return samples[index]
+
+    def hedge_delay(self, model: str, max_tokens: int, policy: HedgePolicy) -> float | None:
+        """Seconds to wait before hedging, or None if there isn't enough history."""
+        p = self.percentile(model, max_tokens, policy.percentile)
+        if p is None:
+            return None
+        return max(policy.min_delay_seconds, p / 1000)
+
+
+class HedgeStats:
+    """Process-wide hedging counters for tuning policies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(COUNTERS, 0)
+        self._wasted_tokens: dict[str, dict[str, int]] = {}  # model → {"input", "output"}
+        self._cluster = cluster_counters(STATS_KEY)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+        self._cluster.add(name)
+
+    def record_call(self) -> None:
+        self._count("hedged_calls")
+
+    def record_fired(self) -> None:
+        self._count("hedges_fired")
+
+    def record_winner(self, hedge_won: bool) -> None:
+        self._count("hedge_wins" if hedge_won else "primary_wins")
+
+    def record_waste(self, model: str, input_tokens: int, output_tokens: int) -> None:
+        """Tokens spent by a losing request (exact if it finished, else estimated)."""
+        with self._lock:
+            wasted = self._wasted_tokens.setdefault(model, {"input": 0, "output": 0})
+            wasted["input"] += input_tokens
+            wasted["output"] += output_tokens
+        self._cluster.add(f"wasted_input:{model}", input_tokens)
+        self._cluster.add(f"wasted_output:{model}", output_tokens)
+
+    def stats(self) -> dict:
+        """This process's hedging counters."""
+        with self._lock:
+            counts = dict(self._counts)
+            wasted = {m: dict(t) for m, t in self._wasted_tokens.items()}
+        return _summarize(counts, wasted)
+
+    def cluster_stats(self) -> dict:
+        """Hedging counters summed over every worker."""
+        raw = self._cluster.totals()
+        counts = {name: int(raw.get(name, 0)) for name in COUNTERS}
+        wasted: dict[str, dict[str, int]] = {}
+        for field, n in raw.items():
+            kind, _, model = field.partition(":")
+            if kind in ("wasted_input", "wasted_output"):
+                wasted.setdefault(model, {"input": 0, "output": 0})[kind.removeprefix("wasted_")] = int(n)
+        return _summarize(counts, wasted)
+
+
+def _summarize(counts: dict, wasted: dict[str, dict[str, int]]) -> dict:
+    """Hedge and win rates plus the losers' tokens and cost."""
+    from app.utils.cost_calculator import calculate_cost  # Avoid import cycle via llm_client
+
+    fired = counts["hedges_fired"]
+    counts["hedge_rate"] = round(fired / counts["hedged_calls"], 4) if counts["hedged_calls"] else 0.0
+    counts["hedge_win_rate"] = round(counts["hedge_wins"] / fired, 4) if fired else 0.0
+    counts["wasted_tokens"] = wasted
+    counts["extra_cost_usd"] = round(
+        sum(calculate_cost(m, t["input"], t["output"]) for m, t in wasted.items()), 6
+    )
+    return counts
+
+
+# Singleton instances
+latency_tracker = LatencyTracker()
+hedge_stats = HedgeStats()
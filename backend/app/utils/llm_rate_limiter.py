@@ -0,0 +1,178 @@
+"""Cluster-wide provider rate limiter: per-minute token buckets in Redis.
+
+Every worker reserves capacity from its model's buckets before calling the
+provider: requests per minute, plus the token quotas the provider enforces.
+Anthropic limits input and output tokens per minute separately
+("input_tpm", "output_tpm"); OpenAI limits their sum ("tpm"). Reservation is
+atomic (one Lua script over all buckets) and may drive a bucket negative:
+the caller is then told exactly how long to wait for its slot. Because slots
+are handed out in reservation order, waiters are served FIFO and nobody
+retries in a loop, so adding workers raises queueing delay instead of 429
+storms.
+
+Input tokens are estimated (prompt chars / 4) and output tokens reserved at
+max_tokens, capped at the output bucket's capacity so a call asking for more
+than a minute's quota still gets a slot; both are reconciled against the
+actual usage once the call returns. A queue deeper than
+LLM_RATE_LIMIT_MAX_WAIT_SECONDS raises RateLimitQueueFull. If Redis is
+unavailable the limiter fails open.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+
+import redis
+
+from app.config import CLAUDE_HAIKU, CLAUDE_SONNET, GPT_4O_MINI, settings
+from app.utils import deadline
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "llm_ratelimit:"
+CHARS_PER_TOKEN = 4
+BUCKETS = ("rpm", "input_tpm", "output_tpm", "tpm")
+
+# Default per-model quotas (the providers' entry tiers); override with Settings.LLM_RATE_LIMITS
+DEFAULT_LIMITS: dict[str, dict[str, int]] = {
+    CLAUDE_HAIKU: {"rpm": 50, "input_tpm": 50_000, "output_tpm": 10_000},
+    CLAUDE_SONNET: {"rpm": 50, "input_tpm": 30_000, "output_tpm": 8_000},
+    GPT_4O_MINI: {"rpm": 500, "tpm": 200_000},
+}
+
+# KEYS: one bucket per limit
+# ARGV: each bucket's capacity per minute, then each bucket's amount, then the key TTL
+# Refills every bucket from elapsed time, subtracts the amounts (negative
+# amounts refund, clamped at capacity) and returns the wait in seconds
+# until the most constrained bucket is back to zero.
+_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local n = #KEYS
+local wait = 0
+for i = 1, n do
+    local cap = tonumber(ARGV[i])
+    local amount = tonumber(ARGV[i + n])
+    local rate = cap / 60
+    local b = redis.call('HMGET', KEYS[i], 'level', 'ts')
+    local level = tonumber(b[1]) or cap
+    local ts = tonumber(b[2]) or now
+    level = math.min(cap, level + (now - ts) * rate)
+    level = math.min(cap, level - amount)
+    redis.call('HSET', KEYS[i], 'level', tostring(level), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[i], tonumber(ARGV[2 * n + 1]))
+    if level < 0 then
+        wait = math.max(wait, -level / rate)
+    end
+end
+return tostring(wait)
+"""
+
+
+class RateLimitQueueFull(RuntimeError):
+    """Raised instead of queueing longer than LLM_RATE_LIMIT_MAX_WAIT_SECONDS for capacity."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt size without a tokenizer."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class Reservation:
+    """Capacity reserved for one provider call."""
+    model: str
+    input_tokens: int
+    output_tokens: int
+    wait_seconds: float = 0.0
+    active: bool = True  # False when the limiter is disabled or Redis failed
+
+
+class ProviderRateLimiter:
+    """Distributed per-minute token buckets keyed per model."""
+
+    def __init__(self):
+        self._redis: redis.Redis | None = None
+        self._script = None
+
+    @property
+    def redis_client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+            self._script = self._redis.register_script(_RESERVE_SCRIPT)
+        return self._redis
+
+    @staticmethod
+    def limits_for(model: str) -> dict[str, int] | None:
+        return settings.LLM_RATE_LIMITS.get(model) or DEFAULT_LIMITS.get(model)
+
+    def _run(self, model: str, limits: dict[str, int], requests: int, input_tokens: int, output_tokens: int) -> float:
+        amounts = {
+            "rpm": requests,
+            "input_tpm": input_tokens,
+            "output_tpm": output_tokens,
+            "tpm": input_tokens + output_tokens,
+        }
+        buckets = [name for name in BUCKETS if name in limits]
+        client = self.redis_client
+        wait = self._script(
+            keys=[f"{REDIS_KEY_PREFIX}{model}:{name}" for name in buckets],
+            args=[limits[name] for name in buckets] + [amounts[name] for name in buckets] + [120],
+            client=client,
+        )
+        return float(wait)
+
+    def reserve(self, model: str, prompt: str, max_tokens: int) -> Reservation:
+        """Reserve one request, the estimated input and max_tokens of output; returns the wait for the slot."""
+        input_tokens = estimate_tokens(prompt)
+        limits = self.limits_for(model)
+        if not settings.LLM_RATE_LIMIT_ENABLED or limits is None:
+            return Reservation(model, input_tokens, max_tokens, active=False)
+        # max_tokens is an upper bound, not a forecast: reserving more than the bucket holds
+        # would make every such call wait for a refill that reconcile() mostly hands back
+        output_tokens = min(max_tokens, *(limits[name] for name in ("output_tpm", "tpm") if name in limits))
+        try:
+            wait = self._run(model, limits, 1, input_tokens, output_tokens)
+        except redis.RedisError as e:
+            logger.warning("Rate limiter unavailable (%s) — proceeding without limiting", e)
+            return Reservation(model, input_tokens, output_tokens, active=False)
+
+        if wait > settings.LLM_RATE_LIMIT_MAX_WAIT_SECONDS:
+            self._refund(model, limits, 1, input_tokens, output_tokens)
+            raise RateLimitQueueFull(
+                f"Rate limit queue for {model} is {wait:.0f}s deep "
+                f"(max {settings.LLM_RATE_LIMIT_MAX_WAIT_SECONDS}s)"
+            )
+        if wait > 0 and not deadline.can_retry(wait):
+            self._refund(model, limits, 1, input_tokens, output_tokens)
+            raise deadline.DeadlineExceeded(f"Rate limit wait of {wait:.0f}s for {model} exceeds the workflow deadline")
+        return Reservation(model, input_tokens, output_tokens, wait_seconds=wait)
+
+    def acquire(self, model: str, prompt: str, max_tokens: int) -> Reservation:
+        """Reserve capacity and block until the reserved slot comes up."""
+        reservation = self.reserve(model, prompt, max_tokens)
+        if reservation.wait_seconds > 0:
+            logger.info("Rate limiter: waiting %.1fs for %s capacity", reservation.wait_seconds, model)
+            time.sleep(reservation.wait_seconds)
+        return reservation
+
+    def reconcile(self, reservation: Reservation, input_tokens: int, output_tokens: int) -> None:
+        """Correct the token buckets once the real usage is known."""
+        if not reservation.active:
+            return
+        input_delta = reservation.input_tokens - input_tokens
+        output_delta = reservation.output_tokens - output_tokens
+        if input_delta == 0 and output_delta == 0:
+            return
+        limits = self.limits_for(reservation.model)
+        self._refund(reservation.model, limits, 0, input_delta, output_delta)
+
+    def _refund(self, model: str, limits: dict[str, int], requests: int, input_tokens: int, output_tokens: int) -> None:
+        try:
+            self._run(model, limits, -requests, -input_tokens, -output_tokens)
+        except redis.RedisError as e:
+            logger.warning("Rate limiter reconcile failed: %s", e)
+
+
+# Singleton instance
+provider_rate_limiter = ProviderRateLimiter()
@@ -0,0 +1,144 @@
+"""Single-flight coalescing of identical in-flight LLM requests across workers.
+
+Double-clicks and client retries can enqueue the same workflow step twice,
+and both runs would pay for the same call concurrently. The first caller for
+a request hash takes a Redis lock and becomes the leader; identical callers
+that arrive while it runs become followers and wait on a pub/sub channel for
+the leader's result instead of calling the provider.
+
+The leader also stores the result for RESULT_TTL_SECONDS, which closes the
+race between a follower finding the lock and subscribing. If the leader fails
+(or dies and its lock expires) followers compete for leadership again; if
+Redis is unavailable every caller just makes its own request.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Callable
+
+import redis
+
+from app.config import settings
+from app.utils import deadline
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "llm_flight:"
+RESULT_TTL_SECONDS = 30
+POLL_SECONDS = 1.0  # How often followers re-check that the leader is alive
+
+
+class SingleFlight:
+    """Redis lock + result channel that lets identical calls share one request."""
+
+    def __init__(self):
+        self._redis: redis.Redis | None = None
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "followers": 0, "uncoordinated": 0}
+
+    @property
+    def redis_client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=5, socket_connect_timeout=2)
+        return self._redis
+
+    @staticmethod
+    def _keys(key: str) -> tuple[str, str, str]:
+        base = f"{REDIS_KEY_PREFIX}{key}:"
+        return base + "lock", base + "result", base + "channel"
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def run(self, key: str, fetch: Callable[[], dict]) -> tuple[dict, str]:
+        """Return (payload, role): fetch()'s result as "leader", a shared one as "follower".
+
+        role is "" when coalescing is disabled or Redis is unreachable and
+        fetch() ran uncoordinated.
+        """
+        if not settings.LLM_SINGLE_FLIGHT_ENABLED:
+            return fetch(), ""
+
+        lock_key, _, _ = self._keys(key)
+        max_wait = settings.LLM_SINGLE_FLIGHT_MAX_WAIT_SECONDS
+        left = deadline.remaining()
+        if left is not None:
+            max_wait = min(max_wait, left - deadline.MIN_ATTEMPT_SECONDS)
+        give_up_at = time.monotonic() + max_wait
+        token = uuid.uuid4().hex
+
+        while True:
+            try:
+                is_leader = self.redis_client.set(
+                    lock_key, token, nx=True, ex=settings.LLM_SINGLE_FLIGHT_LOCK_SECONDS
+                )
+                shared = None if is_leader else self._follow(key, give_up_at)
+            except redis.RedisError as e:
+                logger.warning("Single-flight unavailable (%s) — calling without coalescing", e)
+                self._count("uncoordinated")
+                return fetch(), ""
+
+            if is_leader:
+                self._count("leaders")
+                return self._lead(key, token, fetch), "leader"
+            if shared is not None:
+                self._count("followers")
+                logger.info("Single-flight: reusing in-flight result for request %s", key[:12])
+                return shared, "follower"
+            if time.monotonic() >= give_up_at:
+                logger.warning("Single-flight: gave up waiting on request %s — calling directly", key[:12])
+                self._count("uncoordinated")
+                return fetch(), ""
+            # Leader failed or vanished without a result: compete for leadership again
+
+    def _lead(self, key: str, token: str, fetch: Callable[[], dict]) -> dict:
+        lock_key, result_key, channel = self._keys(key)
+        payload = None
+        try:
+            payload = fetch()
+            return payload
+        finally:
+            # Publish the result (or None on failure, so followers stop waiting)
+            message = json.dumps({"response": payload})
+            try:
+                pipe = self.redis_client.pipeline()
+                if payload is not None:
+                    pipe.set(result_key, message, ex=RESULT_TTL_SECONDS)
+                pipe.publish(channel, message)
+                pipe.execute()
+                if self.redis_client.get(lock_key) == token.encode():
+                    self.redis_client.delete(lock_key)
+            except redis.RedisError as e:
+                logger.warning("Single-flight publish failed: %s", e)
+
+    def _follow(self, key: str, give_up_at: float) -> dict | None:
+        """Wait for the leader's result; None if it failed, vanished or took too long."""
+        lock_key, result_key, channel = self._keys(key)
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+        try:
+            while time.monotonic() < give_up_at:
+                # Subscribed first, so a result published from here on can't be missed
+                stored = self.redis_client.get(result_key)
+                if stored is not None:
+                    return json.loads(stored)["response"]
+                if not self.redis_client.exists(lock_key):
+                    return None
+                message = pubsub.get_message(timeout=min(POLL_SECONDS, max(0.0, give_up_at - time.monotonic())))
+                if message is not None:
+                    return json.loads(message["data"])["response"]
+            return None
+        finally:
+            pubsub.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+# Singleton instance
+llm_single_flight = SingleFlight()
@@ -0,0 +1,72 @@
+"""One-pass index of ATX headers ("## Title") in a markdown document.
+
+Built once per spec and shared by everything that needs its structure
+(Architect tech-stack parsing, section validation, the pre-critic lint)
+instead of each of them re-scanning and slicing the text per lookup. Lines
+inside fenced code blocks are not headers. Offsets are string indices.
+"""
+
+import re
+from dataclasses import dataclass
+
+# Fence lines and header lines. Anchoring on a literal "\n" instead of a
+# MULTILINE "^" lets the regex engine skip ahead between line starts; the
+# first line is matched separately.
+_LINE_RE = re.compile(r"\n(?:(```|~~~)|(#{1,6})[ \t]+([^\n]*))")
+_FIRST_LINE_RE = re.compile(r"(?:(```|~~~)|(#{1,6})[ \t]+([^\n]*))")
+
+
+@dataclass(slots=True)
+class Section:
+    """One header and the extent of its section."""
+    level: int       # Number of leading "#"
+    title: str       # Header text, stripped
+    start: int       # Offset of the first "#"
+    body_start: int  # Offset just past the header text (the header line's newline, or EOF)
+    end: int         # Next header of the same or a higher level, or EOF
+
+
+class SectionIndex:
+    """Headers of a markdown document in order, with their section extents."""
+
+    def __init__(self, markdown: str):
+        self.markdown = markdown
+
+        sections: list[Section] = []
+        open_sections: list[Section] = []  # Sections whose end is not known yet
+        in_fence = False
+        first = _FIRST_LINE_RE.match(markdown)
+        for match in ([first] if first else []) + list(_LINE_RE.finditer(markdown)):
+            if match.group(1):
+                in_fence = not in_fence
+                continue
+            if in_fence:
+                continue
+            level = len(match.group(2))
+            start = match.start(2)
+            while open_sections and open_sections[-1].level >= level:
+                open_sections.pop().end = start
+            section = Section(level, match.group(3).strip(), start, match.end(), len(markdown))
+            open_sections.append(section)
+            sections.append(section)
+
+        self.sections = sections
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+    def body(self, section: Section) -> str:
+        """Text of a section after its header line, subsections included."""
+        return self.markdown[section.body_start:section.end]
+
+    def body_until_next_header(self, position: int) -> str:
+        """Text of the section at sections[position] up to the next header of any level."""
+        section = self.sections[position]
+        nxt = self.sections[position + 1].start if position + 1 < len(self.sections) else len(self.markdown)
+        return self.markdown[section.body_start:nxt]
+
+    def titles(self, min_level: int = 1) -> list[str]:
+        return [s.title for s in self.sections if s.level >= min_level]
@@ -0,0 +1,258 @@
+"""Worker-side publisher of Socket.IO events through Redis.
+
+Workflow tasks run in Celery workers, outside the Socket.IO server; their
+events reach clients through the server's Redis pub/sub channel. The
+publisher keeps one pooled Redis client for the worker process's lifetime
+and publishes from a background thread, so a task never waits on Redis:
+events queued within EVENT_PUBLISH_WINDOW_MS go out as one pipelined batch,
+in order. Within a batch, a progress_update immediately followed (in its
+room) by another progress_update is superseded and not sent — clients only
+show the current stage. Sent events are numbered per room and logged for
+replay after a reconnect (app.websocket.event_stream), except streaming
+deltas (UNLOGGED_EVENTS): there are hundreds per stage and the final
+spec_ready/prompt_ready carry the same text, so they go out live only and
+would otherwise push everything else out of the bounded log.
+
+The queue is bounded by EVENT_PUBLISH_MAX_QUEUE; events that don't fit or
+can't be published are dropped and counted. stats() reports this process's
+counts and publish latency (queued → acknowledged by Redis); the counters
+are also summed across workers in Redis (cluster_stats()).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass
+
+import redis
+
+from app.config import settings
+from app.websocket.event_stream import seq_key, stream_key
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "socketio"  # socketio.RedisManager / AsyncRedisManager default channel
+COALESCED_EVENTS = frozenset({"progress_update"})
+UNLOGGED_EVENTS = frozenset({"spec_delta", "prompt_delta"})  # Not numbered, not replayed
+STATS_KEY = "event_publisher:stats"
+LATENCY_SAMPLES = 1000
+
+
+@dataclass(slots=True)
+class _Pending:
+    room: str
+    event: str
+    data: dict
+    queued_at: float
+
+
+class EventPublisher:
+    """Batched, coalescing emitter to Socket.IO rooms (one per worker process)."""
+
+    def __init__(self, redis_url: str, window_ms: int, max_queue: int):
+        self.redis_url = redis_url
+        self.window_s = window_ms / 1000
+        self.max_queue = max_queue
+        self._host_id = uuid.uuid4().hex
+        self._reset()
+        # The flusher thread and the Redis connections don't survive a fork
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._cond = threading.Condition()
+        self._queue: deque[_Pending] = deque()
+        self._thread: threading.Thread | None = None
+        self._redis: redis.Redis | None = None
+        self._publishing = False
+        self._flush_requested = False
+        self._counts = {"published": 0, "coalesced": 0, "dropped": 0, "batches": 0}
+        self._unreported = {"published": 0, "coalesced": 0, "dropped": 0}
+        self._latencies_ms: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    @property
+    def redis_client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+        return self._redis
+
+    # ─── Producer side ───────────────────────────────────────────
+
+    def publish(self, room: str, event: str, data: dict) -> None:
+        """Queue an event for a room; returns immediately."""
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="event-publisher", daemon=True)
+                self._thread.start()
+            if len(self._queue) >= self.max_queue:
+                self._count("dropped", 1)
+                logger.warning("Event queue full (%d) — dropping %s for %s", self.max_queue, event, room)
+                return
+            self._queue.append(_Pending(room, event, data, time.monotonic()))
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Publish everything queued so far without waiting out the window. False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._queue or self._publishing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # ─── Flusher thread ──────────────────────────────────────────
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                # Let a burst accumulate for up to one window after its first event
+                window_end = self._queue[0].queued_at + self.window_s
+                while not self._flush_requested and (remaining := window_end - time.monotonic()) > 0:
+                    self._cond.wait(remaining)
+                batch = list(self._queue)
+                self._queue.clear()
+                self._flush_requested = False
+                self._publishing = True
+            try:
+                self._send(batch)
+            except Exception:
+                logger.exception("Event publisher batch failed")
+            finally:
+                with self._cond:
+                    self._publishing = False
+                    self._cond.notify_all()
+
+    def _coalesce(self, batch: list[_Pending]) -> list[_Pending]:
+        kept: list[_Pending] = []
+        next_event: dict[str, str] = {}  # room → event type of the next kept event
+        for item in reversed(batch):
+            if item.event in COALESCED_EVENTS and next_event.get(item.room) == item.event:
+                continue
+            next_event[item.room] = item.event
+            kept.append(item)
+        kept.reverse()
+        return kept
+
+    def _send(self, batch: list[_Pending]) -> None:
+        kept = self._coalesce(batch)
+        with self._cond:
+            self._count("coalesced", len(batch) - len(kept))
+
+        for attempt in range(2):
+            try:
+                self._publish(kept)
+                break
+            except redis.RedisError as e:
+                if attempt == 0:
+                    self._redis = None  # Reconnect once
+                    continue
+                logger.error("Dropping %d events — cannot publish to Redis: %s", len(kept), e)
+                with self._cond:
+                    self._count("dropped", len(kept))
+                return
+
+        acked = time.monotonic()
+        with self._cond:
+            self._count("published", len(kept))
+            self._counts["batches"] += 1
+            self._latencies_ms.extend((acked - item.queued_at) * 1000 for item in kept)
+            latency_ms = sum((acked - item.queued_at) * 1000 for item in kept)
+        self._report(latency_ms)
+
+    def _publish(self, kept: list[_Pending]) -> None:
+        """Number the logged events per room, append them to the rooms' event logs and publish everything."""
+        per_room = Counter(item.room for item in kept if item.event not in UNLOGGED_EVENTS)
+        rooms = list(per_room)
+        next_seq: dict[str, int] = {}
+        if rooms:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for room in rooms:
+                pipe.incrby(seq_key(room), per_room[room])
+            next_seq = {room: last - per_room[room] + 1 for room, last in zip(rooms, pipe.execute())}
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for item in kept:
+            data = item.data
+            if item.event not in UNLOGGED_EVENTS:
+                seq = next_seq[item.room]
+                next_seq[item.room] += 1
+                data = {**data, "event_seq": seq}
+                pipe.xadd(
+                    stream_key(item.room),
+                    {"event": item.event, "data": json.dumps(data, default=str)},
+                    id=f"{seq}-0",
+                    maxlen=settings.EVENT_STREAM_MAXLEN,
+                    approximate=True,
+                )
+            pipe.publish(CHANNEL, json.dumps({
+                "method": "emit", "event": item.event, "data": data, "namespace": "/",
+                "room": item.room, "skip_sid": None, "callback": None, "host_id": self._host_id,
+            }, default=str))
+        for room in rooms:
+            pipe.expire(stream_key(room), settings.EVENT_STREAM_TTL_SECONDS)
+            pipe.expire(seq_key(room), settings.EVENT_STREAM_TTL_SECONDS)
+        # A failed log append must not stop the live publish (or make the retry publish twice)
+        errors = [r for r in pipe.execute(raise_on_error=False) if isinstance(r, Exception)]
+        if errors:
+            logger.warning("%d event log command(s) failed, e.g. %s", len(errors), errors[0])
+
+    # ─── Stats ───────────────────────────────────────────────────
+
+    def _count(self, name: str, n: int) -> None:
+        """Bump a counter (caller holds the lock)."""
+        self._counts[name] += n
+        self._unreported[name] += n
+
+    def _report(self, latency_ms: float) -> None:
+        """Add the counters since the last report to the cluster-wide totals (best effort)."""
+        with self._cond:
+            counts, self._unreported = self._unreported, dict.fromkeys(self._unreported, 0)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for name, n in counts.items():
+                if n:
+                    pipe.hincrby(STATS_KEY, name, n)
+            pipe.hincrbyfloat(STATS_KEY, "latency_ms_total", latency_ms)
+            pipe.execute()
+        except redis.RedisError:
+            with self._cond:
+                for name, n in counts.items():
+                    self._unreported[name] += n
+
+    def stats(self) -> dict:
+        """This process's counters and publish latency percentiles."""
+        with self._cond:
+            counts = dict(self._counts)
+            counts["queued"] = len(self._queue)
+            latencies = sorted(self._latencies_ms)
+        if latencies:
+            counts["latency_ms_p50"] = round(latencies[len(latencies) // 2], 2)
+            counts["latency_ms_p95"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2)
+            counts["latency_ms_max"] = round(latencies[-1], 2)
+        return counts
+
+    def cluster_stats(self) -> dict:
+        """Counters summed over every worker's publisher, with the mean publish latency."""
+        raw = {k.decode(): float(v) for k, v in self.redis_client.hgetall(STATS_KEY).items()}
+        stats = {name: int(raw.get(name, 0)) for name in ("published", "coalesced", "dropped")}
+        stats["latency_ms_mean"] = (
+            round(raw.get("latency_ms_total", 0.0) / stats["published"], 2) if stats["published"] else 0.0
+        )
+        return stats
+
+
+# Singleton instance (per worker process)
+event_publisher = EventPublisher(
+    settings.REDIS_URL,
+    window_ms=settings.EVENT_PUBLISH_WINDOW_MS,
+    max_queue=settings.EVENT_PUBLISH_MAX_QUEUE,
+)
@@ -0,0 +1,59 @@
+"""Per-room log of published events, for replay after a reconnect.
+
+The worker event publisher numbers every event it sends to a room (the
+"event_seq" field added to its data), other than streaming deltas, and
+appends it to a Redis stream whose entry IDs are "<seq>-0". A client that reconnects joins with the last
+event_seq it saw and gets only the events after it. Each stream keeps about
+EVENT_STREAM_MAXLEN entries and expires EVENT_STREAM_TTL_SECONDS after its
+last event, so memory stays flat however long projects live.
+"""
+
+import json
+
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+
+def stream_key(room: str) -> str:
+    return f"events:{room}"
+
+
+def seq_key(room: str) -> str:
+    return f"events_seq:{room}"
+
+
+class EventReplay:
+    """Reads a room's event log (API side; the publisher writes it)."""
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self._redis: aioredis.Redis | None = None
+
+    @property
+    def redis_client(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.Redis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+        return self._redis
+
+    async def since(self, room: str, since_seq: int) -> tuple[list[tuple[str, dict]], int, bool]:
+        """(event type, data) pairs after since_seq, the room's latest seq, and whether events are missing.
+
+        Events are missing when the log was trimmed or expired past since_seq
+        (or since_seq is newer than the log); the client should then reload
+        the project instead of relying on the replay.
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.get(seq_key(room))
+        pipe.xrange(stream_key(room), min=f"{since_seq + 1}-0", max="+", count=settings.EVENT_STREAM_MAXLEN)
+        latest, entries = await pipe.execute()
+        latest = int(latest or 0)
+
+        events = [(fields[b"event"].decode(), json.loads(fields[b"data"])) for _, fields in entries]
+        first_seq = int(entries[0][0].split(b"-")[0]) if entries else latest + 1
+        missing = since_seq > latest or first_seq > since_seq + 1
+        return events, latest, missing
+
+
+# Singleton instance (per API worker)
+event_replay = EventReplay(settings.REDIS_URL)
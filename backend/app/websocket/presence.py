@@ -0,0 +1,74 @@
+"""Socket presence shared by every API worker through Redis.
+
+With several server processes behind one port, only the process that
+accepted a connection knows about it. Presence records which user each sid
+belongs to and which sids are in each project room, so any worker can
+authorize a sid or list who is watching a project.
+
+Keys:
+    ws:sid:<sid>    → user id (expires after PRESENCE_TTL_SECONDS)
+    ws:room:<room>  → set of sids in the room
+
+A worker that dies without running its disconnect handlers leaves sids
+behind; their ws:sid keys expire and room_members() prunes them from rooms.
+"""
+
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+SID_KEY_PREFIX = "ws:sid:"
+ROOM_KEY_PREFIX = "ws:room:"
+PRESENCE_TTL_SECONDS = 24 * 3600  # Longest a socket is expected to stay connected
+
+
+class Presence:
+    """Connected sids, their users and their rooms, held in Redis."""
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self._redis: aioredis.Redis | None = None
+
+    @property
+    def redis_client(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.Redis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+        return self._redis
+
+    async def connect(self, sid: str, user_id: int) -> None:
+        await self.redis_client.set(f"{SID_KEY_PREFIX}{sid}", user_id, ex=PRESENCE_TTL_SECONDS)
+
+    async def user_id(self, sid: str) -> int | None:
+        value = await self.redis_client.get(f"{SID_KEY_PREFIX}{sid}")
+        return int(value) if value is not None else None
+
+    async def join(self, sid: str, room: str) -> None:
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.sadd(f"{ROOM_KEY_PREFIX}{room}", sid)
+        pipe.expire(f"{ROOM_KEY_PREFIX}{room}", PRESENCE_TTL_SECONDS)
+        await pipe.execute()
+
+    async def leave(self, sid: str, room: str) -> None:
+        await self.redis_client.srem(f"{ROOM_KEY_PREFIX}{room}", sid)
+
+    async def disconnect(self, sid: str, rooms: list[str]) -> None:
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.delete(f"{SID_KEY_PREFIX}{sid}")
+        for room in rooms:
+            pipe.srem(f"{ROOM_KEY_PREFIX}{room}", sid)
+        await pipe.execute()
+
+    async def room_members(self, room: str) -> dict[str, int]:
+        """sid → user id of every live socket in a room, across all workers."""
+        sids = sorted(s.decode() for s in await self.redis_client.smembers(f"{ROOM_KEY_PREFIX}{room}"))
+        if not sids:
+            return {}
+        user_ids = await self.redis_client.mget([f"{SID_KEY_PREFIX}{sid}" for sid in sids])
+        stale = [sid for sid, user_id in zip(sids, user_ids) if user_id is None]
+        if stale:
+            await self.redis_client.srem(f"{ROOM_KEY_PREFIX}{room}", *stale)
+        return {sid: int(user_id) for sid, user_id in zip(sids, user_ids) if user_id is not None}
+
+
+# Singleton instance (per API worker; the state itself is shared)
+presence = Presence(settings.REDIS_URL)
@@ -1,21 +1,35 @@
 """Socket.IO server for real-time WebSocket communication.
 
 Handles JWT auth on connect, project room management, and event emission.
+
+Runs on an AsyncRedisManager, so any number of API workers share rooms: an
+emit from any worker — or from a Celery task through the event publisher —
+reaches every socket in the room, whichever worker holds it. Which user a
+sid belongs to and who is in each room live in Redis (app.websocket.presence).
+Clients must connect with the websocket transport, since long-polling would
+need sticky sessions across workers.
 """
 
+import asyncio
 import logging
 from typing import Any
 
 import socketio
 
 from app.config import settings
+from app.database import SessionLocal
+from app.models.project import Project
 from app.services.auth_service import decode_access_token
+from app.websocket.event_publisher import event_publisher
+from app.websocket.event_stream import event_replay
+from app.websocket.presence import presence
 
 logger = logging.getLogger(__name__)
 
 # Create Socket.IO async server (ASGI mode for FastAPI)
 sio = socketio.AsyncServer(
     async_mode="asgi",
+    client_manager=socketio.AsyncRedisManager(settings.REDIS_URL),
     cors_allowed_origins=settings.CORS_ORIGINS,
     logger=False,
     engineio_logger=False,
@@ -24,9 +38,6 @@ sio = socketio.AsyncServer(
 # ASGI app to mount on FastAPI
 socket_app = socketio.ASGIApp(sio, socketio_path="/ws/socket.io")
 
-# Track authenticated users: sid → user_id
-_authenticated_sids: dict[str, int] = {}
-
 
 # ─── Connection lifecycle ────────────────────────────────────────
 
@@ -57,35 +68,81 @@ async def connect(sid: str, environ: dict, auth: dict | None = None):
         raise socketio.exceptions.ConnectionRefusedError("Invalid or expired token")
 
     user_id = int(payload["sub"])
-    _authenticated_sids[sid] = user_id
+    await presence.connect(sid, user_id)
     logger.info("Socket connected: user=%d sid=%s", user_id, sid)
 
 
 @sio.event
 async def disconnect(sid: str):
-    user_id = _authenticated_sids.pop(sid, None)
+    user_id = await presence.user_id(sid)
+    # Rooms are still listed while the disconnect handler runs
+    await presence.disconnect(sid, [room for room in sio.rooms(sid) if room != sid])
     logger.info("Socket disconnected: user=%s sid=%s", user_id, sid)
 
 
 # ─── Room management ────────────────────────────────────────────
 
+def _owns_project(user_id: int, project_id: int) -> bool:
+    """Whether the project exists and belongs to the user (blocking DB query)."""
+    db = SessionLocal()
+    try:
+        return db.query(Project.id).filter(Project.id == project_id, Project.user_id == user_id).first() is not None
+    finally:
+        db.close()
+
+
 @sio.event
 async def join_project(sid: str, data: dict):
-    """Client joins a project room to receive updates."""
-    user_id = _authenticated_sids.get(sid)
+    """Client joins the room of a project it owns to receive updates.
+
+    With since_seq (the last event_seq the client saw) the events it missed
+    are replayed to it first. The room is entered before the replay, so a live
+    event can overtake replayed ones; clients drop duplicates by event_seq.
+    joined_project reports the replay; "missing" means the log no longer
+    reaches back to since_seq and the client should reload the project.
+    """
+    user_id = await presence.user_id(sid)
     if user_id is None:
         await sio.emit("error", {"message": "Not authenticated"}, to=sid)
         return
 
-    project_id = data.get("project_id")
-    if project_id is None:
+    try:
+        project_id = int(data["project_id"])
+    except (KeyError, TypeError, ValueError):
         await sio.emit("error", {"message": "project_id required"}, to=sid)
         return
 
+    # Same answer for someone else's project as for a missing one, like the REST routes
+    if not await asyncio.to_thread(_owns_project, user_id, project_id):
+        logger.warning("User %d denied room project:%s (sid=%s)", user_id, project_id, sid)
+        await sio.emit("error", {"message": "Project not found"}, to=sid)
+        return
+
     room = f"project:{project_id}"
     await sio.enter_room(sid, room)
+    await presence.join(sid, room)
     logger.info("User %d joined room %s (sid=%s)", user_id, room, sid)
-    await sio.emit("joined_project", {"project_id": project_id}, to=sid)
+
+    since_seq = data.get("since_seq")
+    # A malformed since_seq is ignored: the client just joins without a replay
+    if isinstance(since_seq, str) and since_seq.isdigit():
+        since_seq = int(since_seq)
+    if type(since_seq) is not int or since_seq < 0:
+        if since_seq is not None:
+            logger.warning("Ignoring invalid since_seq %r from sid=%s", since_seq, sid)
+        await sio.emit("joined_project", {"project_id": project_id}, to=sid)
+        return
+
+    events, latest_seq, missing = await event_replay.since(room, since_seq)
+    for event, event_data in events:
+        await sio.emit(event, event_data, to=sid)
+    logger.info("Replayed %d event(s) after seq %s to sid=%s (missing=%s)", len(events), since_seq, sid, missing)
+    await sio.emit("joined_project", {
+        "project_id": project_id,
+        "replayed": len(events),
+        "latest_seq": latest_seq,
+        "missing": missing,
+    }, to=sid)
 
 
 @sio.event
@@ -95,6 +152,7 @@ async def leave_project(sid: str, data: dict):
     if project_id:
         room = f"project:{project_id}"
         await sio.leave_room(sid, room)
+        await presence.leave(sid, room)
         logger.info("sid=%s left room %s", sid, room)
 
 
@@ -117,11 +175,8 @@ async def emit_progress(project_id: int, stage: str, message: str) -> None:
 # ─── Sync wrappers (for use from Celery/sync code) ──────────────
 
 def emit_to_project_sync(project_id: int, event: str, data: dict) -> None:
-    """Sync wrapper — emit via Socket.IO's external event emitter through Redis."""
-    import redis as redis_lib
-    mgr = socketio.RedisManager(settings.REDIS_URL, write_only=True)
-    room = f"project:{project_id}"
-    mgr.emit(event, data, room=room)
+    """Sync wrapper — queue the event on this process's batched Redis publisher."""
+    event_publisher.publish(f"project:{project_id}", event, data)
 
 
 def emit_progress_sync(project_id: int, stage: str, message: str) -> None:
@@ -0,0 +1,118 @@
+"""Microbenchmark: Architect spec parsing with and without SectionIndex.
+
+The previous parse_tech_stack sliced the rest of the spec for every ###
+header and validate_sections re-searched the whole text per required
+section, so time per KB grew with spec size. The SectionIndex versions scan
+once; ms/KB should stay flat as specs grow. Run from backend/:
+
+    python -m scripts.benchmark_section_index --sizes 25 50 100 200 400
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+if not __package__:
+    # Run as a file (python scripts/benchmark_section_index.py): make `app` importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.agents.architect import get_required_sections, parse_tech_stack, validate_sections
+from app.utils.markdown_index import SectionIndex
+
+
+def legacy_parse_tech_stack(spec_md: str) -> dict:
+    """parse_tech_stack before SectionIndex (returns the choices as a dict)."""
+    mapping = {"frontend": "frontend", "backend": "backend", "database": "database",
+               "styling": "styling", "styling/ui": "styling"}
+    stack = {}
+    for match in re.finditer(r"###\s+(.+)", spec_md):
+        attr = mapping.get(match.group(1).strip().lower().rstrip(":"))
+        if attr is None:
+            continue
+        start = match.end()
+        next_header = re.search(r"\n##", spec_md[start:])
+        end = start + next_header.start() if next_header else len(spec_md)
+        block = spec_md[start:end].strip()
+        bold = re.search(r"\*\*(.+?)\*\*", block)
+        if bold:
+            stack[attr] = bold.group(1).strip()
+        elif block:
+            stack[attr] = block.split("\n")[0].strip().strip("*").strip()
+    return stack
+
+
+def legacy_validate_sections(spec_md: str, project_type: str = "build") -> list[str]:
+    """validate_sections before SectionIndex."""
+    lower = spec_md.lower()
+    return [
+        section for section in get_required_sections(project_type)
+        if re.search(rf"##\s+{re.escape(section.lower())}", lower) is None
+    ]
+
+
+def make_spec(kilobytes: int, per_feature_stack: bool = False) -> str:
+    """A spec with every required section followed by many ### feature subsections.
+
+    With per_feature_stack each feature also gets #### Frontend / #### Backend
+    notes, which the legacy parser re-sliced the rest of the spec for.
+    """
+    parts = ["# Spec\n"]
+    for section in get_required_sections("build"):
+        parts.append(f"\n## {section}\n\nOverview of {section.lower()}.\n")
+        if section.startswith("Recommended Tech Stack"):
+            for name, choice in (("Frontend", "Next.js"), ("Backend", "FastAPI"),
+                                 ("Database", "PostgreSQL"), ("Styling", "Tailwind CSS")):
+                parts.append(f"\n### {name}\n**{choice}** — chosen for the team's familiarity.\n")
+    size, n = sum(map(len, parts)), 0
+    while size < kilobytes * 1024:
+        n += 1
+        feature = (f"\n### Feature {n}\n- Users can do thing {n}\n- Edge case handling for {n}\n"
+                   f"- Acceptance: works offline and online\n")
+        if per_feature_stack:
+            feature += f"\n#### Frontend\nForm for thing {n}\n\n#### Backend\nEndpoint for thing {n}\n"
+        parts.append(feature)
+        size += len(feature)
+    return "".join(parts)
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 50, 100, 200, 400], help="Spec sizes in KB")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for per_feature_stack in (False, True):
+        layout = "features with #### Frontend/Backend notes" if per_feature_stack else "flat ### features"
+        print(f"\n{layout}\n{'size':>8}{'headers':>9}{'legacy':>12}{'ms/KB':>8}{'indexed':>12}{'ms/KB':>8}")
+        for kb in args.sizes:
+            spec = make_spec(kb, per_feature_stack)
+
+            def legacy():
+                return legacy_parse_tech_stack(spec), legacy_validate_sections(spec)
+
+            def indexed():
+                index = SectionIndex(spec)
+                return parse_tech_stack(spec, index), validate_sections(spec, index=index)
+
+            stack, missing = indexed()
+            choices = {attr: value for attr, value in vars(stack).items() if value}
+            if (legacy_parse_tech_stack(spec), legacy_validate_sections(spec)) != (choices, missing):
+                raise SystemExit(f"Results differ at {kb} KB")
+
+            old = best_of(legacy, args.repeat) * 1000
+            new = best_of(indexed, args.repeat) * 1000
+            print(f"{kb:>6}KB{len(SectionIndex(spec)):>9}{old:>10.1f}ms{old / kb:>8.3f}{new:>10.1f}ms{new / kb:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark the Orchestrator workflow against a recorded LLM cassette.
+
+Record once against real (or fake) providers, then replay as often as needed:
+
+    python -m scripts.benchmark_workflow record --cassette cassettes/todo.jsonl.gz
+    python -m scripts.benchmark_workflow replay --cassette cassettes/todo.jsonl.gz --scale 0 --runs 20
+
+Each run goes start_workflow → submit_answers → approve_spec and reports
+wall time per phase, the time spent waiting on (replayed) LLM calls and the
+time spent emitting events; whatever is left is parser/orchestration
+overhead. With --scale 0 replay waits nothing, so wall time is all overhead.
+"""
+
+import argparse
+import statistics
+import time
+
+from app.agents.orchestrator import Orchestrator, WorkflowEvent, WorkflowStatus
+from app.config import settings
+from app.utils.llm_cassette import llm_cassette
+
+PHASES = ("start_workflow", "submit_answers", "approve_spec")
+
+
+class TimedEmitter:
+    """emit_fn that counts events and the time spent handling them."""
+
+    def __init__(self):
+        self.events = 0
+        self.seconds = 0.0
+
+    def __call__(self, event: WorkflowEvent) -> None:
+        start = time.perf_counter()
+        Orchestrator._default_emit(event)
+        self.events += 1
+        self.seconds += time.perf_counter() - start
+
+
+def run_once(args) -> dict:
+    llm_cassette.rewind()
+    llm_cassette.reset_stats()
+    emitter = TimedEmitter()
+    orch = Orchestrator(emit_fn=emitter, stream_deltas=args.stream)
+    timings = {}
+
+    start = time.perf_counter()
+    state = orch.start_workflow(args.idea, project_type=args.project_type)
+    timings["start_workflow"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    state = orch.submit_answers(state, args.answers)
+    timings["submit_answers"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    state = orch.approve_spec(state)
+    timings["approve_spec"] = time.perf_counter() - start
+
+    if state.status != WorkflowStatus.COMPLETED:
+        raise SystemExit(f"Workflow ended in {state.status.value}: {state.error}")
+
+    wall = sum(timings.values())
+    llm = llm_cassette.stats()["replay_delay_s"]
+    return {
+        **timings,
+        "wall": wall,
+        "llm_wait": llm,
+        "events": emitter.seconds,
+        "overhead": wall - llm - emitter.seconds,
+        "event_count": emitter.events,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--cassette", default=settings.LLM_CASSETTE_PATH)
+    parser.add_argument("--scale", type=float, default=1.0, help="Replay latency multiplier (0 = no waiting)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--idea", default="A habit tracker app with streaks and reminders")
+    parser.add_argument("--answers", default="Web app, for students, keep it minimal, dark mode, no login at first.")
+    parser.add_argument("--project-type", default="build")
+    parser.add_argument("--stream", action="store_true", help="Stream architect/synthesizer deltas")
+    args = parser.parse_args()
+
+    settings.LLM_CASSETTE_MODE = args.mode
+    settings.LLM_CASSETTE_PATH = args.cassette
+    settings.LLM_CASSETTE_TIME_SCALE = args.scale
+    settings.IDEA_CACHE_ENABLED = False  # Every run must reach the Elicitor
+
+    if args.mode == "record":
+        result = run_once(args)
+        print(f"Recorded {llm_cassette.stats()['recorded']} LLM calls to {args.cassette} "
+              f"in {result['wall']:.1f}s")
+        return
+
+    results = [run_once(args) for _ in range(args.runs)]
+    print(f"{args.runs} replays of {args.cassette} (scale {args.scale}), "
+          f"{results[0]['event_count']} events per run\n")
+    print(f"{'':16}{'median':>10}{'min':>10}{'max':>10}")
+    for column in (*PHASES, "wall", "llm_wait", "events", "overhead"):
+        values = [r[column] * 1000 for r in results]
+        print(f"{column:16}{statistics.median(values):>8.1f}ms{min(values):>8.1f}ms{max(values):>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Soak test: Socket.IO event delivery across several API worker processes.
+
+Starts --servers Socket.IO server processes (the app's socket_app, sharing
+rooms through Redis), connects --clients websocket clients spread over them
+from --client-procs processes, and joins each client to one of --projects
+project rooms. Then --publishers worker-like processes send --events events
+to every room through the Celery event publisher. Every client must receive
+every event of its room exactly once and in order, and shared presence must
+list every client of a room whichever server it is connected to:
+
+    python -m scripts.soak_socketio --servers 4 --clients 4000 --projects 200 --events 20
+
+Needs Redis at REDIS_URL and enough file descriptors (ulimit -n) for the
+sockets on both ends. --urls targets already-running servers instead of
+starting them. Exits non-zero if any event was lost, duplicated or reordered.
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import socketio
+
+from app.services.auth_service import create_access_token
+from app.websocket.event_publisher import event_publisher
+from app.websocket.presence import presence
+
+SOAK_EVENT = "soak_event"  # Not coalesced by the publisher
+SOCKETIO_PATH = "/ws/socket.io"
+CONNECT_CONCURRENCY = 100  # Per client process
+
+
+def start_servers(count: int, base_port: int) -> tuple[list[str], list[subprocess.Popen]]:
+    urls, procs = [], []
+    for port in range(base_port, base_port + count):
+        procs.append(subprocess.Popen([
+            sys.executable, "-m", "uvicorn", "app.websocket.socket_manager:socket_app",
+            "--port", str(port), "--log-level", "warning",
+        ]))
+        urls.append(f"http://127.0.0.1:{port}")
+    for url in urls:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                urllib.request.urlopen(f"{url}{SOCKETIO_PATH}/?EIO=4&transport=polling", timeout=1)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise SystemExit(f"Server {url} did not start")
+                time.sleep(0.2)
+    return urls, procs
+
+
+async def run_clients(assignments, token, events, settle, ready_queue, result_queue, published) -> None:
+    """Connect this process's clients, wait for the events, report what arrived."""
+    received: dict[int, list[int]] = {}
+    latencies: list[float] = []
+    clients: list[socketio.AsyncClient] = []
+    semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+    async def start(index: int, url: str, project: int) -> None:
+        client = socketio.AsyncClient(reconnection=False)
+        joined = asyncio.Event()
+        seqs: list[int] = []
+
+        async def on_joined(data):
+            joined.set()
+
+        async def on_event(data):
+            seqs.append(data["seq"])
+            latencies.append(time.time() - data["sent_at"])
+
+        client.on("joined_project", on_joined)
+        client.on(SOAK_EVENT, on_event)
+        async with semaphore:
+            await client.connect(
+                url, socketio_path=SOCKETIO_PATH, transports=["websocket"], auth={"token": token}, wait_timeout=10
+            )
+            await client.emit("join_project", {"project_id": project})
+            await asyncio.wait_for(joined.wait(), 10)
+        clients.append(client)
+        received[index] = seqs
+
+    results = await asyncio.gather(*(start(*a) for a in assignments), return_exceptions=True)
+    failures = [repr(r) for r in results if isinstance(r, Exception)]
+    ready_queue.put((len(clients), failures[:5], len(failures)))
+
+    await asyncio.get_running_loop().run_in_executor(None, published.wait)
+    deadline = time.monotonic() + settle
+    while time.monotonic() < deadline and any(len(seqs) < events for seqs in received.values()):
+        await asyncio.sleep(0.1)
+
+    result_queue.put({
+        "clients": len(received),
+        "received": sum(len(seqs) for seqs in received.values()),
+        "missing": sum(max(0, events - len(set(seqs))) for seqs in received.values()),
+        "duplicates": sum(len(seqs) - len(set(seqs)) for seqs in received.values()),
+        "out_of_order": sum(1 for seqs in received.values() if seqs != sorted(seqs)),
+        "latencies": latencies,
+    })
+    await asyncio.gather(*(client.disconnect() for client in clients), return_exceptions=True)
+
+
+def client_process(*args) -> None:
+    asyncio.run(run_clients(*args))
+
+
+def publisher_process(projects: list[int], events: int, result_queue) -> None:
+    """Publish like a Celery worker: queue on the event publisher, flush at the end."""
+    for seq in range(events):
+        for project in projects:
+            event_publisher.publish(
+                f"project:{project}", SOAK_EVENT, {"project": project, "seq": seq, "sent_at": time.time()}
+            )
+    event_publisher.flush(timeout=120)
+    result_queue.put(event_publisher.stats())
+
+
+def percentile(values: list[float], pct: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=2, help="Server processes to start")
+    parser.add_argument("--base-port", type=int, default=8200)
+    parser.add_argument("--urls", nargs="+", help="Use running servers instead of starting them")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--client-procs", type=int, default=4)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--events", type=int, default=20, help="Events per project room")
+    parser.add_argument("--publishers", type=int, default=2)
+    parser.add_argument("--settle", type=float, default=30.0, help="Seconds to wait for stragglers")
+    args = parser.parse_args()
+
+    servers: list[subprocess.Popen] = []
+    if args.urls:
+        urls = args.urls
+    else:
+        urls, servers = start_servers(args.servers, args.base_port)
+
+    try:
+        token = create_access_token({"sub": "1"})
+        ready_queue, result_queue, published = mp.Queue(), mp.Queue(), mp.Event()
+        assignments = [[] for _ in range(args.client_procs)]
+        for i in range(args.clients):
+            assignments[i % args.client_procs].append((i, urls[i % len(urls)], i % args.projects))
+
+        start = time.monotonic()
+        client_procs = [
+            mp.Process(target=client_process, args=(a, token, args.events, args.settle, ready_queue, result_queue, published))
+            for a in assignments
+        ]
+        for proc in client_procs:
+            proc.start()
+        ready = [ready_queue.get() for _ in client_procs]
+        connected = sum(r[0] for r in ready)
+        connect_failures = sum(r[2] for r in ready)
+        print(f"{connected}/{args.clients} clients connected to {len(urls)} servers in {time.monotonic() - start:.1f}s")
+        for r in ready:
+            for failure in r[1]:
+                print(f"  connect failure: {failure}")
+
+        expected_in_room0 = len(range(0, args.clients, args.projects)) - connect_failures
+        members = asyncio.run(presence.room_members("project:0"))
+        print(f"presence: {len(members)} sockets in project:0 (at least {expected_in_room0} expected)")
+
+        start = time.monotonic()
+        publish_queue = mp.Queue()
+        publishers = [
+            mp.Process(target=publisher_process,
+                       args=(list(range(p, args.projects, args.publishers)), args.events, publish_queue))
+            for p in range(args.publishers)
+        ]
+        for proc in publishers:
+            proc.start()
+        publish_stats = [publish_queue.get() for _ in publishers]
+        for proc in publishers:
+            proc.join()
+        print(f"published {sum(s['published'] for s in publish_stats)} events in {time.monotonic() - start:.1f}s "
+              f"(dropped {sum(s['dropped'] for s in publish_stats)}, "
+              f"p95 publish latency {max(s.get('latency_ms_p95', 0) for s in publish_stats):.1f}ms)")
+        published.set()
+
+        results = [result_queue.get() for _ in client_procs]
+        for proc in client_procs:
+            proc.join()
+    finally:
+        for proc in servers:
+            proc.terminate()
+
+    latencies = [lat * 1000 for r in results for lat in r["latencies"]]
+    expected = sum(r["clients"] for r in results) * args.events
+    missing = sum(r["missing"] for r in results)
+    duplicates = sum(r["duplicates"] for r in results)
+    out_of_order = sum(r["out_of_order"] for r in results)
+    print(f"delivered {sum(r['received'] for r in results)}/{expected} "
+          f"(missing {missing}, duplicates {duplicates}, clients out of order {out_of_order})")
+    if latencies:
+        print(f"delivery latency ms: p50 {statistics.median(latencies):.1f}  "
+              f"p95 {percentile(latencies, 95):.1f}  max {max(latencies):.1f}")
+
+    if missing or duplicates or out_of_order or connect_failures or len(members) < expected_in_room0:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
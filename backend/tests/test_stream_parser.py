@@ -0,0 +1,116 @@
+"""Streaming parsers must match the batch parsers for any chunking of a completion."""
+
+import random
+
+import pytest
+
+from app.agents.elicitor import IncrementalQuestionParser, parse_questions
+from app.agents.synthesizer import IncrementalPromptParser, parse_prompts
+
+PROMPT_PACKAGE = """\
+Here is your prompt package, ordered so each step builds on the last.
+
+## Prompt 1: Project scaffolding
+Create a FastAPI backend and a Next.js frontend in one repository.
+
+- `backend/` holds the API, `frontend/` the web app
+- Add a docker-compose.yml with Postgres and Redis
+
+## Prompt 2:   Data model and migrations
+Define `User`, `Project` and `Prompt` tables with SQLAlchemy.
+Generate the first Alembic migration. ## Prompt headers inside prose are still headers:
+## Prompt 3: Authentication
+Add Google OAuth login restricted to the allowed email domain.
+
+##Prompt 4 :Realtime progress
+Push workflow progress over Socket.IO rooms, one per project.
+
+## Final Notes
+Run the prompts in order; each assumes the previous one is merged.
+
+## Instructions for Use
+Paste one prompt at a time into your coding assistant.
+"""
+
+PROMPT_PACKAGE_NO_SENTINEL = """\
+## Prompt 1: Fix the flaky upload test
+Reproduce the failure with `pytest -k upload -x --count 50`.
+## Prompt 2: Add a regression test
+Cover the race between the upload handler and the cleanup job.
+## Prompt 10: Document the fix
+Explain the root cause in CHANGELOG.md.
+"""
+
+QUESTIONNAIRE = """\
+A few questions before I draft the spec:
+
+## Question 1: Target users
+Who will use the app day to day?
+- Students
+- Instructors
+- Both
+
+## Question 2: Hosting
+Where should it run?
+Pick whichever your team already maintains.
+- A single VPS
+- Kubernetes
+-  Serverless functions
+
+##Question 3 :  Data retention
+How long should generated prompts be kept?
+- 30 days
+- Forever
+---
+"""
+
+SEEDS = range(25)
+
+
+def _random_chunks(text: str, rng: random.Random) -> list[str]:
+    """Split text at random points, from single characters up to a few lines."""
+    chunks = []
+    i = 0
+    while i < len(text):
+        size = rng.choice((1, 1, 2, 3, 5, 8, 13, 40, 120))
+        chunks.append(text[i:i + size])
+        i += size
+    return chunks
+
+
+def _stream(parser, text: str, rng: random.Random) -> list:
+    items = []
+    for chunk in _random_chunks(text, rng):
+        items.extend(parser.feed(chunk))
+    items.extend(parser.close())
+    assert items == parser.items
+    return items
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("document", [PROMPT_PACKAGE, PROMPT_PACKAGE_NO_SENTINEL])
+def test_incremental_prompts_match_batch(document, seed):
+    rng = random.Random(seed)
+    assert _stream(IncrementalPromptParser(), document, rng) == parse_prompts(document)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_incremental_questions_match_batch(seed):
+    rng = random.Random(seed)
+    assert _stream(IncrementalQuestionParser(), QUESTIONNAIRE, rng) == parse_questions(QUESTIONNAIRE)
+
+
+def test_prompt_emitted_before_stream_ends():
+    parser = IncrementalPromptParser()
+    assert parser.feed("## Prompt 1: Scaffolding\nCreate the repo.\n") == []
+    closed = parser.feed("## Prompt 2: Models\n")
+    assert [p.number for p in closed] == [1]
+    assert [p.number for p in parser.feed("Define tables.\n## Final Notes\n")] == [2]
+    assert parser.close() == []
+
+
+def test_whole_document_in_one_chunk():
+    parser = IncrementalPromptParser()
+    parser.feed(PROMPT_PACKAGE)
+    parser.close()
+    assert parser.items == parse_prompts(PROMPT_PACKAGE)
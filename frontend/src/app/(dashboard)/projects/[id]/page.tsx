@@ -1,7 +1,8 @@
 "use client";
 
-import { useEffect } from "react";
+import { useEffect, useState } from "react";
 import { useParams, useRouter } from "next/navigation";
+import api from "@/lib/api-client";
 import { useProject } from "@/hooks/useProjects";
 import { useAuth } from "@/lib/auth";
 import { useSocket } from "@/hooks/useSocket";
@@ -20,11 +21,14 @@ export default function ProjectPage() {
   const projectId = Number(params.id);
   const { token } = useAuth();
   const { project, isLoading, mutate } = useProject(projectId);
+  const [resuming, setResuming] = useState(false);
 
   useSocket({
     token,
     projectId,
-    onEvent: () => {
+    onEvent: (event) => {
+      // A complete replay after a reconnect already delivered everything missed
+      if (event.type === "joined_project" && event.data.replayed !== undefined && !event.data.missing) return;
       mutate();
     },
   });
@@ -53,6 +57,16 @@ export default function ProjectPage() {
     );
   }
 
+  const handleResume = async () => {
+    setResuming(true);
+    try {
+      await api.post(`/api/projects/${projectId}/resume`);
+      mutate();
+    } finally {
+      setResuming(false);
+    }
+  };
+
   const status = project.status;
   const wd = project.workflow_data ?? null;
   const questions = wd?.questions ?? [];
@@ -161,12 +175,21 @@ export default function ProjectPage() {
             <p className="mt-2 text-sm text-gray-500">
               {wd?.error || "An unexpected error occurred."}
             </p>
-            <button
-              onClick={() => router.push("/dashboard")}
-              className="mt-4 rounded-lg border border-gray-200 px-3 py-1.5 text-sm font-medium text-gray-700 transition-all duration-200 hover:bg-gray-50"
-            >
-              Back to Dashboard
-            </button>
+            <div className="mt-4 flex gap-2">
+              <button
+                onClick={handleResume}
+                disabled={resuming}
+                className="rounded-lg bg-blue-500 px-3 py-1.5 text-sm font-medium text-white shadow-sm transition-all duration-200 hover:bg-blue-600 active:scale-[0.98] disabled:opacity-50"
+              >
+                {resuming ? "Resuming..." : "Resume"}
+              </button>
+              <button
+                onClick={() => router.push("/dashboard")}
+                className="rounded-lg border border-gray-200 px-3 py-1.5 text-sm font-medium text-gray-700 transition-all duration-200 hover:bg-gray-50"
+              >
+                Back to Dashboard
+              </button>
+            </div>
           </div>
         )}
       </div>
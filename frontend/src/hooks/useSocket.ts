@@ -64,6 +64,10 @@ export function useSocket({
   const socketRef = useRef<Socket | null>(null);
   const onEventRef = useRef(onEvent);
   onEventRef.current = onEvent;
+  // event_seq bookkeeping for the joined project: rejoining after a reconnect
+  // replays only what was missed, and replayed duplicates are dropped
+  const lastSeqRef = useRef<number | null>(null);
+  const seenSeqsRef = useRef<Set<number>>(new Set());
 
   // Connect / disconnect based on token
   useEffect(() => {
@@ -85,6 +89,12 @@ export function useSocket({
 
     // Listen to all server event types
     const handler = (type: SocketEventType) => (data: Record<string, unknown>) => {
+      const seq = data?.event_seq;
+      if (typeof seq === "number") {
+        if (seenSeqsRef.current.has(seq)) return;
+        seenSeqsRef.current.add(seq);
+        lastSeqRef.current = Math.max(lastSeqRef.current ?? 0, seq);
+      }
       const event: SocketEvent = { type, data };
       console.log(`[Socket] ${type}:`, data);
       setLastEvent(event);
@@ -105,10 +115,16 @@ export function useSocket({
     };
   }, [token]);
 
-  // Join / leave project room
+  // A different project starts with no event history
+  useEffect(() => {
+    lastSeqRef.current = null;
+    seenSeqsRef.current = new Set();
+  }, [projectId]);
+
+  // Join / leave project room (rejoins after a reconnect replay missed events)
   useEffect(() => {
     if (!connected || !projectId) return;
-    joinProject(projectId);
+    joinProject(projectId, lastSeqRef.current);
     return () => {
       leaveProject(projectId);
     };
@@ -14,7 +14,8 @@ export function getSocket(token: string): Socket {
   socket = io(API_URL, {
     path: "/ws/socket.io",
     auth: { token },
-    transports: ["websocket", "polling"],
+    // Websocket only: long-polling requests would need sticky sessions across API workers
+    transports: ["websocket"],
     reconnection: true,
     reconnectionAttempts: 5,
     reconnectionDelay: 1000,
@@ -38,13 +39,17 @@ export function getSocket(token: string): Socket {
 
 /**
  * Join a project room to receive real-time updates.
+ * With sinceSeq (the last event_seq seen) the server first replays the events missed since.
  */
-export function joinProject(projectId: number): void {
+export function joinProject(projectId: number, sinceSeq?: number | null): void {
   if (!socket?.connected) {
     console.warn("[Socket] Not connected — cannot join project");
     return;
   }
-  socket.emit("join_project", { project_id: projectId });
+  socket.emit("join_project", {
+    project_id: projectId,
+    ...(sinceSeq != null ? { since_seq: sinceSeq } : {}),
+  });
 }
 
 /**